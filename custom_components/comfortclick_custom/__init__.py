@@ -2,41 +2,84 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import logging
+from dataclasses import dataclass, field
+from datetime import timedelta
 from typing import TYPE_CHECKING
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME, Platform
-
-from .api import ApiInstance
-from .const import DOMAIN
+from homeassistant.const import (
+    CONF_HOST,
+    CONF_PASSWORD,
+    CONF_SCAN_INTERVAL,
+    CONF_USERNAME,
+    CONF_VERIFY_SSL,
+    Platform,
+)
+from homeassistant.helpers import config_validation as cv
+
+from .api import ApiInstance, parse_hosts
+from .blocking_detector import BlockingDetector
+from .capture import CaptureWriter
+from .const import (
+    CONF_CERTIFICATE_FINGERPRINT,
+    CONF_PROXY_HOST,
+    CONF_PROXY_PORT,
+    CONF_PROXY_TOKEN,
+    CONF_SECONDARY_HOSTS,
+    DEFAULT_PROXY_HOST,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
 from .coordinator import ComfortClickCoordinator
+from .discovery import DiscoveredConfig, DiscoveryCache, discovered_device_ids
+from .handoff import async_take_over
+from .journal import WriteJournal
+from .proxy import ProxyTokenRequiredError, StateProxy
+from .reconfigure import PlatformEntities, async_reconfigure
+from .schedule import ScheduleEngine
+from .services import async_setup_services
+from .util.load_discovery_config import load_discovery_config
+from .util.load_entity_configs import EntityConfigs, load_entity_configs
+from .util.load_settings_config import load_settings_config
+from .util.startup_timings import StartupTimings
 
 if TYPE_CHECKING:
     from collections.abc import Callable
 
     from homeassistant.core import HomeAssistant
-    from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-
-# List of platforms to support. There should be a matching .py file for each,
-# eg <cover.py> and <sensor.py>
-PLATFORMS = [
-    Platform.CLIMATE,
-    Platform.LOCK,
-    Platform.FAN,
-    Platform.SENSOR,
-    Platform.SELECT,
-]
+    from homeassistant.helpers.typing import ConfigType
+
+_LOGGER = logging.getLogger(__name__)
 
 type ApiConfigEntry = ConfigEntry[ApiInstance]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 
 @dataclass
 class RuntimeData:
     """Data class to keep references that are used across the package."""
 
-    coordinator: DataUpdateCoordinator
+    coordinator: ComfortClickCoordinator
     cancel_update_listener: Callable
+    # Entity configuration generated from the panel, shaped like the config file
+    discovered: DiscoveredConfig = field(default_factory=dict)
+    # Configured and discovered entities, read once for all platforms
+    entity_configs: EntityConfigs | None = None
+    # Platforms that were set up, as the ones without entities are skipped
+    platforms: list[Platform] = field(default_factory=list)
+    # Entities of each platform, so configuration changes only replace what changed
+    platform_entities: dict[Platform, PlatformEntities] = field(default_factory=dict)
+    schedule: ScheduleEngine | None = None
+    # Serves the polled state to other local consumers when enabled in the options
+    proxy: StateProxy | None = None
+
+
+async def async_setup(hass: HomeAssistant, _config: ConfigType) -> bool:
+    """Register services that are shared by all config entries."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: ApiConfigEntry) -> bool:
@@ -47,38 +90,138 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ApiConfigEntry) -
     username = config_entry.data[CONF_USERNAME]
     password = config_entry.data[CONF_PASSWORD]
 
+    # Reuse the login and panel of the config flow that just created the entry
+    api = async_take_over(hass, config_entry.data) or ApiInstance(
+        host=host,
+        username=username,
+        password=password,
+        secondary_hosts=parse_hosts(config_entry.data.get(CONF_SECONDARY_HOSTS, "")),
+        # Entries created before verification was configurable did not verify
+        verify_ssl=config_entry.data.get(CONF_VERIFY_SSL, False),
+        certificate_fingerprint=config_entry.data.get(CONF_CERTIFICATE_FINGERPRINT),
+    )
+
+    settings = await load_settings_config()
+    if settings.journal_max_age > 0:
+        api.journal = WriteJournal(
+            hass, config_entry.entry_id, settings.journal_max_age
+        )
+        await api.journal.async_load()
+
+    timings = StartupTimings()
+    with timings.phase("config parse"):
+        configured = await load_entity_configs()
+        device_names = configured.device_ids()
+        discovery = await load_discovery_config()
+    cache = DiscoveryCache(hass, config_entry.entry_id) if discovery.enabled else None
+    cached = await cache.async_load() if cache is not None else None
+    if cache is not None and cached is None:
+        # Nothing discovered yet, which needs the whole panel
+        scope = None
+    else:
+        scope = device_names | discovered_device_ids(cached or {})
     coordinator = ComfortClickCoordinator(
-        hass, host=host, username=username, password=password
+        hass, api=api, device_names=scope, startup_timings=timings
     )
+    coordinator.update_interval = _scan_interval(config_entry)
+    # Created once the coordinator is, whose shutdown releases them also when
+    # setting up fails
+    if settings.capture_path:
+        api.capture = CaptureWriter(hass.config.path(settings.capture_path))
+    if settings.blocking_threshold > 0:
+        api.blocking_detector = BlockingDetector(settings.blocking_threshold)
 
     await coordinator.async_config_entry_first_refresh()
 
+    discovered = cached or {}
+    if cache is not None and api.loaded_whole_panel:
+        with timings.phase("discovery"):
+            # Either nothing was cached or cached devices are gone from their paths
+            discovered = await cache.async_discover(
+                coordinator.data, discovery.patterns, exclude=device_names
+            )
+    entity_configs = await load_entity_configs(discovered) if discovered else configured
+    platforms = entity_configs.platforms()
+
     cancel_update_listener = config_entry.add_update_listener(_async_update_listener)
 
-    hass.data[DOMAIN][config_entry.entry_id] = RuntimeData(
-        coordinator, cancel_update_listener
+    runtime_data = hass.data[DOMAIN][config_entry.entry_id] = RuntimeData(
+        coordinator, cancel_update_listener, discovered, entity_configs, platforms
     )
 
-    await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+    # Platforms are set up concurrently
+    with timings.phase("platforms"):
+        await hass.config_entries.async_forward_entry_setups(config_entry, platforms)
+    timings.log()
+
+    if entity_configs.schedules:
+        runtime_data.schedule = ScheduleEngine(hass, api, entity_configs.schedules)
+        runtime_data.schedule.start()
+    await _async_update_proxy(config_entry, runtime_data)
     return True
 
 
+def _scan_interval(config_entry: ConfigEntry) -> timedelta:
+    return timedelta(
+        seconds=config_entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+    )
+
+
 async def _async_update_listener(
     hass: HomeAssistant, config_entry: ConfigEntry
 ) -> None:
-    """Handle config options update."""
-    await hass.config_entries.async_reload(config_entry.entry_id)
+    """Apply changed options to the running entry, keeping its login and state."""
+    runtime_data = hass.data[DOMAIN][config_entry.entry_id]
+    runtime_data.coordinator.set_update_interval(_scan_interval(config_entry))
+    await _async_update_proxy(config_entry, runtime_data)
+    await async_reconfigure(hass, config_entry)
+
+
+async def _async_update_proxy(
+    config_entry: ConfigEntry, runtime_data: RuntimeData
+) -> None:
+    """Start, restart or stop the state proxy to match the entry options."""
+    options = config_entry.options
+    host = options.get(CONF_PROXY_HOST, DEFAULT_PROXY_HOST)
+    port = options.get(CONF_PROXY_PORT, 0)
+    token = options.get(CONF_PROXY_TOKEN) or None
+    proxy = runtime_data.proxy
+    if proxy is not None:
+        if (proxy.host, proxy.port, proxy.token) == (host, port, token):
+            return
+        await proxy.async_stop()
+        runtime_data.proxy = None
+    if not port:
+        return
+
+    proxy = StateProxy(runtime_data.coordinator, host, port, token)
+    try:
+        await proxy.async_start()
+    except (OSError, ProxyTokenRequiredError):
+        _LOGGER.exception(
+            msg="Failed to start the state proxy", extra={"host": host, "port": port}
+        )
+        return
+    runtime_data.proxy = proxy
 
 
 async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    hass.data[DOMAIN][config_entry.entry_id].cancel_update_listener()
+    runtime_data = hass.data[DOMAIN][config_entry.entry_id]
+    runtime_data.cancel_update_listener()
 
     unload_ok = await hass.config_entries.async_unload_platforms(
-        config_entry, PLATFORMS
+        config_entry, runtime_data.platforms
     )
 
     if unload_ok:
-        hass.data[DOMAIN].pop(config_entry.entry_id)
+        runtime_data = hass.data[DOMAIN].pop(config_entry.entry_id)
+        for platform_entities in runtime_data.platform_entities.values():
+            platform_entities.unload()
+        if runtime_data.schedule is not None:
+            runtime_data.schedule.stop()
+        if runtime_data.proxy is not None:
+            await runtime_data.proxy.async_stop()
+        # The session, capture and detector are released as the coordinator shuts down
 
     return unload_ok
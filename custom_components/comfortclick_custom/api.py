@@ -1,36 +1,527 @@
 """API object class."""
 
-import json
+import asyncio
+import heapq
 import logging
+import math
+import ssl
 import time
 import typing
+import zlib
+from collections import defaultdict
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Mapping
+from contextlib import AbstractContextManager, asynccontextmanager, nullcontext
+from dataclasses import dataclass
 from http import HTTPStatus
+from types import MappingProxyType
 
 import aiohttp
 
+from .catalogue import PanelCatalogue
+from .codec import DEFAULT_CODEC, JsonCodec
+
+if typing.TYPE_CHECKING:
+    from .blocking_detector import BlockingDetector
+    from .capture import CaptureWriter
+    from .journal import WriteJournal
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 _LOGGER = logging.getLogger(__name__)
 
+# How many requests we keep in flight towards a single controller
+MAX_CONCURRENT_REQUESTS = 8
+# Seconds a request may take before it is abandoned
+REQUEST_TIMEOUT = 10
+# Size of the chunks response bodies are read and decompressed in
+READ_CHUNK_SIZE = 64 * 1024
+
+# Keep pooled connections (and their TLS sessions) alive well past the poll interval
+KEEPALIVE_TIMEOUT = 60
+# Weight of the latest round trip in the smoothed round trip time of an endpoint
+RTT_SMOOTHING = 0.3
+# Another endpoint must be this much faster before requests move over to it
+ENDPOINT_SWITCH_RATIO = 0.7
+# Seconds a failed endpoint is skipped for, doubling with each failure in a row
+ENDPOINT_BACKOFF = 2
+MAX_ENDPOINT_BACKOFF = 60
+# How many journaled writes are replayed per second once the controller is back
+JOURNAL_REPLAY_RATE = 2
+# Snapshots share all buckets except the ones holding a changed device
+SNAPSHOT_BUCKETS = 64
+
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli else "gzip, deflate"
+
 
 # Since keys contain \\ and python handles strings differently
 def _sanitise_device_name(device_name: str) -> str:
     return device_name.replace("\\\\", "\\")
 
 
-def _compare_device_names(a: str, b: str) -> bool:
-    return _sanitise_device_name(a) == _sanitise_device_name(b)
+def device_key(device_name: str) -> str:
+    """Get the key that identifies a device in the internal state."""
+    return _sanitise_device_name(device_name)
+
+
+def parse_certificate_fingerprint(fingerprint: str) -> bytes:
+    """Parse a SHA-256 certificate fingerprint written as hex, colons allowed."""
+    return bytes.fromhex(fingerprint.replace(":", "").strip())
+
+
+def parse_hosts(hosts: str) -> list[str]:
+    """Parse comma separated controller addresses."""
+    return [host.strip().rstrip("/") for host in hosts.split(",") if host.strip()]
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Check if a request failed because the controller could not be reached."""
+    if isinstance(error, aiohttp.ClientError | TimeoutError):
+        return True
+    return isinstance(error, HttpStatusNotOkError) and (
+        error.status is None or error.status >= HTTPStatus.INTERNAL_SERVER_ERROR
+    )
+
+
+def panel_path_for_device(device_name: str) -> str:
+    """Get the panel path (parent folder) that contains the device."""
+    return _sanitise_device_name(device_name).rpartition("\\")[0]
+
+
+@dataclass
+class SetValueResult:
+    """Outcome of a single write from a batch."""
+
+    device_name: str
+    value: typing.Any
+    success: bool
+    error: str | None = None
+    # Controller was unreachable, the write is sent once it is back
+    queued: bool = False
+
+
+@dataclass
+class Endpoint:
+    """Address the controller is reachable at, with its measured health."""
+
+    url: str
+    # Smoothed seconds until response headers arrive, None until measured
+    rtt: float | None = None
+    failures: int = 0
+    # time.monotonic() until which the endpoint is skipped after failing
+    retry_after: float = 0
+
+    def is_healthy(self, now: float) -> bool:
+        """Check if requests may be sent to the endpoint."""
+        return self.retry_after <= now
+
+    def record_success(self, elapsed: float) -> None:
+        """Account a request that got a response."""
+        self.rtt = (
+            elapsed
+            if self.rtt is None
+            else self.rtt + RTT_SMOOTHING * (elapsed - self.rtt)
+        )
+        self.failures = 0
+        self.retry_after = 0
+
+    def record_failure(self) -> None:
+        """Account a request that could not reach the controller."""
+        self.failures += 1
+        backoff = min(ENDPOINT_BACKOFF * 2 ** (self.failures - 1), MAX_ENDPOINT_BACKOFF)
+        self.retry_after = time.monotonic() + backoff
+
+
+class StateSnapshot(Mapping[str, typing.Any]):
+    """
+    Immutable view of all device values, keyed by device key.
+
+    Values are split over buckets by key hash. A new snapshot copies only the
+    buckets containing changed devices and shares the rest with the previous one.
+    """
+
+    __slots__ = ("_buckets", "_size", "version")
+
+    def __init__(
+        self,
+        buckets: tuple[Mapping[str, typing.Any], ...] | None = None,
+        version: int = 0,
+    ) -> None:
+        """Wrap buckets that are never changed afterwards."""
+        self._buckets = buckets or (MappingProxyType({}),) * SNAPSHOT_BUCKETS
+        self._size = sum(len(bucket) for bucket in self._buckets)
+        self.version = version
+
+    @classmethod
+    def from_values(
+        cls, values: Mapping[str, typing.Any], version: int = 0
+    ) -> "StateSnapshot":
+        """Build a snapshot of all values."""
+        buckets = [{} for _ in range(SNAPSHOT_BUCKETS)]
+        for key, value in values.items():
+            buckets[hash(key) % SNAPSHOT_BUCKETS][key] = value
+        return cls(tuple(MappingProxyType(bucket) for bucket in buckets), version)
+
+    def evolve(self, changes: Mapping[str, typing.Any]) -> "StateSnapshot":
+        """Get a new snapshot with the changed values applied."""
+        if not changes:
+            return self
+        buckets = list(self._buckets)
+        copied: dict[int, dict] = {}
+        for key, value in changes.items():
+            index = hash(key) % SNAPSHOT_BUCKETS
+            bucket = copied.get(index)
+            if bucket is None:
+                bucket = copied[index] = dict(buckets[index])
+            bucket[key] = value
+        for index, bucket in copied.items():
+            buckets[index] = MappingProxyType(bucket)
+        return StateSnapshot(tuple(buckets), self.version + 1)
+
+    def changes_since(self, earlier: "StateSnapshot") -> dict[str, typing.Any]:
+        """
+        Get the values that differ from an earlier snapshot.
+
+        Buckets shared with the earlier snapshot are skipped without looking at
+        them, so this is cheap for snapshots evolved from one another.
+        """
+        changes = {}
+        buckets = zip(self._buckets, earlier._buckets, strict=True)  # noqa: SLF001
+        for bucket, previous in buckets:
+            if bucket is previous:
+                continue
+            changes.update(
+                (key, value)
+                for key, value in bucket.items()
+                if key not in previous or previous[key] != value
+            )
+        return changes
+
+    def __getitem__(self, key: str) -> typing.Any:
+        """Get the value of a device by its key."""
+        return self._buckets[hash(key) % SNAPSHOT_BUCKETS][key]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over all device keys."""
+        for bucket in self._buckets:
+            yield from bucket
+
+    def __len__(self) -> int:
+        """Get number of devices."""
+        return self._size
+
+    def get_value(self, device_name: str) -> typing.Any:
+        """Get value of a device, None when it is not known."""
+        return self.get(_sanitise_device_name(device_name))
+
+
+@dataclass
+class PayloadStats:
+    """Amount of data received from a single endpoint."""
+
+    responses: int = 0
+    compressed_bytes: int = 0
+    uncompressed_bytes: int = 0
+
+    @property
+    def saved_bytes(self) -> int:
+        """Bytes that compression saved on the wire."""
+        return self.uncompressed_bytes - self.compressed_bytes
+
+
+class _Decompressor(typing.Protocol):
+    def decompress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+
+class _BrotliDecompressor:
+    """Adapts brotli to the zlib decompressor interface."""
+
+    def __init__(self) -> None:
+        self._decompressor = brotli.Decompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.process(data)
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class _DeflateDecompressor:
+    """
+    Decompresses deflate bodies with or without a zlib header.
+
+    Servers disagree on whether deflate means zlib wrapped or raw deflate data,
+    so the header is looked for in the first chunk.
+    """
+
+    def __init__(self) -> None:
+        self._decompressor: typing.Any = None
+
+    def decompress(self, data: bytes) -> bytes:
+        if self._decompressor is None:
+            if not data:
+                return b""
+            zlib_header = (
+                len(data) >= 2  # noqa: PLR2004
+                and data[0] & 0x0F == zlib.DEFLATED
+                and int.from_bytes(data[:2]) % 31 == 0
+            )
+            self._decompressor = zlib.decompressobj(
+                wbits=zlib.MAX_WBITS if zlib_header else -zlib.MAX_WBITS
+            )
+        return self._decompressor.decompress(data)
+
+    def flush(self) -> bytes:
+        return self._decompressor.flush() if self._decompressor is not None else b""
+
+
+# Raised by the decompressors on a corrupt body
+_DECOMPRESSION_ERRORS: tuple[type[Exception], ...] = (
+    (zlib.error, brotli.error) if brotli else (zlib.error,)
+)
+
+
+def _create_decompressor(content_encoding: str) -> _Decompressor | None:
+    """Create a streaming decompressor for the response content encoding."""
+    encoding = content_encoding.strip().lower()
+    if encoding == "gzip":
+        return zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    if encoding == "deflate":
+        return _DeflateDecompressor()
+    if encoding == "br" and brotli:
+        return _BrotliDecompressor()
+    return None
 
 
 class ApiInstance:
     """Class that handles communicating with ComfortClick API."""
 
-    def __init__(self, username: str, password: str, host: str) -> None:
-        """Wire up the Api Instance class with props from constructor."""
+    def __init__(  # noqa: PLR0913
+        self,
+        username: str,
+        password: str,
+        host: str,
+        *,
+        secondary_hosts: Iterable[str] = (),
+        verify_ssl: bool = False,
+        certificate_fingerprint: str | None = None,
+    ) -> None:
+        """
+        Wire up the Api Instance class with props from constructor.
+
+        Secondary hosts are other addresses of the same controller, requests go to
+        whichever healthy address currently answers fastest.
+        """
         self._username = username
         self._password = password
-        self._host = host
+        self.endpoints = [Endpoint(host), *(Endpoint(url) for url in secondary_hosts)]
+        self._endpoint = self.endpoints[0]
+        self._verify_ssl = verify_ssl
+        self._certificate_fingerprint = certificate_fingerprint
+        # Built once per controller and shared by all pooled connections
+        self._ssl: ssl.SSLContext | aiohttp.Fingerprint | bool | None = None
 
         self._state = []
+        # Sanitised device name -> item in self._state
+        self._index = {}
+        # Panel paths that initialize_state loaded, "" being the whole panel
+        self._loaded_paths = [""]
+        self._panel_loaded = False
+        # Sanitised device name -> time.monotonic() the value was last applied or
+        # confirmed by a consistency check, the stalest paths are checked first
+        self._last_updated = {}
+        # Called with the device key whenever a device value changes
+        self._value_listeners: list[Callable[[str], None]] = []
+        # Last published snapshot and values changed since it was published
+        self._snapshot = StateSnapshot()
+        self._pending_changes: dict[str, typing.Any] = {}
+        # Built on first search, dropped whenever devices are added or removed
+        self._catalogue: PanelCatalogue | None = None
+        # Whole panel read for searches when only some paths are loaded, and the
+        # values its devices had then
+        self._panel_catalogue: tuple[PanelCatalogue, dict[str, typing.Any]] | None = (
+            None
+        )
         self._authorized_headers = None
+        self._session: aiohttp.ClientSession | None = None
+        self._payload_stats: defaultdict[str, PayloadStats] = defaultdict(PayloadStats)
+        # Opt-in recorder of GetPanel and GetClientData responses
+        self.capture: CaptureWriter | None = None
+        # Opt-in timing of parsing and applying responses on the event loop
+        self.blocking_detector: BlockingDetector | None = None
+        # Opt-in queue of writes that failed while the controller was unreachable
+        self.journal: WriteJournal | None = None
+        # Encodes and decodes request and response bodies
+        self.codec: JsonCodec = DEFAULT_CODEC
+        self.request_timeout = REQUEST_TIMEOUT
+        # Makes sure an expired token only causes a single login
+        self._login_lock = asyncio.Lock()
+
+    @property
+    def host(self) -> str:
+        """Get the address requests are currently sent to."""
+        return self._endpoint.url
+
+    def _select_endpoint(self) -> Endpoint:
+        """Pick the fastest healthy endpoint, staying on the current one if close."""
+        now = time.monotonic()
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.is_healthy(now)]
+        if not healthy:
+            # Everything is failing, try whichever is due to be retried first
+            return min(self.endpoints, key=lambda endpoint: endpoint.retry_after)
+        # Measured endpoints first, unmeasured ones in the order they were given
+        best = min(
+            healthy, key=lambda endpoint: (endpoint.rtt is None, endpoint.rtt or 0)
+        )
+        current = self._endpoint
+        if (
+            current in healthy
+            and current.rtt is not None
+            and (best.rtt is None or best.rtt >= current.rtt * ENDPOINT_SWITCH_RATIO)
+        ):
+            return current
+        if best is not current:
+            _LOGGER.info(
+                msg="Switching controller endpoint",
+                extra={"from": current.url, "to": best.url, "rtt": best.rtt},
+            )
+            self._endpoint = best
+        return best
+
+    @asynccontextmanager
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        endpoint: Endpoint | None = None,
+        **kwargs: typing.Any,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Send a request to the best endpoint, accounting its round trip time."""
+        endpoint = endpoint or self._select_endpoint()
+        started = time.monotonic()
+        try:
+            async with self._get_session().request(
+                method, f"{endpoint.url}{path}", **kwargs
+            ) as response:
+                endpoint.record_success(time.monotonic() - started)
+                yield response
+        except (aiohttp.ClientConnectionError, TimeoutError):
+            endpoint.record_failure()
+            raise
+
+    async def probe_endpoints(self) -> None:
+        """Measure endpoints requests are not going to, so they can be switched to."""
+        if len(self.endpoints) < 2:  # noqa: PLR2004
+            return
+        await self._ensure_ssl()
+
+        async def _probe(endpoint: Endpoint) -> None:
+            try:
+                # Any response will do, the time it takes is what is measured
+                async with self._request("get", "/", endpoint=endpoint):
+                    pass
+            except (aiohttp.ClientError, TimeoutError) as e:
+                _LOGGER.debug(
+                    msg="Endpoint probe failed",
+                    extra={"endpoint": endpoint.url, "error": repr(e)},
+                )
+
+        await asyncio.gather(
+            *(
+                _probe(endpoint)
+                for endpoint in self.endpoints
+                if endpoint is not self._endpoint
+            )
+        )
+
+    def _build_ssl(self) -> ssl.SSLContext | aiohttp.Fingerprint | bool:
+        """Build the TLS settings used for every connection to the controller."""
+        if self._certificate_fingerprint:
+            # Controllers use self-signed certificates, so pin the certificate
+            return aiohttp.Fingerprint(
+                parse_certificate_fingerprint(self._certificate_fingerprint)
+            )
+        if self._verify_ssl:
+            return ssl.create_default_context()
+        return False
+
+    async def _ensure_ssl(self) -> None:
+        """Build the TLS settings outside the event loop, as loading certs blocks."""
+        if self._ssl is None:
+            self._ssl = await asyncio.get_running_loop().run_in_executor(
+                None, self._build_ssl
+            )
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session shared by all requests to the controller."""
+        if self._ssl is None:
+            self._ssl = self._build_ssl()
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=MAX_CONCURRENT_REQUESTS,
+                    ssl=self._ssl,
+                    keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ),
+                # Token is passed explicitly with the authorized headers
+                cookie_jar=aiohttp.DummyCookieJar(),
+                # Bodies are decompressed in _read_body to account payload sizes
+                auto_decompress=False,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            )
+        return self._session
+
+    @property
+    def payload_stats(self) -> dict[str, PayloadStats]:
+        """Get amount of data received per endpoint."""
+        return dict(self._payload_stats)
+
+    async def _read_body(
+        self, response: aiohttp.ClientResponse, endpoint: str
+    ) -> bytes:
+        """Read and decompress the response body chunk by chunk as it arrives."""
+        decompressor = _create_decompressor(
+            response.headers.get(aiohttp.hdrs.CONTENT_ENCODING, "")
+        )
+        compressed_bytes = 0
+        chunks = []
+        try:
+            async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+                compressed_bytes += len(chunk)
+                chunks.append(decompressor.decompress(chunk) if decompressor else chunk)
+            if decompressor:
+                chunks.append(decompressor.flush())
+        except _DECOMPRESSION_ERRORS as e:
+            msg = f"Failed to decompress {endpoint} response: {e}"
+            raise DecompressionError(msg) from e
+        body = b"".join(chunks)
+
+        stats = self._payload_stats[endpoint]
+        stats.responses += 1
+        stats.compressed_bytes += compressed_bytes
+        stats.uncompressed_bytes += len(body)
+        return body
+
+    async def _read_text(self, response: aiohttp.ClientResponse, endpoint: str) -> str:
+        """Read the response body as text."""
+        body = await self._read_body(response, endpoint)
+        return body.decode(response.charset or "utf-8", errors="replace")
+
+    async def _read_json(
+        self, response: aiohttp.ClientResponse, endpoint: str
+    ) -> typing.Any:
+        """Read the response body as json."""
+        return self.codec.loads(await self._read_body(response, endpoint))
+
+    async def close(self) -> None:
+        """Close the pooled session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     def _set_state_value(self, device_name: str, value: typing.Any) -> None:
         """Update the internal state of a component."""
@@ -41,55 +532,257 @@ class ApiInstance:
                 "value": value,
             },
         )
-        for item in self._state:
-            if _compare_device_names(item.get("DeviceName"), device_name):
-                item["Value"] = value
+        key = _sanitise_device_name(device_name)
+        item = self._index.get(key)
+        if item is not None:
+            changed = item.get("Value") != value
+            item["Value"] = value
+            self._last_updated[key] = time.monotonic()
+            if changed:
+                self._notify_value_changed(key)
+
+    def add_value_listener(self, listener: Callable[[str], None]) -> Callable[[], None]:
+        """Listen for device value changes, returns a function removing the listener."""
+        self._value_listeners.append(listener)
+        return lambda: self._value_listeners.remove(listener)
+
+    def _notify_value_changed(self, key: str) -> None:
+        self._pending_changes[key] = self._index[key].get("Value")
+        for listener in self._value_listeners:
+            listener(key)
+
+    def _measure(self, name: str) -> AbstractContextManager:
+        """Time a step with the blocking detector, if one is attached."""
+        if self.blocking_detector is None:
+            return nullcontext()
+        return self.blocking_detector.measure(f"api.{name}")
+
+    def _replace_state(self, items: list[dict]) -> None:
+        """Replace the whole internal state with items loaded from the panel."""
+        with self._measure("replace_state"):
+            self._apply_panel(items)
+
+    def _apply_panel(self, items: list[dict]) -> None:
+        self._state = items
+        self._catalogue = None
+        self._index = {
+            _sanitise_device_name(item.get("DeviceName")): item for item in items
+        }
+        now = time.monotonic()
+        self._last_updated = dict.fromkeys(self._index, now)
+        for key in self._index:
+            self._notify_value_changed(key)
+        # Devices missing from the new panel must not linger in the snapshot
+        self._snapshot = StateSnapshot.from_values(
+            {key: item.get("Value") for key, item in self._index.items()},
+            self._snapshot.version + 1,
+        )
+        self._pending_changes.clear()
+
+    def _merge_state(self, items: list[dict]) -> None:
+        """Merge items loaded from a part of the panel into the internal state."""
+        with self._measure("merge_state"):
+            self._merge_items(items)
+
+    def _merge_items(self, items: list[dict]) -> None:
+        for item in items:
+            key = _sanitise_device_name(item.get("DeviceName"))
+            existing = self._index.get(key)
+            changed = existing is None or existing.get("Value") != item.get("Value")
+            if existing is None:
+                self._state.append(item)
+                self._index[key] = item
+                self._catalogue = None
+            else:
+                existing["Value"] = item.get("Value")
+            self._last_updated[key] = time.monotonic()
+            if changed:
+                self._notify_value_changed(key)
+
+    @property
+    def loaded_whole_panel(self) -> bool:
+        """Check if initialize_state loaded the whole panel instead of some paths."""
+        return self._loaded_paths == [""]
+
+    @property
+    def is_connected(self) -> bool:
+        """Check if the api has logged in, the token may have expired since."""
+        return self._authorized_headers is not None
+
+    @property
+    def has_panel(self) -> bool:
+        """Check if initialize_state has loaded the panel."""
+        return self._panel_loaded
+
+    def has_device(self, device_name: str) -> bool:
+        """Check if the device is present in the internal state."""
+        return _sanitise_device_name(device_name) in self._index
+
+    def last_updated(self, device_name: str) -> float | None:
+        """Get time.monotonic() of when the device value was last applied."""
+        return self._last_updated.get(_sanitise_device_name(device_name))
 
     async def set_value(self, device_name: str, value: typing.Any) -> None:
-        """Communicate with ComfortClick API."""
+        """
+        Communicate with ComfortClick API, logging in again if the token expired.
+
+        With a journal, writes failing as the controller is unreachable are queued.
+        """
+        await self._write(device_name, value)
+
+    async def _write(self, device_name: str, value: typing.Any) -> bool:
+        """Write a value, returns True when it was queued in the journal instead."""
+        try:
+            await self._set_value_logged_in(device_name, value)
+        except (HttpStatusNotOkError, aiohttp.ClientError, TimeoutError) as e:
+            if self.journal is None or not is_transient_error(e):
+                raise
+            _LOGGER.warning(
+                msg="Controller unreachable, queued write",
+                extra={"device_name": device_name, "error": repr(e)},
+            )
+            await self.journal.async_enqueue(device_name, value)
+            return True
+        if self.journal:
+            # A journaled write to the device would now overwrite a newer value
+            self.journal.discard(device_name)
+        return False
+
+    async def _set_value_logged_in(self, device_name: str, value: typing.Any) -> None:
+        """Send a value, logging in again if the token expired."""
+        headers = self._authorized_headers
+        try:
+            return await self._send_value(device_name, value)
+        except HttpStatusNotOkError as e:
+            if not e.is_authorization_error:
+                raise
+        await self._reauthenticate(headers)
+        return await self._send_value(device_name, value)
+
+    async def _send_value(self, device_name: str, value: typing.Any) -> None:
+        """Send a single /SetValue request."""
         payload = {
             "objectName": _sanitise_device_name(device_name),
             "valueName": "Value",
             "value": value,
         }
-        url = f"{self._host}/SetValue"
-        _LOGGER.debug(
-            msg="Calling /SetValue in ComfortClick API",
-            extra={
-                "device_name": device_name,
-                "value": value,
-                "payload": json.dumps(payload, separators=(",", ":")),
-            },
-        )
+        body = self.codec.dumps(payload)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                msg="Calling /SetValue in ComfortClick API",
+                extra={"device_name": device_name, "value": value, "payload": body},
+            )
         async with (
-            aiohttp.ClientSession(headers=self._authorized_headers) as session,
-            session.post(url, json=payload, ssl=False) as response,
+            self._request(
+                "post", "/SetValue", data=body, headers=self._authorized_headers
+            ) as response,
         ):
             if response.status != HTTPStatus.OK:
                 raise HttpStatusNotOkError(
                     {
                         "message": "Failed to set value",
                         "status": response.status,
-                        "text": await response.text(),
+                        "text": await self._read_text(response, "SetValue"),
                     }
                 )
-            result = await response.json()
+            result = await self._read_json(response, "SetValue")
             _LOGGER.debug(
                 msg="Received /SetValue response from ComfortClick API",
-                extra={
-                    "device_name": device_name,
-                    "value": value,
-                    "payload": json.dumps(payload, separators=(",", ":")),
-                },
+                extra={"device_name": device_name, "value": value, "result": result},
             )
             return result
 
+    async def set_values(
+        self, values: list[tuple[str, typing.Any]]
+    ) -> list[SetValueResult]:
+        """Write a batch of values concurrently, reporting the outcome per item."""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        async def _set_one(device_name: str, value: typing.Any) -> SetValueResult:
+            async with semaphore:
+                try:
+                    queued = await self._write(device_name, value)
+                except (HttpStatusNotOkError, aiohttp.ClientError, TimeoutError) as e:
+                    return SetValueResult(
+                        device_name, value, success=False, error=str(e)
+                    )
+            return SetValueResult(device_name, value, success=True, queued=queued)
+
+        _LOGGER.debug(msg="Setting values in batch", extra={"count": len(values)})
+        return list(
+            await asyncio.gather(*(_set_one(name, value) for name, value in values))
+        )
+
+    async def replay_journal(self) -> int:
+        """
+        Send journaled writes in order, at most JOURNAL_REPLAY_RATE per second.
+
+        Stops at the first write the controller is unreachable for, writes it
+        rejects otherwise are dropped. Returns how many writes were sent.
+        """
+        if not self.journal:
+            return 0
+        sent = 0
+        for write in self.journal.pending():
+            if sent:
+                await asyncio.sleep(1 / JOURNAL_REPLAY_RATE)
+            # A value written to the device meanwhile is newer than the journaled one
+            if not self.journal.is_pending(write):
+                continue
+            try:
+                await self._set_value_logged_in(write.device_name, write.value)
+            except (HttpStatusNotOkError, aiohttp.ClientError, TimeoutError) as e:
+                if is_transient_error(e):
+                    return sent
+                _LOGGER.warning(
+                    msg="Controller rejected journaled write, dropping it",
+                    extra={"device_name": write.device_name, "error": repr(e)},
+                )
+            else:
+                sent += 1
+            self.journal.remove(write)
+        if sent:
+            _LOGGER.info(msg="Replayed journaled writes", extra={"writes": sent})
+        return sent
+
+    def snapshot(self) -> StateSnapshot:
+        """Publish the values changed since the last snapshot as a new snapshot."""
+        if self._pending_changes:
+            self._snapshot = self._snapshot.evolve(self._pending_changes)
+            self._pending_changes = {}
+        return self._snapshot
+
+    def catalogue(self) -> PanelCatalogue:
+        """Get the search index over the names of all loaded devices."""
+        if self._catalogue is None:
+            self._catalogue = PanelCatalogue(self._index)
+        return self._catalogue
+
+    async def load_catalogue(
+        self,
+    ) -> tuple[PanelCatalogue, Mapping[str, typing.Any]]:
+        """
+        Get the search index over all devices on the panel and their values.
+
+        When only some panel paths are loaded the whole panel is read on the first
+        call and kept, so devices outside the loaded paths are found too. Their
+        values are the ones they had when the panel was read.
+        """
+        if self.loaded_whole_panel:
+            return self.catalogue(), {}
+        if self._panel_catalogue is None:
+            _LOGGER.info("Loading whole panel to search it")
+            values = {
+                _sanitise_device_name(item.get("DeviceName")): item.get("Value")
+                for item in await self._get_panel("")
+            }
+            self._panel_catalogue = (PanelCatalogue(values), values)
+        return self._panel_catalogue
+
     def get_value(self, device_name: str) -> typing.Any:
         """Get value for device from internal state."""
-        value = None
-        for item in self._state:
-            if _compare_device_names(item.get("DeviceName"), device_name):
-                value = item.get("Value")
+        item = self._index.get(_sanitise_device_name(device_name))
+        value = None if item is None else item.get("Value")
 
         _LOGGER.debug(
             msg="Getting component internal state value.",
@@ -104,7 +797,7 @@ class ApiInstance:
                 extra={
                     "device_name": device_name,
                     "value": value,
-                    "payload": json.dumps(self._state, separators=(",", ":")),
+                    "payload": self.codec.dumps_str(self._state),
                 },
             )
         return value
@@ -124,25 +817,30 @@ class ApiInstance:
             "accept": "application/json, text/javascript, */*; q=0.01",
             "accept-language": "en-US,en;q=0.9,et;q=0.8,ru;q=0.7,zh-CN;q=0.6,zh;q=0.5",
             "content-type": "application/json; charset=UTF-8",
+            "accept-encoding": ACCEPT_ENCODING,
         }
 
-        login_url = f"{self._host}/Login"
         _LOGGER.info(msg="Connecting to API")
+        await self._ensure_ssl()
 
         async with (
-            aiohttp.ClientSession(headers=default_headers) as session,
-            session.post(login_url, json=body, ssl=False) as response,
+            self._request(
+                "post",
+                "/Login",
+                data=self.codec.dumps(body),
+                headers=default_headers,
+            ) as response,
         ):
             if response.status != HTTPStatus.OK:
                 raise HttpStatusNotOkError(
                     {
                         "message": "Failed to login",
                         "status": response.status,
-                        "text": await response.text(),
+                        "text": await self._read_text(response, "Login"),
                     }
                 )
 
-            login_response = await response.json()
+            login_response = await self._read_json(response, "Login")
             if login_response.get("Status") != "OK":
                 raise AuthorizationError(
                     {
@@ -163,77 +861,254 @@ class ApiInstance:
             _LOGGER.info(msg="Connected to API")
         return True
 
-    async def initialize_state(self) -> None:
-        """Fetch initial state from ComfortClick."""
-        url = f"{self._host}/GetPanel"
-        body = {"Path": ""}
-        _LOGGER.info(msg="Getting initial state")
+    async def _fetch_panel(self, path: str) -> bytes:
+        """Fetch the raw GetPanel body for a panel path."""
+        body = {"Path": path}
+        started = time.monotonic()
 
         async with (
-            aiohttp.ClientSession(headers=self._authorized_headers) as session,
-            session.post(url, json=body, ssl=False) as response,
+            self._request(
+                "post",
+                "/GetPanel",
+                data=self.codec.dumps(body),
+                headers=self._authorized_headers,
+            ) as response,
         ):
             if response.status != HTTPStatus.OK:
                 raise HttpStatusNotOkError(
                     {
-                        "message": "Failed to get initial state",
+                        "message": "Failed to get panel",
+                        "path": path,
                         "status": response.status,
-                        "text": await response.text(),
+                        "text": await self._read_text(response, "GetPanel"),
                     }
                 )
 
-            data = await response.json()
-            self._state = data.get("ThemeObject", {}).get("ValueUpdates", [])
+            data = await self._read_body(response, "GetPanel")
+        if self.capture is not None:
+            self.capture.write("GetPanel", time.monotonic() - started, data, path)
+        return data
+
+    async def _get_panel(self, path: str) -> list[dict]:
+        """Fetch the values of all objects under a panel path."""
+        body = await self._fetch_panel(path)
+        with self._measure("parse GetPanel"):
+            data = self.codec.loads(body)
+        return data.get("ThemeObject", {}).get("ValueUpdates", [])
+
+    async def initialize_state(self, device_names: Iterable[str] | None = None) -> None:
+        """
+        Fetch initial state from ComfortClick.
+
+        When device names are given only the panel paths containing them are loaded,
+        falling back to the whole panel if any of the devices was not found there.
+        """
+        device_names = [name for name in device_names or [] if name]
+        paths = sorted({panel_path_for_device(name) for name in device_names})
+        if paths and "" not in paths:
+            _LOGGER.info(msg="Getting initial state", extra={"paths": len(paths)})
+            panels = await asyncio.gather(*(self._get_panel(path) for path in paths))
+            self._replace_state([item for panel in panels for item in panel])
+            self._loaded_paths = paths
+            self._panel_loaded = True
+
+            missing = [name for name in device_names if not self.has_device(name)]
+            if not missing:
+                return
+            _LOGGER.warning(
+                msg="Devices missing from their panel paths, loading whole panel",
+                extra={"missing": missing},
+            )
+
+        _LOGGER.info(msg="Getting initial state")
+        self._replace_state(await self._get_panel(""))
+        self._loaded_paths = [""]
+        self._panel_loaded = True
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            # Encoding the whole state is costly, so only done when it is logged
             _LOGGER.debug(
                 msg="Loaded initial state from ComfortClick API.",
-                extra={
-                    "payload": json.dumps(self._state, separators=(",", ":")),
-                },
+                extra={"payload": self.codec.dumps_str(self._state)},
             )
 
-    async def poll(self) -> None:
-        """Poll data from ComfortClick."""
-        url = f"{self._host}/GetClientData?_={int(time.time())}"
+    async def load_devices(self, device_names: Iterable[str]) -> bool:
+        """
+        Load the panel paths of devices that are missing, keeping the loaded state.
+
+        Returns whether anything was loaded. Devices missing from a path that was
+        loaded already are not on the panel, so their path is not loaded again.
+        """
+        if self.loaded_whole_panel:
+            return False
+        paths = sorted(
+            {
+                panel_path_for_device(name)
+                for name in device_names
+                if name and not self.has_device(name)
+            }
+            - set(self._loaded_paths)
+        )
+        if not paths:
+            return False
+        if "" in paths:
+            await self.initialize_state()
+            return True
+        _LOGGER.info(msg="Loading panel paths of new devices", extra={"paths": paths})
+        panels = await asyncio.gather(*(self._get_panel(path) for path in paths))
+        for panel in panels:
+            self._merge_state(panel)
+        self._loaded_paths = sorted([*self._loaded_paths, *paths])
+        return True
+
+    async def refresh_path(self, path: str) -> None:
+        """Reload the values of a single panel path."""
+        _LOGGER.debug(msg="Refreshing panel path", extra={"path": path})
+        self._merge_state(await self._get_panel(path))
+
+    async def refresh_device(self, device_name: str) -> None:
+        """Reload the panel path that contains the device."""
+        await self.refresh_path(panel_path_for_device(device_name))
+
+    def _stalest_paths(self, count: int) -> list[str]:
+        """Get the panel paths holding the devices confirmed the longest time ago."""
+        oldest: dict[str, float] = {}
+        for key, updated in self._last_updated.items():
+            path = panel_path_for_device(key)
+            if updated < oldest.get(path, math.inf):
+                oldest[path] = updated
+        return heapq.nsmallest(count, oldest, key=oldest.__getitem__)
+
+    async def check_consistency(self, sample_size: int) -> list[str]:
+        """
+        Compare the stalest panel paths against a fresh read.
+
+        Only devices whose value drifted from the fresh read are resynchronised,
+        the others are marked as confirmed so other paths are checked next time.
+        Returns the names of the drifted devices.
+        """
+        sample = self._stalest_paths(sample_size)
+        if not sample:
+            return []
+
+        started = time.monotonic()
+        panels = await asyncio.gather(*(self._get_panel(path) for path in sample))
+        drifted = []
+        now = time.monotonic()
+        read = set()
+        for item in (item for panel in panels for item in panel):
+            device_name = item.get("DeviceName")
+            key = _sanitise_device_name(device_name)
+            read.add(key)
+            if self._last_updated.get(key, started) > started:
+                # A poll during the read brought a newer value than the read has
+                continue
+            current = self._index.get(key)
+            if current is not None and current.get("Value") == item.get("Value"):
+                self._last_updated[key] = now
+                continue
+            drifted.append(device_name)
+            self._merge_state([item])
+
+        # Devices gone from the panel would keep their path the stalest forever
+        sampled = set(sample)
+        for key in [
+            key
+            for key in self._last_updated
+            if key not in read and panel_path_for_device(key) in sampled
+        ]:
+            del self._last_updated[key]
+
+        if drifted:
+            _LOGGER.warning(
+                msg="Resynchronised devices that drifted from the controller",
+                extra={"devices": drifted},
+            )
+        return drifted
+
+    async def _reauthenticate(self, expired_headers: dict | None) -> None:
+        """Login again unless a concurrent request already replaced the token."""
+        async with self._login_lock:
+            if self._authorized_headers is expired_headers:
+                _LOGGER.warning(msg="Token expired, logging in again")
+                await self.connect()
+
+    async def resync(self) -> None:
+        """Reload only the panel paths that were loaded before."""
+        await asyncio.gather(*(self.refresh_path(path) for path in self._loaded_paths))
+
+    async def reconnect(self) -> None:
+        """Login again and reload only the panel paths that were loaded before."""
+        await self._reauthenticate(self._authorized_headers)
+        await self.resync()
+
+    async def _fetch_client_data(self) -> bytes:
+        """Fetch the raw GetClientData body with updates since the last poll."""
+        path = f"/GetClientData?_={int(time.time())}"
+        started = time.monotonic()
         async with (
-            aiohttp.ClientSession(headers=self._authorized_headers) as session,
-            session.post(url, ssl=False) as response,
+            self._request("post", path, headers=self._authorized_headers) as response,
         ):
             if response.status != HTTPStatus.OK:
                 raise HttpStatusNotOkError(
                     {
                         "message": "Failed to poll",
                         "status": response.status,
-                        "text": await response.text(),
+                        "text": await self._read_text(response, "GetClientData"),
                     }
                 )
 
-            response_data = await response.json()
+            data = await self._read_body(response, "GetClientData")
+        if self.capture is not None:
+            self.capture.write("GetClientData", time.monotonic() - started, data)
+        return data
+
+    async def poll(self) -> None:
+        """Poll data from ComfortClick."""
+        body = await self._fetch_client_data()
+        with self._measure("parse GetClientData"):
+            response_data = self.codec.loads(body)
+        with self._measure("apply GetClientData"):
             for item in response_data.get("PropertyUpdates", []):
                 if item.get("PropertyName") == "Value":
                     self._set_state_value(item.get("DeviceName"), item.get("Value"))
 
     async def disconnect(self) -> None:
         """Log out from ComfortClick API."""
-        url = f"{self._host}/Logout"
         _LOGGER.info(msg="Disconnecting from API")
 
         async with (
-            aiohttp.ClientSession(headers=self._authorized_headers) as session,
-            session.get(url, ssl=False) as response,
+            self._request(
+                "get", "/Logout", headers=self._authorized_headers
+            ) as response,
         ):
             if response.status != HTTPStatus.OK:
                 raise HttpStatusNotOkError(
                     {
                         "message": "Failed to log out",
                         "status": response.status,
-                        "text": await response.text(),
+                        "text": await self._read_text(response, "Logout"),
                     }
                 )
+        await self.close()
 
 
 class HttpStatusNotOkError(Exception):
     """Raised when http request status is not 200."""
 
+    @property
+    def status(self) -> int | None:
+        """Http status the request failed with."""
+        return self.args[0].get("status") if self.args else None
+
+    @property
+    def is_authorization_error(self) -> bool:
+        """Check if the request failed because the token is not valid."""
+        return self.status in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN)
+
+
+class DecompressionError(aiohttp.ClientPayloadError):
+    """Raised when a compressed response body is corrupt."""
+
 
 class AuthorizationError(Exception):
     """Raised when authorization fails."""
@@ -0,0 +1,117 @@
+"""Times callbacks that run on the event loop and reports the ones that block it."""
+
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+_LOGGER = logging.getLogger(__name__)
+
+# How many innermost frames of a blocking callback are logged
+STACK_DEPTH = 15
+
+
+@dataclass
+class CallbackStats:
+    """Cumulative timings of a single callback."""
+
+    calls: int = 0
+    cpu_time: float = 0
+    wall_time: float = 0
+    slowest: float = 0
+
+
+@dataclass
+class _Section:
+    name: str
+    started: float
+    thread_id: int
+    # Stack sampled by the watchdog while the section was over the threshold
+    stack: str | None = None
+
+
+class BlockingDetector:
+    """
+    Measures named sections of code that run on the event loop.
+
+    A watchdog thread samples the stack of a section that is still running once it
+    exceeds the threshold, so the log shows where it blocked and not just who.
+    """
+
+    def __init__(self, threshold: float) -> None:
+        """Start the watchdog, sections longer than threshold seconds are logged."""
+        self.threshold = threshold
+        self._stats: dict[str, CallbackStats] = {}
+        self._section: _Section | None = None
+        self._stopped = threading.Event()
+        self._watchdog = threading.Thread(
+            target=self._watch, name="comfortclick_blocking_detector", daemon=True
+        )
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        """Stop the watchdog thread."""
+        self._stopped.set()
+
+    def stats(self) -> dict[str, CallbackStats]:
+        """Get timings of every measured section, most cpu time first."""
+        return dict(
+            sorted(self._stats.items(), key=lambda item: item[1].cpu_time, reverse=True)
+        )
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """Time the wrapped code and log it when it blocked for too long."""
+        section = _Section(name, time.perf_counter(), threading.get_ident())
+        outer, self._section = self._section, section
+        cpu_started = time.thread_time()
+        try:
+            yield
+        finally:
+            cpu_time = time.thread_time() - cpu_started
+            wall_time = time.perf_counter() - section.started
+            self._section = outer
+            # Time of nested sections is also counted in the section around them
+            self._record(section, cpu_time, wall_time)
+
+    def _record(self, section: _Section, cpu_time: float, wall_time: float) -> None:
+        stats = self._stats.get(section.name)
+        if stats is None:
+            stats = self._stats[section.name] = CallbackStats()
+        stats.calls += 1
+        stats.cpu_time += cpu_time
+        stats.wall_time += wall_time
+        if wall_time <= stats.slowest:
+            return
+        stats.slowest = wall_time
+        # Only log when an offender gets slower, not on every slow call
+        if wall_time > self.threshold:
+            _LOGGER.warning(
+                msg="Callback blocked the event loop",
+                extra={
+                    "callback": section.name,
+                    "wall_time": round(wall_time, 4),
+                    "cpu_time": round(cpu_time, 4),
+                    "stack": section.stack
+                    or "".join(traceback.format_stack(limit=STACK_DEPTH)),
+                },
+            )
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.threshold / 2):
+            section = self._section
+            if (
+                section is None
+                or section.stack is not None
+                or time.perf_counter() - section.started <= self.threshold
+            ):
+                continue
+            frame = sys._current_frames().get(section.thread_id)  # noqa: SLF001
+            if frame is not None:
+                section.stack = "".join(
+                    traceback.format_stack(frame, limit=STACK_DEPTH)
+                )
@@ -0,0 +1,198 @@
+"""Records controller responses to a file and replays them for offline load testing."""
+
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from collections import defaultdict, deque
+from collections.abc import Awaitable, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from .api import ApiInstance
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"COMFORTCLICK-CAPTURE-1\n"
+ENDPOINTS = ("GetPanel", "GetClientData")
+# Endpoint, wall clock time received, seconds the request took, path and body length
+FRAME = struct.Struct("<BddII")
+
+
+class InvalidCaptureError(Exception):
+    """Raised when a file is not a capture file."""
+
+
+class ReplayFinishedError(Exception):
+    """Raised when a replay runs out of recorded responses."""
+
+
+@dataclass
+class CaptureRecord:
+    """Single recorded response."""
+
+    endpoint: str
+    timestamp: float
+    elapsed: float
+    path: str
+    body: bytes
+
+
+class CaptureWriter:
+    """Appends responses to a capture file from a background thread."""
+
+    def __init__(self, path: str | Path) -> None:
+        """Prepare the writer, the file is opened with the first response."""
+        self._path = Path(path)
+        self._file: BinaryIO | None = None
+        # A single worker keeps the records in the order they were received
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="comfortclick_capture"
+        )
+
+    def write(self, endpoint: str, elapsed: float, body: bytes, path: str = "") -> None:
+        """Queue a response to be appended without blocking the event loop."""
+        self._executor.submit(self._append, endpoint, time.time(), elapsed, path, body)
+
+    def _append(
+        self, endpoint: str, timestamp: float, elapsed: float, path: str, body: bytes
+    ) -> None:
+        try:
+            if self._file is None:
+                is_new = not self._path.exists() or self._path.stat().st_size == 0
+                self._file = self._path.open("ab")
+                if is_new:
+                    self._file.write(MAGIC)
+            encoded_path = path.encode()
+            compressed = zlib.compress(body)
+            self._file.write(
+                FRAME.pack(
+                    ENDPOINTS.index(endpoint),
+                    timestamp,
+                    elapsed,
+                    len(encoded_path),
+                    len(compressed),
+                )
+            )
+            self._file.write(encoded_path)
+            self._file.write(compressed)
+            self._file.flush()
+        except OSError:
+            _LOGGER.exception("Failed to write capture", extra={"path": self._path})
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    async def async_close(self) -> None:
+        """Write out queued responses and close the file."""
+        self._executor.submit(self._close_file)
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+
+def read_capture(path: str | Path) -> Iterator[CaptureRecord]:
+    """Stream records from a memory-mapped capture file."""
+    with Path(path).open("rb") as file:
+        # Nothing was recorded into it yet, which mmap refuses to map
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from _read_records(data, path)
+
+
+def _read_records(data: mmap.mmap, path: str | Path) -> Iterator[CaptureRecord]:
+    if data[: len(MAGIC)] != MAGIC:
+        raise InvalidCaptureError(path)
+    offset = len(MAGIC)
+    while offset + FRAME.size <= len(data):
+        code, timestamp, elapsed, path_length, body_length = FRAME.unpack_from(
+            data, offset
+        )
+        offset += FRAME.size
+        if offset + path_length + body_length > len(data):
+            # Last record was cut short when the capture was interrupted
+            return
+        record_path = data[offset : offset + path_length].decode()
+        offset += path_length
+        body = zlib.decompress(data[offset : offset + body_length])
+        offset += body_length
+        yield CaptureRecord(ENDPOINTS[code], timestamp, elapsed, record_path, body)
+
+
+class ReplayApiInstance(ApiInstance):
+    """ApiInstance that serves responses from a capture instead of a controller."""
+
+    def __init__(self, path: str | Path) -> None:
+        """Open the capture, GetPanel and GetClientData are read independently."""
+        super().__init__(username="", password="", host="")
+        self._panel_records = (
+            record for record in read_capture(path) if record.endpoint == "GetPanel"
+        )
+        self._poll_records = (
+            record
+            for record in read_capture(path)
+            if record.endpoint == "GetClientData"
+        )
+        # Panels read ahead while looking for a specific path
+        self._panels: defaultdict[str, deque[bytes]] = defaultdict(deque)
+        self._next_poll = next(self._poll_records, None)
+
+    @property
+    def next_poll_timestamp(self) -> float | None:
+        """Get when the next recorded poll was received, None when there are none."""
+        return None if self._next_poll is None else self._next_poll.timestamp
+
+    async def connect(self) -> bool:
+        """Do nothing as there is no controller to log in to."""
+        return True
+
+    async def disconnect(self) -> None:
+        """Do nothing as there is no controller to log out from."""
+
+    async def _fetch_panel(self, path: str) -> bytes:
+        """Serve the next recorded GetPanel response for the path."""
+        while not self._panels[path]:
+            record = next(self._panel_records, None)
+            if record is None:
+                msg = f"No recorded panel left for path {path!r}"
+                raise ReplayFinishedError(msg)
+            self._panels[record.path].append(record.body)
+        return self._panels[path].popleft()
+
+    async def _fetch_client_data(self) -> bytes:
+        """Serve the next recorded GetClientData response."""
+        if self._next_poll is None:
+            msg = "No recorded polls left"
+            raise ReplayFinishedError(msg)
+        body = self._next_poll.body
+        self._next_poll = next(self._poll_records, None)
+        return body
+
+
+async def replay_capture(
+    api: ReplayApiInstance,
+    speed: float | None = 1,
+    refresh: Callable[[], Awaitable[object]] | None = None,
+) -> int:
+    """
+    Feed recorded polls through refresh, paced at speed times the recorded rate.
+
+    Pass the coordinator's async_refresh as refresh to include entity updates,
+    and None as speed to replay as fast as possible. Returns the polls replayed.
+    """
+    refresh = refresh or api.poll
+    previous = None
+    polls = 0
+    while (timestamp := api.next_poll_timestamp) is not None:
+        if speed and previous is not None:
+            await asyncio.sleep(max(0, (timestamp - previous) / speed))
+        previous = timestamp
+        await refresh()
+        polls += 1
+    return polls
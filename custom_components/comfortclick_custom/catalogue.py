@@ -0,0 +1,96 @@
+"""Searchable catalogue of all objects on the controller panel."""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from typing import Any, Literal
+
+# Separates names in the joined string, can not appear in a device name
+_SEPARATOR = "\n"
+
+type MatchMode = Literal["prefix", "contains"]
+
+
+@dataclass
+class CatalogueEntry:
+    """Device found in the catalogue."""
+
+    device_name: str
+    value: Any
+
+
+class PanelCatalogue:
+    """
+    Case insensitive index over device names.
+
+    Names are kept sorted so prefix searches are a binary search. Substring searches
+    run str.find over all names joined into a single string, which is much faster
+    than testing every name on its own.
+    """
+
+    def __init__(self, device_names: Iterable[str]) -> None:
+        """Index the device names, the catalogue never changes afterwards."""
+        self._names = sorted(device_names, key=str.casefold)
+        self._folded = [name.casefold() for name in self._names]
+        self._joined = _SEPARATOR.join(self._folded)
+        # Position in self._joined where each name starts
+        self._offsets = array("q", [0]) * len(self._names)
+        offset = 0
+        for i, name in enumerate(self._folded):
+            self._offsets[i] = offset
+            offset += len(name) + len(_SEPARATOR)
+
+    def __len__(self) -> int:
+        """Get number of devices in the catalogue."""
+        return len(self._names)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over device names in case insensitive order."""
+        return iter(self._names)
+
+    def _prefix_matches(self, query: str) -> Iterator[int]:
+        for i in range(bisect_left(self._folded, query), len(self._folded)):
+            if not self._folded[i].startswith(query):
+                return
+            yield i
+
+    def _substring_matches(self, query: str) -> Iterator[int]:
+        position = self._joined.find(query)
+        while position != -1:
+            i = bisect_right(self._offsets, position) - 1
+            yield i
+            if i + 1 == len(self._offsets):
+                return
+            # Continue from the next name, so a name matching twice is found once
+            position = self._joined.find(query, self._offsets[i + 1])
+
+    def search(
+        self,
+        query: str,
+        values: Mapping[str, Any],
+        mode: MatchMode = "contains",
+        limit: int | None = None,
+    ) -> list[CatalogueEntry]:
+        """
+        Find devices by name, in case insensitive order of their names.
+
+        With contains, devices whose current value contains the query also match.
+        """
+        query = query.casefold()
+        if _SEPARATOR in query:
+            return []
+        if mode == "prefix":
+            matches = set(self._prefix_matches(query))
+        else:
+            matches = set(self._substring_matches(query))
+            matches.update(
+                i
+                for i, name in enumerate(self._names)
+                if i not in matches and query in str(values.get(name, "")).casefold()
+            )
+
+        return [
+            CatalogueEntry(self._names[i], values.get(self._names[i]))
+            for i in sorted(matches)[:limit]
+        ]
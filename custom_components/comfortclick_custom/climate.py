@@ -1,28 +1,48 @@
 """Entry point for home assistant to set up ClimateEntity classes."""
 
 import logging
+from collections.abc import Mapping
+from functools import partial
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
-from .entities.ac.room_thermostat import RoomThermostat
-from .util.load_thermostats_config import load_thermostats_config
+from .coordinator import ComfortClickCoordinator
+from .entities.ac.room_thermostat import RoomThermostat, RoomThermostatConfig
+from .reconfigure import EntityFactory, EntityGroup, PlatformEntities
+from .util.load_entity_configs import EntityConfigs
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _entity_factories(
+    coordinator: ComfortClickCoordinator, entity_configs: EntityConfigs
+) -> Mapping[str, EntityFactory]:
+    """Get a factory per thermostat, keyed by its configuration."""
+
+    def thermostat(config: RoomThermostatConfig) -> EntityGroup:
+        return EntityGroup([RoomThermostat(coordinator, config)])
+
+    return {
+        repr(config): partial(thermostat, config)
+        for config in entity_configs.thermostats
+    }
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Climates."""
-    coordinator = hass.data[DOMAIN][config_entry.entry_id].coordinator
-
-    configs = await load_thermostats_config()
-    sensors = [RoomThermostat(coordinator, config) for config in configs]
-
-    # Create the sensors.
-    async_add_entities(sensors)
+    runtime_data = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = runtime_data.coordinator
+
+    with coordinator.startup_timings.phase("climate platform"):
+        entities = runtime_data.platform_entities[Platform.CLIMATE] = PlatformEntities(
+            hass, async_add_entities, partial(_entity_factories, coordinator)
+        )
+        await entities.async_update(runtime_data.entity_configs)
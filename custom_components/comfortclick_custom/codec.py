@@ -0,0 +1,37 @@
+"""Encodes and decodes the json bodies exchanged with the controller."""
+
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+@dataclass(frozen=True)
+class JsonCodec:
+    """Pair of functions turning raw bodies into values and back."""
+
+    name: str
+    # Accepts the raw bytes of a body, decoding them is left to the library
+    loads: Callable[[bytes | str], Any]
+    dumps: Callable[[Any], bytes]
+
+    def dumps_str(self, value: Any) -> str:
+        """Encode a value as text, eg. to log it."""
+        return self.dumps(value).decode()
+
+
+def _standard_dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+STANDARD_CODEC = JsonCodec("json", json.loads, _standard_dumps)
+ORJSON_CODEC = (
+    JsonCodec("orjson", orjson.loads, orjson.dumps) if orjson is not None else None
+)
+# orjson comes with home assistant, the standard library is a fallback
+DEFAULT_CODEC = ORJSON_CODEC or STANDARD_CODEC
@@ -5,16 +5,31 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING, Any
 
+import aiohttp
 import voluptuous as vol
 from homeassistant import config_entries, exceptions
 from homeassistant.const import (
     CONF_HOST,
     CONF_PASSWORD,
+    CONF_SCAN_INTERVAL,
     CONF_USERNAME,
+    CONF_VERIFY_SSL,
 )
-
-from .api import ApiInstance
-from .const import DOMAIN
+from homeassistant.core import callback
+
+from .api import ApiInstance, parse_certificate_fingerprint, parse_hosts
+from .const import (
+    CONF_CERTIFICATE_FINGERPRINT,
+    CONF_PROXY_HOST,
+    CONF_PROXY_PORT,
+    CONF_PROXY_TOKEN,
+    CONF_SECONDARY_HOSTS,
+    DEFAULT_PROXY_HOST,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
+from .handoff import async_hand_off
+from .proxy import is_loopback
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
@@ -29,10 +44,22 @@ DATA_SCHEMA = vol.Schema(
         ): str,
         vol.Required(CONF_USERNAME, description={"suggested_value": "test"}): str,
         vol.Required(CONF_PASSWORD, description={"suggested_value": "1234"}): str,
+        vol.Optional(CONF_SECONDARY_HOSTS): str,
+        # Controllers ship self-signed certificates, pinning the fingerprint
+        # secures those, so verifying against the CA store is opt-in like in the api
+        vol.Optional(CONF_VERIFY_SSL, default=False): bool,
+        vol.Optional(CONF_CERTIFICATE_FINGERPRINT): str,
     }
 )
 
+# Seconds between polls that can be picked in the options
+MIN_SCAN_INTERVAL = 1
+MAX_SCAN_INTERVAL = 300
+MAX_PORT = 65535
+
 MIN_HOST_LENGTH = 3
+# Length of a SHA-256 digest in bytes
+FINGERPRINT_LENGTH = 32
 
 
 async def validate_input(_hass: HomeAssistant, data: dict) -> dict[str, Any]:
@@ -43,14 +70,43 @@ async def validate_input(_hass: HomeAssistant, data: dict) -> dict[str, Any]:
     """
     if len(data[CONF_HOST]) < MIN_HOST_LENGTH:
         raise InvalidHost
-
-    api = ApiInstance(data[CONF_USERNAME], data[CONF_PASSWORD], data[CONF_HOST])
-
-    result = await api.connect()
-    if not result:
+    secondary_hosts = parse_hosts(data.get(CONF_SECONDARY_HOSTS, ""))
+    if any(len(host) < MIN_HOST_LENGTH for host in secondary_hosts):
+        raise InvalidSecondaryHost
+
+    fingerprint = data.get(CONF_CERTIFICATE_FINGERPRINT)
+    if fingerprint:
+        try:
+            if len(parse_certificate_fingerprint(fingerprint)) != FINGERPRINT_LENGTH:
+                raise InvalidFingerprint
+        except ValueError as e:
+            raise InvalidFingerprint from e
+
+    api = ApiInstance(
+        data[CONF_USERNAME],
+        data[CONF_PASSWORD],
+        data[CONF_HOST],
+        secondary_hosts=secondary_hosts,
+        verify_ssl=data.get(CONF_VERIFY_SSL, False),
+        certificate_fingerprint=fingerprint,
+    )
+
+    try:
+        connected = await api.connect()
+        if connected:
+            # Loaded once here and reused when the entry is set up
+            await api.initialize_state()
+    except aiohttp.ClientSSLError as e:
+        await api.close()
+        raise InvalidCertificate from e
+    except BaseException:
+        await api.close()
+        raise
+    if not connected:
+        await api.close()
         raise CannotConnect
 
-    return {"title": data[CONF_HOST]}
+    return {"title": data[CONF_HOST], "api": api, "devices": len(api.snapshot())}
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -65,20 +121,94 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             try:
                 info = await validate_input(self.hass, user_input)
-
-                return self.async_create_entry(title=info["title"], data=user_input)
             except CannotConnect:
                 errors["base"] = "cannot_connect"
             except InvalidHost:
                 errors["host"] = "cannot_connect"
+            except InvalidSecondaryHost:
+                errors[CONF_SECONDARY_HOSTS] = "cannot_connect"
+            except InvalidFingerprint:
+                errors[CONF_CERTIFICATE_FINGERPRINT] = "invalid_fingerprint"
+            except InvalidCertificate:
+                errors["base"] = "invalid_certificate"
             except Exception:  # pylint: disable=broad-except
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
+            else:
+                _LOGGER.info(
+                    msg="Found devices on controller",
+                    extra={"host": info["title"], "devices": info["devices"]},
+                )
+                # Setting up the entry takes over the login and panel from here
+                async_hand_off(self.hass, user_input, info["api"])
+                return self.async_create_entry(
+                    title=info["title"],
+                    data=user_input,
+                    description_placeholders={"devices": str(info["devices"])},
+                )
 
         return self.async_show_form(
             step_id="user", data_schema=DATA_SCHEMA, errors=errors
         )
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlow:
+        """Get the options flow, whose changes apply without reloading the entry."""
+        return OptionsFlow(config_entry)
+
+
+class OptionsFlow(config_entries.OptionsFlow):
+    """Handle tunables of a controller that apply while it keeps running."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Remember the entry whose options are changed."""
+        self._config_entry = config_entry
+
+    async def async_step_init(self, user_input: dict | None = None) -> Any:
+        """Manage the options."""
+        errors = {}
+        if user_input is not None:
+            if (
+                user_input[CONF_PROXY_PORT]
+                and not user_input.get(CONF_PROXY_TOKEN)
+                and not is_loopback(user_input[CONF_PROXY_HOST])
+            ):
+                # Anyone who can reach the host could write values otherwise
+                errors[CONF_PROXY_TOKEN] = "token_required"
+            else:
+                return self.async_create_entry(data=user_input)
+
+        options = self._config_entry.options if user_input is None else user_input
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_SCAN_INTERVAL,
+                        default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=MIN_SCAN_INTERVAL, max=MAX_SCAN_INTERVAL),
+                    ),
+                    vol.Required(
+                        CONF_PROXY_PORT, default=options.get(CONF_PROXY_PORT, 0)
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_PORT)),
+                    vol.Required(
+                        CONF_PROXY_HOST,
+                        default=options.get(CONF_PROXY_HOST, DEFAULT_PROXY_HOST),
+                    ): str,
+                    vol.Optional(
+                        CONF_PROXY_TOKEN,
+                        description={"suggested_value": options.get(CONF_PROXY_TOKEN)},
+                    ): str,
+                }
+            ),
+            errors=errors,
+        )
+
 
 class CannotConnect(exceptions.HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -86,3 +216,15 @@ class CannotConnect(exceptions.HomeAssistantError):
 
 class InvalidHost(exceptions.HomeAssistantError):
     """Error to indicate there is an invalid hostname."""
+
+
+class InvalidSecondaryHost(exceptions.HomeAssistantError):
+    """Error to indicate one of the secondary hostnames is invalid."""
+
+
+class InvalidFingerprint(exceptions.HomeAssistantError):
+    """Error to indicate the certificate fingerprint is not a SHA-256 hex digest."""
+
+
+class InvalidCertificate(exceptions.HomeAssistantError):
+    """Error to indicate the controller certificate failed verification."""
@@ -3,3 +3,19 @@
 # This is the internal name of the integration, it should also match the directory
 # name for the integration.
 DOMAIN = "comfortclick_custom"
+
+# SHA-256 fingerprint of the controller's self-signed certificate
+CONF_CERTIFICATE_FINGERPRINT = "certificate_fingerprint"
+
+# Comma separated other addresses of the same controller, eg. over a VPN
+CONF_SECONDARY_HOSTS = "secondary_hosts"
+
+# Seconds between polls of the controller, can be changed in the entry options
+DEFAULT_SCAN_INTERVAL = 1
+
+# Local port other consumers stream the polled state from, 0 disables it
+CONF_PROXY_PORT = "proxy_port"
+CONF_PROXY_HOST = "proxy_host"
+# Bearer token the consumers have to send, empty allows any local consumer
+CONF_PROXY_TOKEN = "proxy_token"  # noqa: S105
+DEFAULT_PROXY_HOST = "127.0.0.1"
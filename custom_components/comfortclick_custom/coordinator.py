@@ -1,43 +1,305 @@
 """Coordinator object class."""
 
+import asyncio
 import logging
+import time
+from collections.abc import Callable
 from datetime import timedelta
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+import aiohttp
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .api import ApiInstance
-from .const import DOMAIN
+from .api import (
+    ApiInstance,
+    AuthorizationError,
+    HttpStatusNotOkError,
+    StateSnapshot,
+)
+from .const import DEFAULT_SCAN_INTERVAL, DOMAIN
+from .entry_scheduler import async_get_scheduler
+from .profiler import TickProfiler
+from .util.startup_timings import StartupTimings
 
 _LOGGER = logging.getLogger(__name__)
 
+# How often a sample of panel paths is compared against a fresh read
+CONSISTENCY_CHECK_INTERVAL = timedelta(seconds=60)
+# How many panel paths are compared in each consistency check
+CONSISTENCY_CHECK_SAMPLE_SIZE = 5
+# How often endpoints that requests are not going to are measured
+ENDPOINT_PROBE_INTERVAL = timedelta(seconds=30)
+# Seconds a profile may take on top of its ticks before it is cut short
+PROFILE_GRACE_PERIOD = 30
 
-class ComfortClickCoordinator(DataUpdateCoordinator):
+
+class ComfortClickCoordinator(DataUpdateCoordinator[StateSnapshot]):
     """Coordinator object that has subscribers who ask it for latest data."""
 
     def __init__(
-        self, hass: HomeAssistant, host: str, username: str, password: str
+        self,
+        hass: HomeAssistant,
+        api: ApiInstance,
+        device_names: set[str] | None = None,
+        startup_timings: StartupTimings | None = None,
     ) -> None:
         """Initialize coordinator."""
         _LOGGER.info("Initializing coordinator")
-        self.api = ApiInstance(host=host, username=username, password=password)
+        self.api = api
+        self._device_names = device_names
+        self._last_consistency_check = time.monotonic()
+        self._last_endpoint_probe = time.monotonic()
+        # Set when a poll failed and its updates may have been lost
+        self._resync_pending = False
+        # Set while the next ticks are being profiled
+        self._profiler: TickProfiler | None = None
+        # Sends journaled writes in the background once the controller is back
+        self._replay_task: asyncio.Task | None = None
+        # Compares a sample of panel paths against a fresh read in the background
+        self._consistency_task: asyncio.Task | None = None
+        # Measures the other endpoints in the background
+        self._probe_task: asyncio.Task | None = None
+        # Fraction of the update interval polls are offset by, see EntryScheduler
+        self.phase = 0.0
+        self._cancel_shift: Callable[[], None] | None = None
+        # Shared with the platforms, so setup can report where its time went
+        self.startup_timings = startup_timings or StartupTimings()
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
             update_method=self.async_update_data,
-            update_interval=timedelta(seconds=1),
+            update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
         )
+        # Staggers startup and polling with the coordinators of other entries
+        self._scheduler = async_get_scheduler(hass)
+        self._scheduler.register(self)
         _LOGGER.info("Finished initializing coordinator")
 
+    def set_phase(self, offset: float) -> None:
+        """Poll offset times the update interval into it, see EntryScheduler."""
+        self.phase = offset
+        if self.data is not None:
+            self._async_shift_polls()
+
+    @callback
+    def _async_shift_polls(self) -> None:
+        """
+        Refresh once at the phase of the interval, which moves the later polls too.
+
+        Every refresh schedules the next one an update interval after it, so a
+        single refresh at the offset keeps the following ones there. Refreshes
+        are scheduled at whole seconds plus a fraction, which is taken from the
+        offset so phases within a second are kept too.
+        """
+        if self._cancel_shift is not None:
+            self._cancel_shift()
+        interval = self.update_interval.total_seconds()
+        offset = self.phase * interval
+        self._microsecond = offset % 1
+        delay = (offset - self.hass.loop.time()) % interval
+        self._cancel_shift = async_call_later(self.hass, delay, self._async_shift)
+
+    @callback
+    def _async_shift(self, _now: object) -> None:
+        self._cancel_shift = None
+        self.hass.async_create_background_task(
+            self.async_refresh(), name=f"{DOMAIN} phase shift"
+        )
+
+    def set_update_interval(self, interval: timedelta) -> None:
+        """Poll at another interval, starting with the next tick."""
+        self.update_interval = interval
+        if self._unsub_refresh is not None:
+            self._schedule_refresh()
+        if self.data is not None:
+            self._async_shift_polls()
+
+    async def async_extend_scope(self, device_names: set[str]) -> None:
+        """Load devices that are new to the configuration, keeping the loaded ones."""
+        if self._device_names is not None:
+            self._device_names = self._device_names | device_names
+        if await self.api.load_devices(device_names):
+            # Entities of the new devices read their values from the snapshot
+            self.async_set_updated_data(self.api.snapshot())
+
+    @property
+    def is_profiling(self) -> bool:
+        """Check if ticks are being profiled."""
+        return self._profiler is not None
+
+    async def async_profile(self, ticks: int) -> TickProfiler:
+        """Profile the next ticks, including polling and updating entities."""
+        profiler = self._profiler = TickProfiler(ticks)
+        timeout = ticks * self.update_interval.total_seconds() + PROFILE_GRACE_PERIOD
+        try:
+            async with asyncio.timeout(timeout):
+                await profiler.done
+        except TimeoutError:
+            _LOGGER.warning(
+                msg="Ticks stopped while profiling, writing partial profile",
+                extra={"ticks": ticks, "profiled_ticks": profiler.profiled_ticks},
+            )
+        finally:
+            self._profiler = None
+        return profiler
+
+    async def _async_refresh(self, **kwargs: bool) -> None:
+        """Refresh data and update entities, profiling the tick when requested."""
+        profiler = self._profiler
+        if profiler is None:
+            await super()._async_refresh(**kwargs)
+            return
+        with profiler.tick():
+            await super()._async_refresh(**kwargs)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners, timing each when detection is enabled."""
+        detector = self.api.blocking_detector
+        if detector is None:
+            super().async_update_listeners()
+            return
+        for update_callback, _ in list(self._listeners.values()):
+            with detector.measure(_callback_name(update_callback)):
+                update_callback()
+
     async def _async_setup(self) -> None:
         """Do initialization logic."""
         _LOGGER.info("Setting up coordinator / connecting to API")
-        await self.api.connect()
-        await self.api.initialize_state()
+        # An api handed over by the config flow is logged in and has the whole panel
+        if self.api.is_connected and self.api.has_panel and self.api.loaded_whole_panel:
+            return
+        # Other entries may be starting too, so wait for a slot
+        async with self._scheduler.initial_load():
+            if not self.api.is_connected:
+                with self.startup_timings.phase("login"):
+                    await self.api.connect()
+            with self.startup_timings.phase("panel load"):
+                # Only download the parts of the panel that contain configured devices
+                await self.api.initialize_state(self._device_names)
         _LOGGER.info("Connected and fetched initial state")
 
-    async def async_update_data(self) -> None:
-        """Update data every 1 second."""
+    async def async_update_data(self) -> StateSnapshot:
+        """
+        Update data every 1 second.
+
+        Entities read the returned snapshot, so values don't change during a tick.
+        """
         _LOGGER.info("Polling API for latest state")
-        await self.api.poll()
+        try:
+            await self._async_poll()
+        except (
+            HttpStatusNotOkError,
+            AuthorizationError,
+            aiohttp.ClientError,
+            TimeoutError,
+            ValueError,
+        ) as e:
+            # Updates in a lost response are recovered by a resync afterwards
+            self._resync_pending = True
+            raise UpdateFailed(repr(e)) from e
+        if self.data is None:
+            # Polls start with the first successful update
+            self._async_shift_polls()
+        return self.api.snapshot()
+
+    async def _async_poll(self) -> None:
+        try:
+            await self.api.poll()
+        except HttpStatusNotOkError as e:
+            if not e.is_authorization_error:
+                raise
+            _LOGGER.warning("Session expired, reconnecting to API")
+            await self.api.reconnect()
+            self._resync_pending = False
+            await self.api.poll()
+
+        if self._resync_pending:
+            _LOGGER.info("Resynchronising state after failed poll")
+            await self.api.resync()
+            self._resync_pending = False
+
+        now = time.monotonic()
+        if (
+            now - self._last_consistency_check
+            >= CONSISTENCY_CHECK_INTERVAL.total_seconds()
+            and self._consistency_task is None
+        ):
+            self._last_consistency_check = now
+            # Reads several panel paths, so the tick does not wait for it
+            self._consistency_task = self.hass.async_create_background_task(
+                self._async_check_consistency(), name=f"{DOMAIN} consistency check"
+            )
+
+        if (
+            now - self._last_endpoint_probe >= ENDPOINT_PROBE_INTERVAL.total_seconds()
+            and self._probe_task is None
+        ):
+            self._last_endpoint_probe = now
+            # An endpoint that hangs would otherwise stall polling
+            self._probe_task = self.hass.async_create_background_task(
+                self._async_probe_endpoints(), name=f"{DOMAIN} endpoint probe"
+            )
+
+        if self.api.journal and self._replay_task is None:
+            self._replay_task = self.hass.async_create_background_task(
+                self._async_replay_journal(), name=f"{DOMAIN} journal replay"
+            )
+
+    async def _async_check_consistency(self) -> None:
+        try:
+            await self.api.check_consistency(CONSISTENCY_CHECK_SAMPLE_SIZE)
+        except (
+            HttpStatusNotOkError,
+            aiohttp.ClientError,
+            TimeoutError,
+            ValueError,
+        ) as e:
+            # Checked again at the next interval
+            _LOGGER.warning(msg="Consistency check failed", extra={"error": repr(e)})
+        finally:
+            self._consistency_task = None
+
+    async def _async_probe_endpoints(self) -> None:
+        try:
+            await self.api.probe_endpoints()
+        finally:
+            self._probe_task = None
+
+    async def _async_replay_journal(self) -> None:
+        try:
+            await self.api.replay_journal()
+        finally:
+            self._replay_task = None
+
+    async def async_shutdown(self) -> None:
+        """
+        Stop refreshing and replaying journaled writes, and release the api.
+
+        Home assistant runs this when the entry is unloaded and also when setting
+        it up failed, eg. as the controller is unreachable and setup is retried.
+        """
+        for task in (self._replay_task, self._consistency_task, self._probe_task):
+            if task is not None:
+                task.cancel()
+        if self._cancel_shift is not None:
+            self._cancel_shift()
+            self._cancel_shift = None
+        self._scheduler.unregister(self)
+        await super().async_shutdown()
+        await self.api.close()
+        if self.api.capture is not None:
+            await self.api.capture.async_close()
+        if self.api.blocking_detector is not None:
+            self.api.blocking_detector.stop()
+
+
+def _callback_name(update_callback: Callable[[], None]) -> str:
+    """Name a listener after the entity it belongs to."""
+    owner = getattr(update_callback, "__self__", None)
+    entity_id = getattr(owner, "entity_id", None)
+    if entity_id:
+        return entity_id
+    return getattr(update_callback, "__qualname__", repr(update_callback))
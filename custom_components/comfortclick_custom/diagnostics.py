@@ -0,0 +1,43 @@
+"""Diagnostics support for the integration."""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Any
+
+from .api import panel_path_for_device
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id].coordinator
+    detector = coordinator.api.blocking_detector
+    catalogue = coordinator.api.catalogue()
+    return {
+        "endpoints": [
+            {**asdict(endpoint), "active": endpoint.url == coordinator.api.host}
+            for endpoint in coordinator.api.endpoints
+        ],
+        "catalogue": {
+            "devices": len(catalogue),
+            # Device count per panel path, to find where devices live
+            "paths": dict(Counter(panel_path_for_device(name) for name in catalogue)),
+        },
+        "payload_stats": {
+            endpoint: {**asdict(stats), "saved_bytes": stats.saved_bytes}
+            for endpoint, stats in coordinator.api.payload_stats.items()
+        },
+        "callback_stats": {
+            name: asdict(stats) for name, stats in detector.stats().items()
+        }
+        if detector is not None
+        else None,
+    }
@@ -0,0 +1,218 @@
+"""Generates entity configuration from the objects found on the controller panel."""
+
+import hashlib
+import json
+import logging
+import re
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .api import panel_path_for_device
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Sections of comfortclick_custom.yaml, each a list of items shaped like the file
+type DiscoveredConfig = dict[str, list[dict[str, Any]]]
+
+# Roles a device can play, tried in order against the last part of its name.
+# The kind of value a device has must match too, so a heating flag is never
+# mistaken for a heating meter.
+ROLES: tuple[tuple[str, str], ...] = (
+    ("door", "bool"),
+    ("fan_lock", "bool"),
+    ("heating", "bool"),
+    ("target_temperature", "number"),
+    ("current_temperature", "number"),
+    ("fan", "number"),
+    ("water", "number"),
+    ("electricity", "number"),
+    ("heating_meter", "number"),
+)
+
+# Case insensitive patterns per role, can be overridden in the config file
+DEFAULT_PATTERNS = {
+    "door": r"door|uks",
+    "fan_lock": r"lock|lukk",
+    "heating": r"heat|küte",
+    "target_temperature": r"target|set ?point|seade",
+    "current_temperature": r"temp",
+    "fan": r"fan|ventilaator",
+    "water": r"water|vesi|külm|soe",
+    "electricity": r"electric|elekter",
+    "heating_meter": r"heat|küte",
+}
+
+METER_TYPES = {
+    "water": "water",
+    "electricity": "electricity",
+    "heating_meter": "heating",
+}
+
+
+def _value_kind(value: Any) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int | float):
+        return "number"
+    return "other"
+
+
+def _leaf(device_name: str) -> str:
+    return device_name.rpartition("\\")[2]
+
+
+def panel_fingerprint(
+    values: Mapping[str, Any], patterns: Mapping[str, str], exclude: Iterable[str]
+) -> str:
+    """Hash what discovery depends on, so it only runs again when that changes."""
+    digest = hashlib.sha256(
+        json.dumps([patterns, sorted(exclude)], sort_keys=True).encode()
+    )
+    for name in sorted(values):
+        digest.update(f"{name}\0{_value_kind(values[name])}\n".encode())
+    return digest.hexdigest()
+
+
+def discover(
+    values: Mapping[str, Any],
+    patterns: Mapping[str, str] | None = None,
+    exclude: Iterable[str] = (),
+) -> DiscoveredConfig:
+    """
+    Classify devices by name and value kind into config file sections.
+
+    Devices in the same panel folder make up a room, which becomes a thermostat
+    and a fan when it has the devices those need. Doors and meters become a lock
+    or a utility sensor each. Devices in exclude, eg. configured ones, are skipped.
+    """
+    compiled = {
+        role: re.compile(pattern, re.IGNORECASE)
+        for role, pattern in {**DEFAULT_PATTERNS, **(patterns or {})}.items()
+    }
+    excluded = set(exclude)
+
+    # Panel folder -> role -> first device found for it
+    rooms: defaultdict[str, dict[str, str]] = defaultdict(dict)
+    discovered: DiscoveredConfig = {
+        "thermostats": [],
+        "fans": [],
+        "locks": [],
+        "utilities": [],
+    }
+    for name in sorted(values):
+        if name in excluded:
+            continue
+        kind = _value_kind(values[name])
+        leaf = _leaf(name)
+        role = next(
+            (
+                role
+                for role, role_kind in ROLES
+                if role_kind == kind and compiled[role].search(leaf)
+            ),
+            None,
+        )
+        if role == "door":
+            discovered["locks"].append({"door_name": leaf, "door_id": name})
+        elif role in METER_TYPES:
+            discovered["utilities"].append(
+                {"name": leaf, "id": name, "type": METER_TYPES[role]}
+            )
+        elif role is not None:
+            rooms[panel_path_for_device(name)].setdefault(role, name)
+
+    for path, devices in rooms.items():
+        if (
+            not {"heating", "current_temperature", "target_temperature"}
+            <= devices.keys()
+        ):
+            continue
+        room = _leaf(path)
+        discovered["thermostats"].append(
+            {
+                "name": room,
+                "heating_id": devices["heating"],
+                "fan_id": devices.get("fan"),
+                "current_temperature_id": devices["current_temperature"],
+                "target_temperature_id": devices["target_temperature"],
+            }
+        )
+        if {"fan", "fan_lock"} <= devices.keys():
+            discovered["fans"].append(
+                {
+                    "name": f"{room} fan",
+                    "lock_id": devices["fan_lock"],
+                    "fan_id": devices["fan"],
+                    "heating_id": devices["heating"],
+                    "current_temperature_id": devices["current_temperature"],
+                    "target_temperature_id": devices["target_temperature"],
+                }
+            )
+    return discovered
+
+
+def discovered_device_ids(discovered: DiscoveredConfig) -> set[str]:
+    """Get all device ids that discovered entities read from or write to."""
+    return {
+        value
+        for items in discovered.values()
+        for item in items
+        for key, value in item.items()
+        if value and (key == "id" or key.endswith("_id"))
+    }
+
+
+class DiscoveryCache:
+    """Keeps the last discovery result of a config entry in home assistant storage."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Prepare the store of the config entry."""
+        self._hass = hass
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.discovery.{entry_id}"
+        )
+        self._data: dict[str, Any] | None = None
+
+    async def async_load(self) -> DiscoveredConfig | None:
+        """Load the cached discovery result, None when there is none."""
+        self._data = await self._store.async_load()
+        return None if self._data is None else self._data["discovered"]
+
+    async def async_discover(
+        self,
+        values: Mapping[str, Any],
+        patterns: Mapping[str, str],
+        exclude: Iterable[str],
+    ) -> DiscoveredConfig:
+        """
+        Discover devices in a whole panel, unless it is unchanged since last time.
+
+        Hashing and matching run over every device of the panel, so they run in the
+        executor instead of blocking the event loop. The values must not change
+        meanwhile, which a published snapshot guarantees.
+        """
+        exclude = set(exclude)
+        fingerprint = await self._hass.async_add_executor_job(
+            panel_fingerprint, values, patterns, exclude
+        )
+        if self._data is not None and self._data["fingerprint"] == fingerprint:
+            _LOGGER.debug(msg="Panel unchanged, using cached discovery")
+            return self._data["discovered"]
+
+        discovered = await self._hass.async_add_executor_job(
+            discover, values, patterns, exclude
+        )
+        _LOGGER.info(
+            msg="Discovered devices on panel",
+            extra={section: len(items) for section, items in discovered.items()},
+        )
+        self._data = {"fingerprint": fingerprint, "discovered": discovered}
+        await self._store.async_save(self._data)
+        return discovered
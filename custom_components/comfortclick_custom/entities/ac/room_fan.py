@@ -66,10 +66,10 @@ class RoomFan(CoordinatorEntity, FanEntity):
 
     def _get_fan_state_from_api_state(self) -> bool:
         # If lock is on, fan cant be on
-        if self._coordinator.api.get_value(self._config.lock_id):
+        if self._coordinator.data.get_value(self._config.lock_id):
             return False
         # If heating is on, fan cant be on
-        if self._coordinator.api.get_value(self._config.heating_id):
+        if self._coordinator.data.get_value(self._config.heating_id):
             return False
         # If heating is off, meaning current temp is same or lower than target temp
         # Now we are trying to optimistically assume fan state based on temp
@@ -80,10 +80,10 @@ class RoomFan(CoordinatorEntity, FanEntity):
         if temp_diff < FAN_TEMP_DIFF_THRESHOLD:
             return False
 
-        return self._coordinator.api.get_value(self._config.fan_id) > FAN_ON_THRESHOLD
+        return self._coordinator.data.get_value(self._config.fan_id) > FAN_ON_THRESHOLD
 
     def _get_current_temperature_from_api_state(self) -> float:
-        current_temperature = self._coordinator.api.get_value(
+        current_temperature = self._coordinator.data.get_value(
             self._config.current_temperature_id
         )
         if current_temperature is None:
@@ -91,7 +91,7 @@ class RoomFan(CoordinatorEntity, FanEntity):
         return round(float(current_temperature), 1)
 
     def _get_target_temperature_from_api_state(self) -> float:
-        target_temperature = self._coordinator.api.get_value(
+        target_temperature = self._coordinator.data.get_value(
             self._config.target_temperature_id
         )
         if target_temperature is None:
@@ -72,17 +72,17 @@ class RoomThermostat(CoordinatorEntity, ClimateEntity):
         _LOGGER.debug("Finished setting up")
 
     def _get_hvac_action_from_api_state(self) -> HVACAction:
-        if self._coordinator.api.get_value(self._config.heating_id):
+        if self._coordinator.data.get_value(self._config.heating_id):
             return HVACAction.HEATING
         # If we have no fan, we cant cool
         if self._config.fan_id is None:
             return HVACAction.IDLE
-        if self._coordinator.api.get_value(self._config.fan_id) > FAN_ON_THRESHOLD:
+        if self._coordinator.data.get_value(self._config.fan_id) > FAN_ON_THRESHOLD:
             return HVACAction.COOLING
         return HVACAction.IDLE
 
     def _get_current_temperature_from_api_state(self) -> float:
-        current_temperature = self._coordinator.api.get_value(
+        current_temperature = self._coordinator.data.get_value(
             self._config.current_temperature_id
         )
         if current_temperature is None:
@@ -90,7 +90,7 @@ class RoomThermostat(CoordinatorEntity, ClimateEntity):
         return round(float(current_temperature), 1)
 
     def _get_target_temperature_from_api_state(self) -> float:
-        target_temperature = self._coordinator.api.get_value(
+        target_temperature = self._coordinator.data.get_value(
             self._config.target_temperature_id
         )
         if target_temperature is None:
@@ -0,0 +1,21 @@
+"""Sharable configuration file for all classes in this directory."""
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class AggregateSensorConfig:
+    """Class for keeping aggregate sensor configuration options."""
+
+    id: str
+    name: str
+    # One of sum, mean, min, max, count_above and deviation
+    function: str
+    devices: list[str] = field(default_factory=list)
+    # Devices that deviation compares devices against, pairwise
+    reference: list[str] = field(default_factory=list)
+    threshold: float = 0
+
+    unit_of_measurement: str | None = None
+    device_class: str | None = None
+    state_class: str | None = None
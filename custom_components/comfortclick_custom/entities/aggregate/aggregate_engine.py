@@ -0,0 +1,140 @@
+"""Computes aggregates over groups of numeric device values."""
+
+import logging
+import math
+from array import array
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+
+from ...api import StateSnapshot, device_key
+from .aggregate_config import AggregateSensorConfig
+
+_LOGGER = logging.getLogger(__name__)
+
+# Stands in for missing and non-numeric values, skipped by every aggregate
+MISSING = math.nan
+
+
+def _as_number(value: object) -> float:
+    if isinstance(value, bool | int | float):
+        return float(value)
+    return MISSING
+
+
+def _present(values: Iterable[float]) -> list[float]:
+    # Filtering with a builtin keeps the loop in C
+    return list(filter(math.isfinite, values))
+
+
+def _mean(values: list[float]) -> float | None:
+    return math.fsum(values) / len(values) if values else None
+
+
+FUNCTIONS: dict[str, Callable[[list[float], float], float | None]] = {
+    "sum": lambda values, _threshold: math.fsum(values),
+    "mean": lambda values, _threshold: _mean(values),
+    "min": lambda values, _threshold: min(values, default=None),
+    "max": lambda values, _threshold: max(values, default=None),
+    "count_above": lambda values, threshold: sum(value > threshold for value in values),
+}
+
+
+class InvalidAggregateError(Exception):
+    """Raised when an aggregate sensor is configured wrong."""
+
+
+class ColumnStore:
+    """
+    Numeric device values kept in one contiguous array of doubles.
+
+    Every group occupies its own slice, so a device in several groups has a column
+    in each. Values are read from the published snapshot, changed ones are written
+    in place and mark their groups dirty.
+    """
+
+    def __init__(
+        self,
+        published: Callable[[], StateSnapshot | None],
+        groups: dict[str, list[str]],
+    ) -> None:
+        """Lay out the groups and fill them with the current values."""
+        self._published = published
+        self._snapshot = published() or StateSnapshot()
+        self._values = array("d")
+        self._slices: dict[str, slice] = {}
+        # Device key -> columns holding its value
+        self._columns: defaultdict[str, list[int]] = defaultdict(list)
+        # Column -> group it belongs to
+        self._column_groups: list[str] = []
+        for group_id, devices in groups.items():
+            start = len(self._values)
+            for device in devices:
+                self._columns[device_key(device)].append(len(self._values))
+                self._column_groups.append(group_id)
+                self._values.append(self._read(device))
+            self._slices[group_id] = slice(start, len(self._values))
+
+        self.dirty = set(groups)
+
+    def _read(self, device_name: str) -> float:
+        return _as_number(self._snapshot.get_value(device_name))
+
+    def sync(self) -> None:
+        """Write values changed in the snapshot published since the last sync."""
+        snapshot = self._published() or self._snapshot
+        if snapshot is self._snapshot:
+            return
+        changes = snapshot.changes_since(self._snapshot)
+        self._snapshot = snapshot
+        for key, value in changes.items():
+            for column in self._columns.get(key, ()):
+                self._values[column] = _as_number(value)
+                self.dirty.add(self._column_groups[column])
+
+    def column(self, group_id: str) -> array:
+        """Get a copy of the values of a group, missing ones being NaN."""
+        return self._values[self._slices[group_id]]
+
+
+class AggregateEngine:
+    """Keeps aggregate sensor values up to date, recomputing only changed groups."""
+
+    def __init__(
+        self,
+        published: Callable[[], StateSnapshot | None],
+        configs: list[AggregateSensorConfig],
+    ) -> None:
+        """Validate the configs and lay out their groups in a column store."""
+        groups = {}
+        for config in configs:
+            if config.function == "deviation":
+                if len(config.reference) != len(config.devices):
+                    msg = f"{config.id} needs a reference device for every device"
+                    raise InvalidAggregateError(msg)
+                groups[f"{config.id}/reference"] = config.reference
+            elif config.function not in FUNCTIONS:
+                msg = f"Unknown function {config.function} of {config.id}"
+                raise InvalidAggregateError(msg)
+            groups[config.id] = config.devices
+
+        self._configs = {config.id: config for config in configs}
+        self._store = ColumnStore(published, groups)
+        self._values: dict[str, float | None] = {}
+
+    def value(self, sensor_id: str) -> float | None:
+        """Get the value of an aggregate sensor, recomputing changed ones first."""
+        self._store.sync()
+        if self._store.dirty:
+            for dirty_id in self._store.dirty:
+                config = self._configs.get(dirty_id.removesuffix("/reference"))
+                if config is not None:
+                    self._values[config.id] = self._compute(config)
+            self._store.dirty.clear()
+        return self._values.get(sensor_id)
+
+    def _compute(self, config: AggregateSensorConfig) -> float | None:
+        values = self._store.column(config.id)
+        if config.function == "deviation":
+            references = self._store.column(f"{config.id}/reference")
+            return math.fsum(_present(map(abs, map(float.__sub__, values, references))))
+        return FUNCTIONS[config.function](_present(values), config.threshold)
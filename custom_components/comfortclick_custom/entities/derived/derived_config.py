@@ -0,0 +1,18 @@
+"""Sharable configuration file for all classes in this directory."""
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class DerivedSensorConfig:
+    """Class for keeping derived sensor configuration options."""
+
+    id: str
+    name: str
+    expression: str
+    # Expression variable -> device id or id of another derived sensor
+    inputs: dict[str, str] = field(default_factory=dict)
+
+    unit_of_measurement: str | None = None
+    device_class: str | None = None
+    state_class: str | None = None
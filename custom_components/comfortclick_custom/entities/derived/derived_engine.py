@@ -0,0 +1,198 @@
+"""Evaluates derived sensors incrementally as their input values change."""
+
+import ast
+import logging
+from collections import defaultdict
+from collections.abc import Callable
+from graphlib import CycleError, TopologicalSorter
+from types import CodeType
+from typing import Any
+
+from ...api import StateSnapshot, device_key
+from .derived_config import DerivedSensorConfig
+
+_LOGGER = logging.getLogger(__name__)
+
+# Functions that expressions are allowed to call
+FUNCTIONS = {"abs": abs, "max": max, "min": min, "round": round}
+
+# Largest power expressions may raise to, so a typo can't stall the event loop
+MAX_EXPONENT = 10
+
+ALLOWED_NODES = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.BoolOp,
+    ast.Compare,
+    ast.IfExp,
+    ast.Call,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+    # Arithmetic only, shifts and bitwise operators can build huge integers
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.Pow,
+    ast.UAdd,
+    ast.USub,
+    ast.Not,
+    ast.boolop,
+    ast.cmpop,
+)
+
+
+class InvalidExpressionError(Exception):
+    """Raised when a derived sensor expression cannot be compiled."""
+
+
+def compile_expression(expression: str, variables: set[str]) -> CodeType:
+    """Validate an arithmetic expression over the variables and compile it once."""
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise InvalidExpressionError(expression) from e
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            msg = f"{type(node).__name__} is not allowed in {expression}"
+            raise InvalidExpressionError(msg)
+        # Strings repeated by a number could fill the memory
+        if isinstance(node, ast.Constant) and not _is_number(node.value):
+            msg = f"Only numbers are allowed as constants in {expression}"
+            raise InvalidExpressionError(msg)
+        if isinstance(node, ast.Name) and node.id not in variables | FUNCTIONS.keys():
+            msg = f"Unknown name {node.id} in {expression}"
+            raise InvalidExpressionError(msg)
+        if isinstance(node, ast.Call) and (
+            not isinstance(node.func, ast.Name) or node.keywords
+        ):
+            msg = f"Only positional calls to {list(FUNCTIONS)} are allowed"
+            raise InvalidExpressionError(msg)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+            _check_base(node.left, expression)
+            _check_exponent(node.right, expression)
+
+    return compile(tree, f"<derived {expression}>", "eval")
+
+
+def _is_number(value: object) -> bool:
+    return value is None or isinstance(value, int | float)
+
+
+def _check_base(node: ast.expr, expression: str) -> None:
+    # A power of a power grows beyond what the exponent limit allows
+    if not isinstance(node, ast.Name | ast.Constant):
+        msg = f"Powers must be of a variable or a number in {expression}"
+        raise InvalidExpressionError(msg)
+
+
+def _check_exponent(node: ast.expr, expression: str) -> None:
+    try:
+        exponent = ast.literal_eval(node)
+    except ValueError:
+        exponent = None
+    if (
+        not isinstance(exponent, int | float)
+        or isinstance(exponent, bool)
+        or abs(exponent) > MAX_EXPONENT
+    ):
+        msg = f"Exponents must be numbers up to {MAX_EXPONENT} in {expression}"
+        raise InvalidExpressionError(msg)
+
+
+class DerivedEngine:
+    """
+    Keeps derived sensor values up to date, re-evaluating only what changed.
+
+    Inputs are read from the published snapshot, so all sensors see the values of
+    the same poll. Comparing it with the snapshot evaluated last tells what changed.
+    """
+
+    def __init__(
+        self,
+        published: Callable[[], StateSnapshot | None],
+        configs: list[DerivedSensorConfig],
+    ) -> None:
+        """Compile expressions and build the dependency graph."""
+        self._published = published
+        self._snapshot = StateSnapshot()
+        self._configs = {config.id: config for config in configs}
+        self._code = {
+            config.id: compile_expression(config.expression, set(config.inputs))
+            for config in configs
+        }
+
+        # Device key / derived sensor id -> derived sensors that read it
+        self._device_dependents: defaultdict[str, set[str]] = defaultdict(set)
+        self._derived_dependents: defaultdict[str, set[str]] = defaultdict(set)
+        graph = {}
+        for config in configs:
+            graph[config.id] = set()
+            for source in config.inputs.values():
+                if source in self._configs:
+                    self._derived_dependents[source].add(config.id)
+                    graph[config.id].add(source)
+                else:
+                    self._device_dependents[device_key(source)].add(config.id)
+        try:
+            # Inputs are always evaluated before the sensors reading them
+            self._order = list(TopologicalSorter(graph).static_order())
+        except CycleError as e:
+            msg = f"Derived sensors depend on each other in a cycle: {e.args[1]}"
+            raise InvalidExpressionError(msg) from e
+
+        self._values: dict[str, Any] = {}
+        self._dirty = set(self._configs)
+
+    def _sync(self) -> None:
+        snapshot = self._published() or self._snapshot
+        if snapshot is self._snapshot:
+            return
+        for key in snapshot.changes_since(self._snapshot):
+            for sensor_id in self._device_dependents.get(key, ()):
+                self._mark_dirty(sensor_id)
+        self._snapshot = snapshot
+
+    def _mark_dirty(self, sensor_id: str) -> None:
+        if sensor_id in self._dirty:
+            return
+        self._dirty.add(sensor_id)
+        for dependent in self._derived_dependents.get(sensor_id, ()):
+            self._mark_dirty(dependent)
+
+    def value(self, sensor_id: str) -> Any:
+        """Get the value of a derived sensor, evaluating changed sensors first."""
+        self._sync()
+        if self._dirty:
+            for dirty_id in [i for i in self._order if i in self._dirty]:
+                self._values[dirty_id] = self._evaluate(dirty_id)
+            self._dirty.clear()
+        return self._values.get(sensor_id)
+
+    def _evaluate(self, sensor_id: str) -> Any:
+        variables = {}
+        for name, source in self._configs[sensor_id].inputs.items():
+            if source in self._configs:
+                value = self._values.get(source)
+            else:
+                value = self._snapshot.get_value(source)
+            if value is None:
+                return None
+            variables[name] = value
+
+        try:
+            # Expressions are validated to only contain arithmetic and FUNCTIONS
+            return eval(  # noqa: S307
+                self._code[sensor_id], {"__builtins__": {}, **FUNCTIONS}, variables
+            )
+        except (ArithmeticError, TypeError, ValueError):
+            _LOGGER.debug(
+                msg="Failed to evaluate derived sensor",
+                extra={"sensor_id": sensor_id, "variables": variables},
+            )
+            return None
@@ -0,0 +1,52 @@
+"""Exposes sensors computed from other device values to home assistant."""
+
+import logging
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from ...coordinator import ComfortClickCoordinator
+from .derived_config import DerivedSensorConfig
+from .derived_engine import DerivedEngine
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DerivedSensor(CoordinatorEntity, SensorEntity):
+    """Representation of a sensor whose value is an expression over devices."""
+
+    def __init__(
+        self,
+        coordinator: ComfortClickCoordinator,
+        config: DerivedSensorConfig,
+        engine: DerivedEngine,
+    ) -> None:
+        """Initialize the derived sensor."""
+        # coordinator that manages state
+        self._coordinator = coordinator
+        self._config = config
+        self._engine = engine
+        self._attr_unique_id = f"derived-{config.id}"
+        # human-readable name
+        self._attr_name = config.name
+        self._attr_native_unit_of_measurement = config.unit_of_measurement
+        if config.device_class:
+            self._attr_device_class = SensorDeviceClass(config.device_class)
+        if config.state_class:
+            self._attr_state_class = SensorStateClass(config.state_class)
+
+        # start listener on coordinator
+        super().__init__(coordinator)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Fetch new state data for the sensor."""
+        updated_value = self._engine.value(self._config.id)
+        if updated_value != self._attr_native_value:
+            self._attr_native_value = updated_value
+            self.async_write_ha_state()
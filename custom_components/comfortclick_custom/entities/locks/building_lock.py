@@ -64,7 +64,7 @@ class BuildingLock(CoordinatorEntity, LockEntity):
 
     # The front door is by default locked and can be unlocked for a bit
     def _get_is_open_from_api_state(self) -> bool:
-        return self._coordinator.api.get_value(device_name=self._config.door_id)
+        return self._coordinator.data.get_value(device_name=self._config.door_id)
 
     async def async_unlock(self, **_kwargs: Any) -> None:
         """Unlocks the door."""
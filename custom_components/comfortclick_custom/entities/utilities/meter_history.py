@@ -0,0 +1,148 @@
+"""Keeps a bounded history of utility meter readings."""
+
+import logging
+import time
+from array import array
+
+from ...api import ApiInstance, device_key
+
+_LOGGER = logging.getLogger(__name__)
+
+# How many readings are kept per meter, readings are only added when they change
+DEFAULT_CAPACITY = 4096
+
+
+class MeterHistory:
+    """
+    Ring buffer of (timestamp, value) readings stored in preallocated arrays.
+
+    With a window, time is split in buckets short enough for the buffer to reach
+    back over the whole window and only the first reading of each bucket is kept,
+    so a meter updating every second doesn't push out the start of the window.
+    The latest reading is kept besides the buffer.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, window: float = 0) -> None:
+        """Allocate the buffer, its size never changes afterwards."""
+        self._capacity = capacity
+        # The newest bucket is still filling, so it doesn't count towards the window
+        self._resolution = window / (capacity - 1) if window else 0
+        self._timestamps = array("d", [0.0]) * capacity
+        self._values = array("d", [0.0]) * capacity
+        # Index the next reading is written to and number of readings kept
+        self._head = 0
+        self._size = 0
+        self._latest = 0.0
+
+    def __len__(self) -> int:
+        """Get number of readings kept."""
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Get memory used by the readings."""
+        return (
+            self._timestamps.buffer_info()[1] * self._timestamps.itemsize
+            + self._values.buffer_info()[1] * self._values.itemsize
+        )
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Add a reading, overwriting the oldest one when the buffer is full."""
+        self._latest = value
+        if self._size and self._resolution:
+            last = self._timestamps[self._position(self._size - 1)]
+            if timestamp // self._resolution == last // self._resolution:
+                return
+        self._timestamps[self._head] = timestamp
+        self._values[self._head] = value
+        self._head = (self._head + 1) % self._capacity
+        self._size = min(self._size + 1, self._capacity)
+
+    def _position(self, index: int) -> int:
+        """Map index of a reading, 0 being the oldest, to a position in the arrays."""
+        return (self._head - self._size + index) % self._capacity
+
+    def _index_at(self, timestamp: float) -> int:
+        """Get index of the last reading taken at or before the timestamp."""
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if self._timestamps[self._position(middle)] <= timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low - 1
+
+    def increase(self, now: float, window: float) -> tuple[float, float] | None:
+        """
+        Get how much the reading increased over the window ending now.
+
+        Returns the increase and the seconds it was measured over, which is less
+        than the window when the history does not reach back far enough.
+        """
+        if self._size == 0:
+            return None
+        start = now - window
+        index = self._index_at(start)
+        if index < 0:
+            index = 0
+            start = self._timestamps[self._position(0)]
+        baseline = self._values[self._position(index)]
+        return self._latest - baseline, now - start
+
+    def rate(self, now: float, window: float) -> float | None:
+        """Get the average increase per hour over the window ending now."""
+        increase = self.increase(now, window)
+        if increase is None or increase[1] <= 0:
+            return None
+        return increase[0] / increase[1] * 3600
+
+
+class MeterHistoryRecorder:
+    """Records readings of utility meters as the API applies their values."""
+
+    def __init__(
+        self, api: ApiInstance, device_ids: list[str], capacity: int = DEFAULT_CAPACITY
+    ) -> None:
+        """Start recording readings of the meters."""
+        self._api = api
+        self._capacity = capacity
+        self._histories: dict[str, MeterHistory] = {}
+        for device_id in device_ids:
+            self.track(device_id)
+        self._remove_listener = api.add_value_listener(self._record)
+
+    def stop(self) -> None:
+        """Stop recording readings."""
+        self._remove_listener()
+
+    def track(self, device_id: str, window: float = 0) -> MeterHistory:
+        """
+        Start recording readings of another meter, keeping a history it has.
+
+        The window is the longest span in seconds the history has to cover.
+        """
+        key = device_key(device_id)
+        if key not in self._histories:
+            self._histories[key] = MeterHistory(self._capacity, window)
+            self._record(key)
+        return self._histories[key]
+
+    def untrack(self, device_id: str) -> None:
+        """Stop recording readings of a meter and forget its history."""
+        self._histories.pop(device_key(device_id), None)
+
+    def history(self, device_id: str) -> MeterHistory:
+        """Get the reading history of a meter."""
+        return self._histories[device_key(device_id)]
+
+    def _record(self, key: str) -> None:
+        history = self._histories.get(key)
+        # Meters missing from the loaded panel have no reading to record yet
+        if history is None or not self._api.has_device(key):
+            return
+        value = self._api.get_value(key)
+        try:
+            history.append(time.monotonic(), float(value))
+        except (TypeError, ValueError):
+            _LOGGER.debug(msg="Ignoring non numeric meter reading", extra={"key": key})
@@ -0,0 +1,101 @@
+"""Exposes utilities flow, power and rolling consumption to home assistant."""
+
+import logging
+import time
+
+from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from ...coordinator import ComfortClickCoordinator
+from .meter_history import MeterHistory
+from .utilities_sensor import UtilitiesSensorConfig
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds of the consumption window the meter history covers
+ATTR_COVERED_SECONDS = "covered_seconds"
+
+
+class UtilitiesRateSensor(CoordinatorEntity, SensorEntity):
+    """Representation of a sensor that reports how fast a meter is increasing."""
+
+    def __init__(
+        self,
+        coordinator: ComfortClickCoordinator,
+        config: UtilitiesSensorConfig,
+        history: MeterHistory,
+    ) -> None:
+        """Initialize the rate sensor."""
+        # coordinator that manages state
+        self._coordinator = coordinator
+        self._config = config
+        self._history = history
+        self._attr_unique_id = f"{config.id}-rate"
+        self.entity_description = config.rate_description
+        # human-readable name
+        self._attr_name = f"{config.name} rate"
+
+        # start listener on coordinator
+        super().__init__(coordinator)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Fetch new state data for the sensor."""
+        rate = self._history.rate(
+            time.monotonic(), self._config.rate_window.total_seconds()
+        )
+        updated_value = (
+            None if rate is None else round(rate * self._config.rate_factor, 3)
+        )
+        if updated_value != self._attr_native_value:
+            self._attr_native_value = updated_value
+            self.async_write_ha_state()
+
+
+class UtilitiesConsumptionSensor(CoordinatorEntity, SensorEntity):
+    """Representation of a sensor that reports consumption over a rolling window."""
+
+    def __init__(
+        self,
+        coordinator: ComfortClickCoordinator,
+        config: UtilitiesSensorConfig,
+        history: MeterHistory,
+    ) -> None:
+        """Initialize the consumption sensor."""
+        # coordinator that manages state
+        self._coordinator = coordinator
+        self._config = config
+        self._history = history
+        self._attr_unique_id = f"{config.id}-consumption"
+        # Consumption over a window goes up and down so it is not a total
+        self.entity_description = SensorEntityDescription(
+            key=f"{config.description.key}_consumption",
+            native_unit_of_measurement=config.description.native_unit_of_measurement,
+            device_class=config.description.device_class,
+        )
+        # human-readable name
+        self._attr_name = f"{config.name} consumption"
+        self._attr_extra_state_attributes = {ATTR_COVERED_SECONDS: None}
+
+        # start listener on coordinator
+        super().__init__(coordinator)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Fetch new state data for the sensor."""
+        increase = self._history.increase(
+            time.monotonic(), self._config.consumption_window.total_seconds()
+        )
+        updated_value = None if increase is None else round(increase[0], 3)
+        # Less than the window until the history reaches back far enough
+        attributes = {
+            ATTR_COVERED_SECONDS: None if increase is None else round(increase[1])
+        }
+        if (
+            updated_value != self._attr_native_value
+            or attributes != self._attr_extra_state_attributes
+        ):
+            self._attr_native_value = updated_value
+            self._attr_extra_state_attributes = attributes
+            self.async_write_ha_state()
@@ -2,6 +2,7 @@
 
 import logging
 from dataclasses import dataclass
+from datetime import timedelta
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -9,7 +10,12 @@ from homeassistant.components.sensor import (
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import UnitOfEnergy, UnitOfVolume
+from homeassistant.const import (
+    UnitOfEnergy,
+    UnitOfPower,
+    UnitOfVolume,
+    UnitOfVolumeFlowRate,
+)
 from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
@@ -38,6 +44,20 @@ HeatingSensor = SensorEntityDescription(
     state_class=SensorStateClass.TOTAL_INCREASING,
 )
 
+WaterFlowSensor = SensorEntityDescription(
+    key="water_flow_sensor",
+    native_unit_of_measurement=UnitOfVolumeFlowRate.CUBIC_METERS_PER_HOUR,
+    device_class=SensorDeviceClass.VOLUME_FLOW_RATE,
+    state_class=SensorStateClass.MEASUREMENT,
+)
+
+PowerSensor = SensorEntityDescription(
+    key="power_sensor",
+    native_unit_of_measurement=UnitOfPower.KILO_WATT,
+    device_class=SensorDeviceClass.POWER,
+    state_class=SensorStateClass.MEASUREMENT,
+)
+
 
 @dataclass
 class UtilitiesSensorConfig:
@@ -47,6 +67,13 @@ class UtilitiesSensorConfig:
     name: str = None
     description: SensorEntityDescription = None
 
+    # Rate of increase per hour is multiplied with this to get rate_description unit
+    rate_description: SensorEntityDescription = None
+    rate_factor: float = 1
+    # Window rate and consumption are averaged / summed over
+    rate_window: timedelta = timedelta(minutes=15)
+    consumption_window: timedelta = timedelta(hours=24)
+
 
 class UtilitiesSensor(CoordinatorEntity, SensorEntity):
     """Representation of a sensor that reports utilities."""
@@ -70,7 +97,7 @@ class UtilitiesSensor(CoordinatorEntity, SensorEntity):
     @callback
     def _handle_coordinator_update(self) -> None:
         """Fetch new state data for the sensor."""
-        updated_value = self._coordinator.api.get_value(self._attr_unique_id)
+        updated_value = self._coordinator.data.get_value(self._attr_unique_id)
         if updated_value != self._attr_native_value:
             self._attr_native_value = updated_value
             self.async_write_ha_state()
@@ -57,7 +57,7 @@ class VentModeSelect(CoordinatorEntity, SelectEntity):
             await self._coordinator.api.set_value(self._config.guest_mode, value=True)
 
     def _check_home_mode(self) -> bool:
-        is_home_mode_on = self._coordinator.api.get_value(self._config.home_mode)
+        is_home_mode_on = self._coordinator.data.get_value(self._config.home_mode)
         if is_home_mode_on and self.current_option != VentPresetModes.HOME:
             self._attr_current_option = VentPresetModes.HOME
             self.async_write_ha_state()
@@ -65,7 +65,7 @@ class VentModeSelect(CoordinatorEntity, SelectEntity):
         return False
 
     def _check_away_mode(self) -> bool:
-        is_away_mode_on = self._coordinator.api.get_value(self._config.away_mode)
+        is_away_mode_on = self._coordinator.data.get_value(self._config.away_mode)
         if is_away_mode_on and self.current_option != VentPresetModes.AWAY:
             self._attr_current_option = VentPresetModes.AWAY
             self.async_write_ha_state()
@@ -73,7 +73,7 @@ class VentModeSelect(CoordinatorEntity, SelectEntity):
         return False
 
     def _check_guest_mode(self) -> bool:
-        is_guest_mode_on = self._coordinator.api.get_value(self._config.guest_mode)
+        is_guest_mode_on = self._coordinator.data.get_value(self._config.guest_mode)
         if is_guest_mode_on and self.current_option != VentPresetModes.GUESTS:
             self._attr_current_option = VentPresetModes.GUESTS
             self.async_write_ha_state()
@@ -72,7 +72,7 @@ class VentTempSelect(CoordinatorEntity, SelectEntity):
     def _handle_coordinator_update(self) -> None:
         """Fetch new state data for the sensor."""
         # If winter mode is on, that means warm air is being pushed in
-        is_winter_mode_on = self._coordinator.api.get_value(
+        is_winter_mode_on = self._coordinator.data.get_value(
             self._config.vent_winter_mode
         )
         if is_winter_mode_on:
@@ -57,8 +57,8 @@ class VentTemperatureSensor(CoordinatorEntity, SensorEntity):
         return self._attr_native_value
 
     def _check_home_mode(self) -> bool:
-        is_home_mode_on = self._coordinator.api.get_value(self._config.home_mode)
-        home_vent_temperature = self._coordinator.api.get_value(
+        is_home_mode_on = self._coordinator.data.get_value(self._config.home_mode)
+        home_vent_temperature = self._coordinator.data.get_value(
             self._config.home_vent_air_temp
         )
         if is_home_mode_on and (
@@ -72,8 +72,8 @@ class VentTemperatureSensor(CoordinatorEntity, SensorEntity):
         return False
 
     def _check_away_mode(self) -> bool:
-        is_away_mode_on = self._coordinator.api.get_value(self._config.away_mode)
-        away_vent_temperature = self._coordinator.api.get_value(
+        is_away_mode_on = self._coordinator.data.get_value(self._config.away_mode)
+        away_vent_temperature = self._coordinator.data.get_value(
             self._config.away_vent_air_temp
         )
         if is_away_mode_on and (
@@ -87,8 +87,8 @@ class VentTemperatureSensor(CoordinatorEntity, SensorEntity):
         return False
 
     def _check_guest_mode(self) -> bool:
-        is_guest_mode_on = self._coordinator.api.get_value(self._config.guest_mode)
-        guest_vent_temperature = self._coordinator.api.get_value(
+        is_guest_mode_on = self._coordinator.data.get_value(self._config.guest_mode)
+        guest_vent_temperature = self._coordinator.data.get_value(
             self._config.guest_vent_air_temp
         )
         if is_guest_mode_on and (
@@ -0,0 +1,77 @@
+"""Spreads the work of several config entries over time."""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Protocol
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+_SCHEDULER_KEY = f"{DOMAIN}_scheduler"
+# How many entries log in and download their panel at the same time
+MAX_CONCURRENT_INITIAL_LOADS = 2
+
+
+class PhasedCoordinator(Protocol):
+    """Coordinator whose polls can be shifted within its update interval."""
+
+    def set_phase(self, offset: float) -> None:
+        """Poll offset times the update interval into it."""
+
+
+class EntryScheduler:
+    """
+    Shared by all config entries of a home assistant instance.
+
+    Initial panel loads wait for a slot, so a restart does not log in to every
+    controller at once. Coordinators poll at evenly spaced offsets within their
+    update interval, instead of right after one another as their entries loaded.
+    """
+
+    def __init__(self, max_concurrent_loads: int | None = None) -> None:
+        """Prepare the load slots, MAX_CONCURRENT_INITIAL_LOADS by default."""
+        self._load_slots = asyncio.Semaphore(
+            max_concurrent_loads or MAX_CONCURRENT_INITIAL_LOADS
+        )
+        self._loading = 0
+        self.peak_concurrent_loads = 0
+        self._coordinators: list[PhasedCoordinator] = []
+
+    @asynccontextmanager
+    async def initial_load(self) -> AsyncIterator[None]:
+        """Wait for a slot to log in and load the panel in."""
+        async with self._load_slots:
+            self._loading += 1
+            self.peak_concurrent_loads = max(self.peak_concurrent_loads, self._loading)
+            try:
+                yield
+            finally:
+                self._loading -= 1
+
+    def register(self, coordinator: PhasedCoordinator) -> None:
+        """Give a coordinator a phase, moving the others to make room."""
+        self._coordinators.append(coordinator)
+        self._spread()
+
+    def unregister(self, coordinator: PhasedCoordinator) -> None:
+        """Release the phase of a coordinator."""
+        if coordinator in self._coordinators:
+            self._coordinators.remove(coordinator)
+            self._spread()
+
+    def _spread(self) -> None:
+        count = len(self._coordinators)
+        for i, coordinator in enumerate(self._coordinators):
+            # Centered in equal slots of the interval
+            coordinator.set_phase((i + 0.5) / count)
+        _LOGGER.debug(msg="Spread coordinator phases", extra={"coordinators": count})
+
+
+def async_get_scheduler(hass: HomeAssistant) -> EntryScheduler:
+    """Get the scheduler shared by all config entries."""
+    return hass.data.setdefault(_SCHEDULER_KEY, EntryScheduler())
@@ -1,28 +1,45 @@
 """Entry point for home assistant to set up FanEntity classes."""
 
 import logging
+from collections.abc import Mapping
+from functools import partial
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
-from .entities.ac.room_fan import RoomFan
-from .util.load_fans_config import load_fans_config
+from .coordinator import ComfortClickCoordinator
+from .entities.ac.room_fan import RoomFan, RoomFanConfig
+from .reconfigure import EntityFactory, EntityGroup, PlatformEntities
+from .util.load_entity_configs import EntityConfigs
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _entity_factories(
+    coordinator: ComfortClickCoordinator, entity_configs: EntityConfigs
+) -> Mapping[str, EntityFactory]:
+    """Get a factory per fan, keyed by its configuration."""
+
+    def fan(config: RoomFanConfig) -> EntityGroup:
+        return EntityGroup([RoomFan(coordinator, config)])
+
+    return {repr(config): partial(fan, config) for config in entity_configs.fans}
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Fans."""
-    coordinator = hass.data[DOMAIN][config_entry.entry_id].coordinator
-
-    configs = await load_fans_config()
-    sensors = [RoomFan(coordinator, config) for config in configs]
-
-    # Create the sensors.
-    async_add_entities(sensors)
+    runtime_data = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = runtime_data.coordinator
+
+    with coordinator.startup_timings.phase("fan platform"):
+        entities = runtime_data.platform_entities[Platform.FAN] = PlatformEntities(
+            hass, async_add_entities, partial(_entity_factories, coordinator)
+        )
+        await entities.async_update(runtime_data.entity_configs)
@@ -0,0 +1,58 @@
+"""Hands the connection made by the config flow over to setting up the entry."""
+
+import logging
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .api import ApiInstance
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+_HANDOFF_KEY = f"{DOMAIN}_handoff"
+# Seconds a connection waits for its entry to be set up before logging out
+HANDOFF_TIMEOUT = 120
+
+
+def _key(data: Mapping[str, Any]) -> tuple:
+    # Entry data is only known once the flow finished, the entry id even later
+    return tuple(sorted(data.items()))
+
+
+@callback
+def async_hand_off(
+    hass: HomeAssistant, data: Mapping[str, Any], api: ApiInstance
+) -> None:
+    """Keep a logged in api for the entry created from data, until it expires."""
+    handoffs: dict[tuple, ApiInstance] = hass.data.setdefault(_HANDOFF_KEY, {})
+    key = _key(data)
+    previous = handoffs.pop(key, None)
+    if previous is not None:
+        hass.async_create_task(_async_log_out(previous))
+    handoffs[key] = api
+
+    async def _async_expire(_now: datetime) -> None:
+        if handoffs.get(key) is api:
+            del handoffs[key]
+            _LOGGER.info(msg="Connection from config flow was not used, logging out")
+            await _async_log_out(api)
+
+    async_call_later(hass, HANDOFF_TIMEOUT, _async_expire)
+
+
+@callback
+def async_take_over(hass: HomeAssistant, data: Mapping[str, Any]) -> ApiInstance | None:
+    """Take the api handed off for an entry with data, if there is one."""
+    return hass.data.get(_HANDOFF_KEY, {}).pop(_key(data), None)
+
+
+async def _async_log_out(api: ApiInstance) -> None:
+    try:
+        await api.disconnect()
+    except Exception:  # noqa: BLE001
+        # Logging out is a courtesy, the token expires on its own anyway
+        await api.close()
@@ -0,0 +1,99 @@
+"""Keeps writes that failed while the controller was unreachable, to send them later."""
+
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Seconds removals are batched for, replaying a write twice is harmless
+REMOVE_SAVE_DELAY = 5
+
+
+@dataclass
+class JournaledWrite:
+    """Write waiting for the controller to come back."""
+
+    device_name: str
+    value: Any
+    # Wall clock time, so the age survives restarts
+    queued_at: float
+
+
+class WriteJournal:
+    """
+    Durable queue of writes, holding only the latest write per device.
+
+    Writes are kept in the order they were last queued in. Writes older than
+    max_age seconds are dropped instead of being sent.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, max_age: float) -> None:
+        """Prepare the store of the config entry."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.journal.{entry_id}"
+        )
+        self.max_age = max_age
+        self._writes: dict[str, JournaledWrite] = {}
+
+    def __len__(self) -> int:
+        """Get number of writes waiting."""
+        return len(self._writes)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"writes": [asdict(write) for write in self._writes.values()]}
+
+    async def async_load(self) -> None:
+        """Load writes left over from before a restart."""
+        data = await self._store.async_load() or {}
+        self._writes = {
+            item["device_name"]: JournaledWrite(**item)
+            for item in data.get("writes", [])
+        }
+        if self._writes:
+            _LOGGER.info(
+                msg="Loaded journaled writes", extra={"writes": len(self._writes)}
+            )
+
+    async def async_enqueue(self, device_name: str, value: Any) -> None:
+        """Queue a write, replacing an earlier one to the same device."""
+        self._writes.pop(device_name, None)
+        self._writes[device_name] = JournaledWrite(device_name, value, time.time())
+        await self._store.async_save(self._data_to_save())
+
+    def discard(self, device_name: str) -> None:
+        """Forget the write to a device, eg. as a newer value was sent."""
+        if self._writes.pop(device_name, None) is not None:
+            self._store.async_delay_save(self._data_to_save, REMOVE_SAVE_DELAY)
+
+    def is_pending(self, write: JournaledWrite) -> bool:
+        """Check a write was not replaced or discarded since it was taken."""
+        return self._writes.get(write.device_name) is write
+
+    def remove(self, write: JournaledWrite) -> None:
+        """Forget a sent write, unless it was replaced by a newer one meanwhile."""
+        if self.is_pending(write):
+            self.discard(write.device_name)
+
+    def pending(self) -> list[JournaledWrite]:
+        """Get writes to send in order, dropping the ones that expired."""
+        expired = [
+            write
+            for write in self._writes.values()
+            if time.time() - write.queued_at > self.max_age
+        ]
+        for write in expired:
+            self.discard(write.device_name)
+        if expired:
+            _LOGGER.warning(
+                msg="Dropped journaled writes that expired",
+                extra={"devices": [write.device_name for write in expired]},
+            )
+        return list(self._writes.values())
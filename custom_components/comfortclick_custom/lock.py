@@ -1,28 +1,45 @@
 """Entry point for home assistant to set up LockEntity classes."""
 
 import logging
+from collections.abc import Mapping
+from functools import partial
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
-from .entities.locks.building_lock import BuildingLock
-from .util.load_lock_config import load_lock_config
+from .coordinator import ComfortClickCoordinator
+from .entities.locks.building_lock import BuildingLock, BuildingLockConfig
+from .reconfigure import EntityFactory, EntityGroup, PlatformEntities
+from .util.load_entity_configs import EntityConfigs
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _entity_factories(
+    coordinator: ComfortClickCoordinator, entity_configs: EntityConfigs
+) -> Mapping[str, EntityFactory]:
+    """Get a factory per lock, keyed by its configuration."""
+
+    def lock(config: BuildingLockConfig) -> EntityGroup:
+        return EntityGroup([BuildingLock(coordinator, config)])
+
+    return {repr(config): partial(lock, config) for config in entity_configs.locks}
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Locks."""
-    coordinator = hass.data[DOMAIN][config_entry.entry_id].coordinator
-
-    configs = await load_lock_config()
-    sensors = [BuildingLock(coordinator, config) for config in configs]
-
-    # Create the sensors.
-    async_add_entities(sensors)
+    runtime_data = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = runtime_data.coordinator
+
+    with coordinator.startup_timings.phase("lock platform"):
+        entities = runtime_data.platform_entities[Platform.LOCK] = PlatformEntities(
+            hass, async_add_entities, partial(_entity_factories, coordinator)
+        )
+        await entities.async_update(runtime_data.entity_configs)
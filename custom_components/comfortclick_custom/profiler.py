@@ -0,0 +1,82 @@
+"""Profiles coordinator ticks on demand."""
+
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+_LOGGER = logging.getLogger(__name__)
+
+# How many functions are listed in the text summary
+SUMMARY_LINES = 40
+
+
+class TickProfiler:
+    """
+    Collects a cProfile of a fixed number of coordinator ticks.
+
+    The profiler is only enabled while a tick runs. As cProfile profiles the whole
+    thread, work of other integrations running while a tick awaits is included.
+    """
+
+    def __init__(self, ticks: int) -> None:
+        """Prepare profiling the next ticks."""
+        self.ticks = ticks
+        self.profiled_ticks = 0
+        self.elapsed = 0.0
+        self._profile = cProfile.Profile()
+        self.done: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+
+    @contextmanager
+    def tick(self) -> Iterator[None]:
+        """Profile the wrapped tick, unless enough ticks were profiled already."""
+        if self.done.done():
+            yield
+            return
+        try:
+            self._profile.enable()
+        except ValueError as e:
+            # Another profiler, eg. the profiler integration, is already running
+            if not self.done.done():
+                self.done.set_exception(e)
+            yield
+            return
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._profile.disable()
+            self.elapsed += time.perf_counter() - started
+            self.profiled_ticks += 1
+            if self.profiled_ticks >= self.ticks and not self.done.done():
+                self.done.set_result(None)
+
+    def write(self, directory: Path) -> tuple[Path, Path]:
+        """Write the profile and a text summary of it, blocks on file io."""
+        base = (
+            directory / f"comfortclick_custom_profile_{time.strftime('%Y%m%d_%H%M%S')}"
+        )
+        profile_path = base.with_suffix(".prof")
+        summary_path = base.with_suffix(".txt")
+        self._profile.dump_stats(profile_path)
+
+        summary = io.StringIO()
+        summary.write(
+            f"Profiled {self.profiled_ticks} of {self.ticks} ticks, "
+            f"{self.elapsed:.3f} seconds in total\n"
+        )
+        stats = pstats.Stats(self._profile, stream=summary)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_LINES)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(SUMMARY_LINES)
+        summary_path.write_text(summary.getvalue())
+        _LOGGER.info(
+            msg="Wrote profile",
+            extra={"profile": str(profile_path), "summary": str(summary_path)},
+        )
+        return profile_path, summary_path
@@ -0,0 +1,203 @@
+"""Shares the polled state of a controller with other local consumers."""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import ipaddress
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from aiohttp import web
+
+from .api import StateSnapshot
+from .services import ATTR_DEVICE_NAME, ATTR_VALUE, ATTR_VALUES, SET_VALUES_SCHEMA
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from .coordinator import ComfortClickCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ProxyTokenRequiredError(Exception):
+    """Raised when the proxy would serve other hosts without a token."""
+
+
+def is_loopback(host: str) -> bool:
+    """Check a host only accepts connections from this machine."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+@dataclass(eq=False)
+class _Subscriber:
+    """Stream client, with the changes it has not been sent yet."""
+
+    changes: dict[str, Any] = field(default_factory=dict)
+    version: int = 0
+    wake: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class StateProxy:
+    """
+    Local http server that other consumers use instead of polling the controller.
+
+    GET /state streams server-sent events, a snapshot event with all values
+    followed by a delta event with the changed values after every poll. Changes
+    are merged until a slow client has taken them, so it never falls behind by
+    more than one value per device. GET /snapshot returns all values once and
+    POST /values writes a batch of values, shaped like the set_values service.
+    """
+
+    def __init__(
+        self,
+        coordinator: ComfortClickCoordinator,
+        host: str,
+        port: int,
+        token: str | None = None,
+    ) -> None:
+        """Prepare serving the state of the coordinator, port 0 picks a free one."""
+        self.host = host
+        self.port = port
+        self.token = token
+        self._coordinator = coordinator
+        self._last: StateSnapshot = coordinator.data or StateSnapshot()
+        self._subscribers: set[_Subscriber] = set()
+        self._closing = False
+        self._runner: web.AppRunner | None = None
+        self._remove_listener: Callable[[], None] | None = None
+
+    @property
+    def subscribers(self) -> int:
+        """Get number of clients streaming the state."""
+        return len(self._subscribers)
+
+    @property
+    def bound_port(self) -> int | None:
+        """Get the port the server listens on, None while it is stopped."""
+        if self._runner is None or not self._runner.addresses:
+            return None
+        return self._runner.addresses[0][1]
+
+    async def async_start(self) -> None:
+        """
+        Start listening, raises OSError when the port can not be bound.
+
+        Raises ProxyTokenRequiredError without a token on a host other machines
+        can connect to, as anyone on the network could write values otherwise.
+        """
+        if self.token is None and not is_loopback(self.host):
+            msg = f"A token is required to serve the state on {self.host}"
+            raise ProxyTokenRequiredError(msg)
+        app = web.Application(middlewares=[self._authorize])
+        app.router.add_get("/state", self._stream)
+        app.router.add_get("/snapshot", self._snapshot)
+        app.router.add_post("/values", self._set_values)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except OSError:
+            await runner.cleanup()
+            raise
+        self._runner = runner
+        self._remove_listener = self._coordinator.async_add_listener(self._on_update)
+        _LOGGER.info(
+            msg="Serving controller state",
+            extra={"host": self.host, "port": self.bound_port},
+        )
+
+    async def async_stop(self) -> None:
+        """Close all streams and stop listening."""
+        if self._remove_listener is not None:
+            self._remove_listener()
+            self._remove_listener = None
+        self._closing = True
+        for subscriber in self._subscribers:
+            subscriber.wake.set()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _on_update(self) -> None:
+        snapshot = self._coordinator.data
+        if snapshot is None or snapshot is self._last:
+            return
+        changes = snapshot.changes_since(self._last)
+        self._last = snapshot
+        if not changes:
+            return
+        for subscriber in self._subscribers:
+            subscriber.changes.update(changes)
+            subscriber.version = snapshot.version
+            subscriber.wake.set()
+
+    @web.middleware
+    async def _authorize(
+        self,
+        request: web.Request,
+        handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+    ) -> web.StreamResponse:
+        if self.token is not None and not hmac.compare_digest(
+            request.headers.get("Authorization", ""), f"Bearer {self.token}"
+        ):
+            raise web.HTTPUnauthorized
+        return await handler(request)
+
+    def _event(self, name: str, version: int, values: dict[str, Any]) -> bytes:
+        data = self._coordinator.api.codec.dumps({"version": version, "values": values})
+        return b"event: " + name.encode() + b"\ndata: " + data + b"\n\n"
+
+    async def _stream(self, request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(
+            headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}
+        )
+        await response.prepare(request)
+        subscriber = _Subscriber()
+        self._subscribers.add(subscriber)
+        try:
+            await response.write(
+                self._event("snapshot", self._last.version, dict(self._last))
+            )
+            while not self._closing:
+                await subscriber.wake.wait()
+                subscriber.wake.clear()
+                if self._closing:
+                    break
+                changes, subscriber.changes = subscriber.changes, {}
+                await response.write(self._event("delta", subscriber.version, changes))
+        except ConnectionResetError:
+            _LOGGER.debug(msg="State stream client went away")
+        finally:
+            self._subscribers.discard(subscriber)
+        return response
+
+    async def _snapshot(self, _request: web.Request) -> web.Response:
+        return web.Response(
+            body=self._coordinator.api.codec.dumps(
+                {"version": self._last.version, "values": dict(self._last)}
+            ),
+            content_type="application/json",
+        )
+
+    async def _set_values(self, request: web.Request) -> web.Response:
+        api = self._coordinator.api
+        try:
+            data = SET_VALUES_SCHEMA(api.codec.loads(await request.read()))
+        except (ValueError, vol.Invalid) as e:
+            raise web.HTTPBadRequest(text=str(e)) from e
+        results = await api.set_values(
+            [(item[ATTR_DEVICE_NAME], item[ATTR_VALUE]) for item in data[ATTR_VALUES]]
+        )
+        return web.Response(
+            body=api.codec.dumps({"results": [asdict(result) for result in results]}),
+            content_type="application/json",
+        )
@@ -0,0 +1,189 @@
+"""Applies changes to the configuration of a loaded entry without reloading it."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Self
+
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+from .schedule import ScheduleEngine
+from .util.add_entities import async_add_entities_in_chunks
+from .util.load_entity_configs import load_entity_configs
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity import Entity
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from .util.load_entity_configs import EntityConfigs
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class EntityGroup:
+    """Entities created from one definition in the configuration."""
+
+    entities: list[Entity]
+    # Called once the entities are removed, eg. to stop an engine they share
+    on_remove: list[Callable[[], None]] = field(default_factory=list)
+
+    def stop(self) -> None:
+        """Release what the entities shared."""
+        for on_remove in self.on_remove:
+            on_remove()
+
+
+# Creates the entities of a definition, only called when the definition is new
+type EntityFactory = Callable[[], EntityGroup]
+
+
+@dataclass
+class ReconfigureResult:
+    """Number of entities that reconfiguring added and removed."""
+
+    added: int = 0
+    removed: int = 0
+
+    def __iadd__(self, other: ReconfigureResult) -> Self:
+        """Count the entities of another platform too."""
+        self.added += other.added
+        self.removed += other.removed
+        return self
+
+
+class PlatformEntities:
+    """
+    Entities a platform added, keyed by the definition each group was created from.
+
+    A definition key changes whenever anything in the definition changes, so
+    comparing keys tells which entities have to be replaced.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        async_add_entities: AddEntitiesCallback,
+        entity_factories: Callable[[EntityConfigs], Mapping[str, EntityFactory]],
+    ) -> None:
+        """Prepare adding entities through the callback of the platform."""
+        self._hass = hass
+        self._async_add_entities = async_add_entities
+        self._entity_factories = entity_factories
+        self.groups: dict[str, EntityGroup] = {}
+        # Called when the platform is unloaded, after the groups are stopped
+        self.on_unload: list[Callable[[], None]] = []
+
+    def __len__(self) -> int:
+        """Get number of entities the platform added."""
+        return sum(len(group.entities) for group in self.groups.values())
+
+    async def async_update(self, entity_configs: EntityConfigs) -> ReconfigureResult:
+        """Replace entities whose definition changed, leaving the others running."""
+        factories = self._entity_factories(entity_configs)
+
+        removed: list[Entity] = []
+        for key in [key for key in self.groups if key not in factories]:
+            group = self.groups.pop(key)
+            for entity in group.entities:
+                if entity.hass is not None:
+                    await entity.async_remove(force_remove=True)
+            group.stop()
+            removed.extend(group.entities)
+
+        added = {key: factories[key]() for key in factories if key not in self.groups}
+        self.groups.update(added)
+        entities = [entity for group in added.values() for entity in group.entities]
+        await async_add_entities_in_chunks(self._async_add_entities, entities)
+
+        # Registry entries of entities that are gone, not replaced by a new version
+        unique_ids = {entity.unique_id for entity in entities}
+        registry = er.async_get(self._hass)
+        for entity in removed:
+            if entity.unique_id not in unique_ids and entity.registry_entry:
+                registry.async_remove(entity.registry_entry.entity_id)
+        return ReconfigureResult(len(entities), len(removed))
+
+    def unload(self) -> None:
+        """Release what entities of the platform shared, once they are removed."""
+        for group in self.groups.values():
+            group.stop()
+        self.groups.clear()
+        for on_unload in self.on_unload:
+            on_unload()
+
+
+async def async_reconfigure(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> ReconfigureResult:
+    """
+    Read the configuration again and apply what changed to a loaded entry.
+
+    Only entities whose definitions changed are replaced, the login, the loaded
+    panel and all other entities are kept. Platforms are set up or unloaded as
+    they gain their first or lose their last entity.
+    """
+    runtime_data = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = runtime_data.coordinator
+    previous = runtime_data.entity_configs
+    entity_configs = await load_entity_configs(runtime_data.discovered or None)
+    # Devices that were not configured before may be in panel paths not loaded yet
+    await coordinator.async_extend_scope(entity_configs.device_ids())
+    runtime_data.entity_configs = entity_configs
+
+    result = ReconfigureResult()
+    platforms = entity_configs.platforms()
+    for platform in runtime_data.platforms:
+        if platform in platforms:
+            result += await runtime_data.platform_entities[platform].async_update(
+                entity_configs
+            )
+
+    unloaded = [
+        platform for platform in runtime_data.platforms if platform not in platforms
+    ]
+    loaded = [
+        platform for platform in platforms if platform not in runtime_data.platforms
+    ]
+    runtime_data.platforms = platforms
+    if unloaded:
+        result.removed += sum(
+            len(runtime_data.platform_entities[platform]) for platform in unloaded
+        )
+        await hass.config_entries.async_unload_platforms(config_entry, unloaded)
+        for platform in unloaded:
+            runtime_data.platform_entities.pop(platform).unload()
+    if loaded:
+        await hass.config_entries.async_forward_entry_setups(config_entry, loaded)
+        result.added += sum(
+            # A platform that failed to set up did not register its entities
+            len(runtime_data.platform_entities.get(platform, ()))
+            for platform in loaded
+        )
+
+    if previous is None or entity_configs.schedules != previous.schedules:
+        if runtime_data.schedule is not None:
+            runtime_data.schedule.stop()
+            runtime_data.schedule = None
+        if entity_configs.schedules:
+            runtime_data.schedule = ScheduleEngine(
+                hass, coordinator.api, entity_configs.schedules
+            )
+            runtime_data.schedule.start()
+
+    _LOGGER.info(
+        msg="Reconfigured entry",
+        extra={
+            "added": result.added,
+            "removed": result.removed,
+            "platforms_loaded": loaded,
+            "platforms_unloaded": unloaded,
+        },
+    )
+    return result
@@ -0,0 +1,135 @@
+"""Writes scheduled values to devices at the boundaries of their time slots."""
+
+import heapq
+import itertools
+import logging
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.util import dt as dt_util
+
+from .api import ApiInstance, SetValueResult
+
+_LOGGER = logging.getLogger(__name__)
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+@dataclass(frozen=True)
+class ScheduledTransition:
+    """Value a device is set to at a time of day."""
+
+    device_name: str
+    value: Any
+    at: time
+    # datetime.weekday() numbers the transition applies on, Monday being 0
+    weekdays: frozenset[int] = field(default_factory=lambda: frozenset(range(7)))
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Get the first time the transition happens after moment."""
+        for days in range(8):
+            day = moment.date() + timedelta(days=days)
+            candidate = datetime.combine(day, self.at, tzinfo=moment.tzinfo)
+            if candidate > moment and day.weekday() in self.weekdays:
+                return candidate
+        msg = "Transition has no weekdays"
+        raise ValueError(msg)
+
+
+class ScheduleEngine:
+    """
+    Keeps upcoming transitions in a heap ordered by when they happen.
+
+    A single timer waits for the earliest one. When it fires, every due transition
+    is written in one batch, leaving out devices that already have the value.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: ApiInstance,
+        transitions: Iterable[ScheduledTransition],
+    ) -> None:
+        """Index the transitions from now on."""
+        self._hass = hass
+        self._api = api
+        # Breaks ties between transitions happening at the same time
+        self._counter = itertools.count()
+        self._heap: list[tuple[datetime, int, ScheduledTransition]] = []
+        now = dt_util.now()
+        for transition in transitions:
+            self._push(transition, now)
+        self._cancel_timer: Callable[[], None] | None = None
+
+    def _push(self, transition: ScheduledTransition, after: datetime) -> None:
+        # Times of day are local, while timers may pass times in UTC
+        next_at = transition.next_after(dt_util.as_local(after))
+        heapq.heappush(self._heap, (next_at, next(self._counter), transition))
+
+    @property
+    def next_boundary(self) -> datetime | None:
+        """Get when the next transition happens."""
+        return self._heap[0][0] if self._heap else None
+
+    def due(self, now: datetime) -> list[ScheduledTransition]:
+        """Take transitions due by now and index their next occurrence."""
+        # Device name -> latest due transition, a missed earlier one is superseded
+        due: dict[str, ScheduledTransition] = {}
+        while self._heap and self._heap[0][0] <= now:
+            _, _, transition = heapq.heappop(self._heap)
+            due.pop(transition.device_name, None)
+            due[transition.device_name] = transition
+            self._push(transition, now)
+        return list(due.values())
+
+    async def async_run_due(self, now: datetime) -> list[SetValueResult]:
+        """Write the values of transitions due by now, skipping unchanged devices."""
+        writes = [
+            (transition.device_name, transition.value)
+            for transition in self.due(now)
+            if not self._api.has_device(transition.device_name)
+            or self._api.get_value(transition.device_name) != transition.value
+        ]
+        if not writes:
+            return []
+        results = await self._api.set_values(writes)
+        failed = [result for result in results if not result.success]
+        _LOGGER.info(
+            msg="Wrote scheduled values",
+            extra={"writes": len(writes), "failed": len(failed)},
+        )
+        if failed:
+            _LOGGER.warning(
+                msg="Failed to write scheduled values",
+                extra={
+                    "errors": {result.device_name: result.error for result in failed}
+                },
+            )
+        return results
+
+    @callback
+    def start(self) -> None:
+        """Wait for the next boundary."""
+        boundary = self.next_boundary
+        if boundary is not None:
+            self._cancel_timer = async_track_point_in_time(
+                self._hass, self._async_boundary, boundary
+            )
+
+    async def _async_boundary(self, now: datetime) -> None:
+        self._cancel_timer = None
+        try:
+            await self.async_run_due(now)
+        finally:
+            self.start()
+
+    @callback
+    def stop(self) -> None:
+        """Stop waiting for boundaries."""
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+            self._cancel_timer = None
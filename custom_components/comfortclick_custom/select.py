@@ -1,29 +1,51 @@
 """Entry point for home assistant to set up SelectEntity classes."""
 
 import logging
+from collections.abc import Mapping
+from functools import partial
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
+from .coordinator import ComfortClickCoordinator
 from .entities.vent.vent_mode_select import VentModeSelect
 from .entities.vent.vent_temp_select import VentTempSelect
-from .util.load_vent_config import load_vent_config
+from .reconfigure import EntityFactory, EntityGroup, PlatformEntities
+from .util.load_entity_configs import EntityConfigs
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _entity_factories(
+    coordinator: ComfortClickCoordinator, entity_configs: EntityConfigs
+) -> Mapping[str, EntityFactory]:
+    """Get a factory for the vent selects, keyed by the vent configuration."""
+    if not entity_configs.has_vent:
+        return {}
+    config = entity_configs.vent
+
+    def vent() -> EntityGroup:
+        return EntityGroup(
+            [VentModeSelect(coordinator, config), VentTempSelect(coordinator, config)]
+        )
+
+    return {repr(config): vent}
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Selects."""
-    coordinator = hass.data[DOMAIN][config_entry.entry_id].coordinator
-
-    config = await load_vent_config()
-    sensors = [VentModeSelect(coordinator, config), VentTempSelect(coordinator, config)]
-
-    # Create the sensors.
-    async_add_entities(sensors)
+    runtime_data = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = runtime_data.coordinator
+
+    with coordinator.startup_timings.phase("select platform"):
+        entities = runtime_data.platform_entities[Platform.SELECT] = PlatformEntities(
+            hass, async_add_entities, partial(_entity_factories, coordinator)
+        )
+        await entities.async_update(runtime_data.entity_configs)
@@ -1,34 +1,107 @@
 """Entry point for home assistant to set up SensorEntity classes."""
 
 import logging
+from collections.abc import Mapping
+from functools import partial
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
-from .entities.utilities.utilities_sensor import UtilitiesSensor
+from .coordinator import ComfortClickCoordinator
+from .entities.aggregate.aggregate_engine import AggregateEngine
+from .entities.aggregate.aggregate_sensor import AggregateSensor
+from .entities.derived.derived_engine import DerivedEngine
+from .entities.derived.derived_sensor import DerivedSensor
+from .entities.utilities.meter_history import MeterHistoryRecorder
+from .entities.utilities.utilities_rate_sensor import (
+    UtilitiesConsumptionSensor,
+    UtilitiesRateSensor,
+)
+from .entities.utilities.utilities_sensor import UtilitiesSensor, UtilitiesSensorConfig
 from .entities.vent.vent_temp_sensor import VentTemperatureSensor
-from .util.load_utilities_config import load_utilities_config
-from .util.load_vent_config import load_vent_config
+from .reconfigure import EntityFactory, EntityGroup, PlatformEntities
+from .util.load_entity_configs import EntityConfigs
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _entity_factories(
+    coordinator: ComfortClickCoordinator,
+    meter_history: MeterHistoryRecorder,
+    entity_configs: EntityConfigs,
+) -> Mapping[str, EntityFactory]:
+    """
+    Get a factory per utility meter, the vent and each kind of computed sensors.
+
+    Derived and aggregate sensors share an engine per kind, so all sensors of a
+    kind are replaced together when any of them changes.
+    """
+
+    def utility(config: UtilitiesSensorConfig) -> EntityGroup:
+        window = max(config.rate_window, config.consumption_window)
+        history = meter_history.track(config.id, window.total_seconds())
+        return EntityGroup(
+            [
+                UtilitiesSensor(coordinator, config),
+                UtilitiesRateSensor(coordinator, config, history),
+                UtilitiesConsumptionSensor(coordinator, config, history),
+            ],
+            [partial(meter_history.untrack, config.id)],
+        )
+
+    def vent() -> EntityGroup:
+        return EntityGroup([VentTemperatureSensor(coordinator, entity_configs.vent)])
+
+    def derived() -> EntityGroup:
+        engine = DerivedEngine(lambda: coordinator.data, entity_configs.derived)
+        return EntityGroup(
+            [
+                DerivedSensor(coordinator, config, engine)
+                for config in entity_configs.derived
+            ]
+        )
+
+    def aggregates() -> EntityGroup:
+        engine = AggregateEngine(lambda: coordinator.data, entity_configs.aggregates)
+        return EntityGroup(
+            [
+                AggregateSensor(coordinator, config, engine)
+                for config in entity_configs.aggregates
+            ]
+        )
+
+    factories: dict[str, EntityFactory] = {
+        f"utilities:{config!r}": partial(utility, config)
+        for config in entity_configs.utilities
+    }
+    if entity_configs.has_vent:
+        factories[f"vent:{entity_configs.vent!r}"] = vent
+    if entity_configs.derived:
+        factories[f"derived:{entity_configs.derived!r}"] = derived
+    if entity_configs.aggregates:
+        factories[f"aggregates:{entity_configs.aggregates!r}"] = aggregates
+    return factories
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Sensors."""
-    coordinator = hass.data[DOMAIN][config_entry.entry_id].coordinator
-
-    utilities_configs = await load_utilities_config()
-    vent_config = await load_vent_config()
-
-    sensors = [UtilitiesSensor(coordinator, config) for config in utilities_configs]
-
-    sensors.append(VentTemperatureSensor(coordinator, vent_config))
+    runtime_data = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = runtime_data.coordinator
 
-    # Create the sensors.
-    async_add_entities(sensors)
+    with coordinator.startup_timings.phase("sensor platform"):
+        # Meters are tracked and untracked as their sensors are added and removed
+        meter_history = MeterHistoryRecorder(coordinator.api, [])
+        entities = runtime_data.platform_entities[Platform.SENSOR] = PlatformEntities(
+            hass,
+            async_add_entities,
+            partial(_entity_factories, coordinator, meter_history),
+        )
+        entities.on_unload.append(meter_history.stop)
+        await entities.async_update(runtime_data.entity_configs)
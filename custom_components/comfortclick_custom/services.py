@@ -0,0 +1,208 @@
+"""Services exposed by the integration to home assistant."""
+
+from __future__ import annotations
+
+import logging
+from collections import ChainMap
+from dataclasses import asdict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+from homeassistant.core import ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import DOMAIN
+from .reconfigure import async_reconfigure
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .coordinator import ComfortClickCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_SET_VALUES = "set_values"
+SERVICE_PROFILE = "profile"
+SERVICE_SEARCH_DEVICES = "search_devices"
+SERVICE_RELOAD = "reload"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_VALUES = "values"
+ATTR_DEVICE_NAME = "device_name"
+ATTR_VALUE = "value"
+ATTR_TICKS = "ticks"
+ATTR_QUERY = "query"
+ATTR_MATCH = "match"
+ATTR_LIMIT = "limit"
+
+DEFAULT_PROFILE_TICKS = 10
+MAX_PROFILE_TICKS = 600
+DEFAULT_SEARCH_LIMIT = 100
+
+SET_VALUES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_VALUES): vol.All(
+            cv.ensure_list,
+            [
+                vol.Schema(
+                    {
+                        vol.Required(ATTR_DEVICE_NAME): cv.string,
+                        vol.Required(ATTR_VALUE): vol.Any(bool, int, float, str),
+                    }
+                )
+            ],
+        ),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_TICKS, default=DEFAULT_PROFILE_TICKS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PROFILE_TICKS)
+        ),
+    }
+)
+
+SEARCH_DEVICES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_QUERY): cv.string,
+        vol.Optional(ATTR_MATCH, default="contains"): vol.In(["prefix", "contains"]),
+        vol.Optional(ATTR_LIMIT, default=DEFAULT_SEARCH_LIMIT): vol.All(
+            vol.Coerce(int), vol.Range(min=1)
+        ),
+    }
+)
+
+RELOAD_SCHEMA = vol.Schema({vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string})
+
+
+def _get_coordinator(hass: HomeAssistant, call: ServiceCall) -> ComfortClickCoordinator:
+    """Find the coordinator of the controller the service call is targeting."""
+    runtimes = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    if entry_id is None:
+        if len(runtimes) != 1:
+            msg = "config_entry_id is required when there is not exactly one controller"
+            raise ServiceValidationError(msg)
+        entry_id = next(iter(runtimes))
+    if entry_id not in runtimes:
+        msg = f"Controller {entry_id} is not loaded"
+        raise ServiceValidationError(msg)
+    return runtimes[entry_id].coordinator
+
+
+async def _async_set_values(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Write a batch of values to the controller."""
+    coordinator = _get_coordinator(hass, call)
+    values = [
+        (item[ATTR_DEVICE_NAME], item[ATTR_VALUE]) for item in call.data[ATTR_VALUES]
+    ]
+    results = await coordinator.api.set_values(values)
+    failed = [result for result in results if not result.success]
+    if failed:
+        _LOGGER.warning(
+            msg="Some values failed to be set",
+            extra={"failed": len(failed), "total": len(results)},
+        )
+    return {"results": [asdict(result) for result in results]}
+
+
+async def _async_profile(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Profile the next coordinator ticks and write the result to the config folder."""
+    coordinator = _get_coordinator(hass, call)
+    if coordinator.is_profiling:
+        msg = "A profile of this controller is already running"
+        raise ServiceValidationError(msg)
+    try:
+        profiler = await coordinator.async_profile(call.data[ATTR_TICKS])
+    except ValueError as e:
+        msg = f"Failed to start profiling: {e}"
+        raise ServiceValidationError(msg) from e
+    profile_path, summary_path = await hass.async_add_executor_job(
+        profiler.write, Path(hass.config.path())
+    )
+    return {
+        "profile": str(profile_path),
+        "summary": str(summary_path),
+        "ticks": profiler.profiled_ticks,
+    }
+
+
+async def _async_search_devices(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Find devices on the panel by name or current value."""
+    coordinator = _get_coordinator(hass, call)
+    catalogue, panel_values = await coordinator.api.load_catalogue()
+    # Values as entities show them, publishing a snapshot is up to the coordinator
+    entries = catalogue.search(
+        call.data[ATTR_QUERY],
+        ChainMap(coordinator.data, panel_values),
+        mode=call.data[ATTR_MATCH],
+        limit=call.data[ATTR_LIMIT],
+    )
+    return {"devices": [asdict(entry) for entry in entries]}
+
+
+async def _async_reload(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Apply changes of the config file to controllers without reloading them."""
+    runtimes = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    if entry_id is not None and entry_id not in runtimes:
+        msg = f"Controller {entry_id} is not loaded"
+        raise ServiceValidationError(msg)
+    results = {}
+    for reloaded_id in [entry_id] if entry_id is not None else list(runtimes):
+        config_entry = hass.config_entries.async_get_entry(reloaded_id)
+        results[reloaded_id] = asdict(await async_reconfigure(hass, config_entry))
+    return {"entries": results}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def _set_values(call: ServiceCall) -> ServiceResponse:
+        return await _async_set_values(hass, call)
+
+    async def _profile(call: ServiceCall) -> ServiceResponse:
+        return await _async_profile(hass, call)
+
+    async def _search_devices(call: ServiceCall) -> ServiceResponse:
+        return await _async_search_devices(hass, call)
+
+    async def _reload(call: ServiceCall) -> ServiceResponse:
+        return await _async_reload(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_VALUES,
+        _set_values,
+        schema=SET_VALUES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        _profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SEARCH_DEVICES,
+        _search_devices,
+        schema=SEARCH_DEVICES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RELOAD,
+        _reload,
+        schema=RELOAD_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,19 @@
+"""Utility helper to add a large number of entities without blocking the event loop."""
+
+import asyncio
+from collections.abc import Sequence
+
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+# How many entities are handed to home assistant at once
+ENTITY_CHUNK_SIZE = 200
+
+
+async def async_add_entities_in_chunks(
+    async_add_entities: AddEntitiesCallback, entities: Sequence[Entity]
+) -> None:
+    """Add entities in chunks, letting other work run on the event loop in between."""
+    for start in range(0, len(entities), ENTITY_CHUNK_SIZE):
+        async_add_entities(entities[start : start + ENTITY_CHUNK_SIZE])
+        await asyncio.sleep(0)
@@ -0,0 +1,82 @@
+"""Utility helper to read aggregate sensors yaml config file."""
+
+import logging
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+from ..entities.aggregate.aggregate_config import AggregateSensorConfig
+from .read_yaml import read_yaml
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UnknownAggregateSourceError(Exception):
+    """Raised when an aggregate refers to an unknown section or field."""
+
+
+def _split(source: str, sections: Mapping[str, Sequence[Any]]) -> tuple[str, str]:
+    section, _, field = source.partition(".")
+    if section not in sections or not field:
+        raise UnknownAggregateSourceError(source)
+    return section, field
+
+
+def _devices(
+    item: Mapping[str, Any], sections: Mapping[str, Sequence[Any]]
+) -> tuple[list[str], list[str]]:
+    """Get the devices and reference devices of an aggregate."""
+    devices = list(item.get("devices", []))
+    reference = list(item.get("reference", []))
+    if not item.get("source"):
+        return devices, reference
+
+    section, field = _split(item["source"], sections)
+    reference_field = None
+    if item.get("reference_source"):
+        reference_section, reference_field = _split(item["reference_source"], sections)
+        if reference_section != section:
+            raise UnknownAggregateSourceError(item["reference_source"])
+    try:
+        for config in sections[section]:
+            device = getattr(config, field)
+            if not device:
+                continue
+            if reference_field is not None:
+                # Entities missing the reference are left out of both lists
+                if not getattr(config, reference_field):
+                    continue
+                reference.append(getattr(config, reference_field))
+            devices.append(device)
+    except AttributeError as e:
+        raise UnknownAggregateSourceError(item["source"]) from e
+    return devices, reference
+
+
+async def load_aggregates_config(
+    sections: Mapping[str, Sequence[Any]],
+) -> list[AggregateSensorConfig]:
+    """
+    Read aggregate sensors config file.
+
+    Besides listing devices, an aggregate can take a device id field from every
+    entity in a section of the loaded configuration, eg. thermostats.heating_id.
+    """
+    data = await read_yaml()
+
+    configs = []
+    for item in data.get("aggregates", None) or []:
+        devices, reference = _devices(item, sections)
+        configs.append(
+            AggregateSensorConfig(
+                id=item["id"],
+                name=item.get("name", None),
+                function=item["function"],
+                devices=devices,
+                reference=reference,
+                threshold=float(item.get("threshold", 0)),
+                unit_of_measurement=item.get("unit_of_measurement", None),
+                device_class=item.get("device_class", None),
+                state_class=item.get("state_class", None),
+            )
+        )
+    return configs
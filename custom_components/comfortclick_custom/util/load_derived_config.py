@@ -0,0 +1,26 @@
+"""Utility helper to read derived sensors yaml config file."""
+
+import logging
+
+from ..entities.derived.derived_config import DerivedSensorConfig
+from .read_yaml import read_yaml
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def load_derived_config() -> list[DerivedSensorConfig]:
+    """Read derived sensors config file."""
+    data = await read_yaml()
+
+    return [
+        DerivedSensorConfig(
+            id=item["id"],
+            name=item.get("name", None),
+            expression=item["expression"],
+            inputs=dict(item.get("inputs", {})),
+            unit_of_measurement=item.get("unit_of_measurement", None),
+            device_class=item.get("device_class", None),
+            state_class=item.get("state_class", None),
+        )
+        for item in data.get("derived", [])
+    ]
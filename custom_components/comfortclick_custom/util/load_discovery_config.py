@@ -0,0 +1,31 @@
+"""Utility helper to read discovery settings from the yaml config file."""
+
+import logging
+from dataclasses import dataclass, field
+
+from .read_yaml import read_yaml
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class DiscoveryConfig:
+    """Class for keeping discovery configuration options."""
+
+    enabled: bool = False
+    # Role -> regular expression overriding the default pattern of the role
+    patterns: dict[str, str] = field(default_factory=dict)
+
+
+async def load_discovery_config() -> DiscoveryConfig:
+    """Read discovery config file."""
+    config = await read_yaml()
+    item = config.get("discovery", None) or {}
+    return DiscoveryConfig(
+        enabled=bool(item.get("enabled", False)),
+        patterns={
+            role: pattern
+            for role, pattern in (item.get("patterns", None) or {}).items()
+            if pattern
+        },
+    )
@@ -0,0 +1,133 @@
+"""Utility helper to read the configuration of all entities at once."""
+
+import asyncio
+import logging
+from collections.abc import Mapping
+from dataclasses import astuple, dataclass
+
+from homeassistant.const import Platform
+
+from ..entities.ac.room_fan import RoomFanConfig
+from ..entities.ac.room_thermostat import RoomThermostatConfig
+from ..entities.aggregate.aggregate_config import AggregateSensorConfig
+from ..entities.derived.derived_config import DerivedSensorConfig
+from ..entities.locks.building_lock import BuildingLockConfig
+from ..entities.utilities.utilities_sensor import UtilitiesSensorConfig
+from ..entities.vent.vent_config import VentConfig
+from ..schedule import ScheduledTransition
+from .load_aggregates_config import load_aggregates_config
+from .load_derived_config import load_derived_config
+from .load_fans_config import load_fans_config
+from .load_lock_config import load_lock_config
+from .load_schedules_config import load_schedules_config
+from .load_thermostats_config import load_thermostats_config
+from .load_utilities_config import load_utilities_config
+from .load_vent_config import load_vent_config
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class EntityConfigs:
+    """Class for keeping the configuration of all entities."""
+
+    thermostats: list[RoomThermostatConfig]
+    fans: list[RoomFanConfig]
+    locks: list[BuildingLockConfig]
+    utilities: list[UtilitiesSensorConfig]
+    vent: VentConfig
+    derived: list[DerivedSensorConfig]
+    aggregates: list[AggregateSensorConfig]
+    schedules: list[ScheduledTransition]
+
+    @property
+    def has_vent(self) -> bool:
+        """Check if any of the vent devices is configured."""
+        return any(astuple(self.vent))
+
+    def platforms(self) -> list[Platform]:
+        """
+        Get the platforms that have entities to set up.
+
+        There is a matching .py file for each platform, eg. <sensor.py>.
+        """
+        platforms = {
+            Platform.CLIMATE: bool(self.thermostats),
+            Platform.LOCK: bool(self.locks),
+            Platform.FAN: bool(self.fans),
+            Platform.SENSOR: bool(
+                self.utilities or self.derived or self.aggregates or self.has_vent
+            ),
+            Platform.SELECT: self.has_vent,
+        }
+        return [platform for platform, configured in platforms.items() if configured]
+
+    def device_ids(self) -> set[str]:
+        """Get all device ids that configured entities read from or write to."""
+        device_ids = set()
+        for config in self.fans:
+            device_ids.update(
+                [
+                    config.heating_id,
+                    config.lock_id,
+                    config.fan_id,
+                    config.current_temperature_id,
+                    config.target_temperature_id,
+                ]
+            )
+        for config in self.thermostats:
+            device_ids.update(
+                [
+                    config.heating_id,
+                    config.fan_id,
+                    config.current_temperature_id,
+                    config.target_temperature_id,
+                ]
+            )
+        device_ids.update(config.door_id for config in self.locks)
+        device_ids.update(config.id for config in self.utilities)
+        device_ids.update(astuple(self.vent))
+
+        derived_ids = {config.id for config in self.derived}
+        device_ids.update(
+            source
+            for config in self.derived
+            for source in config.inputs.values()
+            if source not in derived_ids
+        )
+
+        for config in self.aggregates:
+            device_ids.update(config.devices)
+            device_ids.update(config.reference)
+        # Scheduled writes are skipped when the device already has the value
+        device_ids.update(transition.device_name for transition in self.schedules)
+
+        # Unused optional ids are left empty in the config file
+        return {device_id for device_id in device_ids if device_id}
+
+
+async def load_entity_configs(
+    discovered: Mapping[str, list[dict]] | None = None,
+) -> EntityConfigs:
+    """Read the configuration of all entities, followed by discovered ones."""
+    thermostats, fans, locks, utilities, vent, derived = await asyncio.gather(
+        load_thermostats_config(discovered),
+        load_fans_config(discovered),
+        load_lock_config(discovered),
+        load_utilities_config(discovered),
+        load_vent_config(),
+        load_derived_config(),
+    )
+    # Aggregates can take their devices from the other sections
+    aggregates = await load_aggregates_config(
+        {
+            "thermostats": thermostats,
+            "fans": fans,
+            "locks": locks,
+            "utilities": utilities,
+        }
+    )
+    schedules = await load_schedules_config(thermostats, vent)
+    return EntityConfigs(
+        thermostats, fans, locks, utilities, vent, derived, aggregates, schedules
+    )
@@ -1,15 +1,18 @@
 """Utility helper to read fans yaml config file."""
 
 import logging
+from collections.abc import Mapping
 
 from ..entities.ac.room_fan import RoomFanConfig
-from .read_yaml import read_yaml
+from .read_yaml import config_items, read_yaml
 
 _LOGGER = logging.getLogger(__name__)
 
 
-async def load_fans_config() -> list[RoomFanConfig]:
-    """Read fans config file."""
+async def load_fans_config(
+    discovered: Mapping[str, list[dict]] | None = None,
+) -> list[RoomFanConfig]:
+    """Read fans config file, followed by discovered fans."""
     data = await read_yaml()
     return [
         RoomFanConfig(
@@ -20,5 +23,5 @@ async def load_fans_config() -> list[RoomFanConfig]:
             current_temperature_id=item.get("current_temperature_id", None),
             target_temperature_id=item.get("target_temperature_id", None),
         )
-        for item in data.get("fans", [])
+        for item in config_items(data, "fans", discovered)
     ]
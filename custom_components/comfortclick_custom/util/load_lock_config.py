@@ -1,19 +1,22 @@
 """Utility helper to read locks yaml config file."""
 
 import logging
+from collections.abc import Mapping
 
 from ..entities.locks.building_lock import BuildingLockConfig
-from .read_yaml import read_yaml
+from .read_yaml import config_items, read_yaml
 
 _LOGGER = logging.getLogger(__name__)
 
 
-async def load_lock_config() -> list[BuildingLockConfig]:
-    """Read locks config file."""
+async def load_lock_config(
+    discovered: Mapping[str, list[dict]] | None = None,
+) -> list[BuildingLockConfig]:
+    """Read locks config file, followed by discovered locks."""
     data = await read_yaml()
     return [
         BuildingLockConfig(
             door_name=item.get("door_name", None), door_id=item.get("door_id", None)
         )
-        for item in data.get("locks", [])
+        for item in config_items(data, "locks", discovered)
     ]
@@ -0,0 +1,87 @@
+"""Utility helper to read schedules yaml config file."""
+
+import logging
+from collections.abc import Mapping, Sequence
+from datetime import time
+from typing import Any
+
+from ..entities.ac.room_thermostat import RoomThermostatConfig
+from ..entities.vent.vent_config import VentConfig
+from ..schedule import WEEKDAYS, ScheduledTransition
+from .read_yaml import read_yaml
+
+_LOGGER = logging.getLogger(__name__)
+
+# Vent modes a vent schedule can switch to
+VENT_MODES = ("home", "away", "guest")
+
+
+class InvalidScheduleError(Exception):
+    """Raised when a schedule in YAML configuration file can not be resolved."""
+
+
+def _device_and_value(
+    schedule: Mapping[str, Any],
+    value: Any,
+    thermostats: Sequence[RoomThermostatConfig],
+    vent: VentConfig,
+) -> tuple[str, Any]:
+    """Get the device a schedule writes to and the value written."""
+    if "thermostat" in schedule:
+        for config in thermostats:
+            if config.name == schedule["thermostat"]:
+                return config.target_temperature_id, float(value)
+        msg = f"Unknown thermostat {schedule['thermostat']}"
+        raise InvalidScheduleError(msg)
+    if schedule.get("vent"):
+        mode = str(value).lower()
+        if mode not in VENT_MODES:
+            msg = f"Unknown vent mode {value}"
+            raise InvalidScheduleError(msg)
+        # Turning a mode on turns the others off
+        return getattr(vent, f"{mode}_mode"), True
+    if "device" in schedule:
+        return schedule["device"], value
+    msg = "Schedule needs a thermostat, vent or device"
+    raise InvalidScheduleError(msg)
+
+
+def _weekdays(days: Sequence[str] | None) -> frozenset[int]:
+    if not days:
+        return frozenset(range(len(WEEKDAYS)))
+    try:
+        return frozenset(WEEKDAYS.index(day.lower()[:3]) for day in days)
+    except ValueError as e:
+        msg = f"Unknown weekday in {days}"
+        raise InvalidScheduleError(msg) from e
+
+
+async def load_schedules_config(
+    thermostats: Sequence[RoomThermostatConfig], vent: VentConfig
+) -> list[ScheduledTransition]:
+    """
+    Read schedules config file.
+
+    A schedule sets the target temperature of a thermostat by name, the vent mode
+    or any device to a value at times of day, optionally only on some weekdays.
+    """
+    data = await read_yaml()
+
+    transitions = []
+    for schedule in data.get("schedules", None) or []:
+        for item in schedule.get("transitions", []):
+            device_name, value = _device_and_value(
+                schedule, item["value"], thermostats, vent
+            )
+            if not device_name:
+                msg = f"No device to schedule {schedule}"
+                raise InvalidScheduleError(msg)
+            transitions.append(
+                ScheduledTransition(
+                    device_name=device_name,
+                    value=value,
+                    at=time.fromisoformat(item["at"]),
+                    weekdays=_weekdays(item.get("days")),
+                )
+            )
+    return transitions
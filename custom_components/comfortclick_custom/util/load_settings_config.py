@@ -0,0 +1,31 @@
+"""Utility helper to read integration settings from the yaml config file."""
+
+import logging
+from dataclasses import dataclass
+
+from .read_yaml import read_yaml
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class SettingsConfig:
+    """Class for keeping integration wide settings."""
+
+    # File in the config folder to record controller responses to, empty disables
+    capture_path: str | None = None
+    # Seconds a callback may block the event loop before it is logged, 0 disables
+    blocking_threshold: float = 0
+    # Seconds writes are kept while the controller is unreachable, 0 disables
+    journal_max_age: float = 900
+
+
+async def load_settings_config() -> SettingsConfig:
+    """Read settings config file."""
+    config = await read_yaml()
+    item = config.get("settings", None) or {}
+    return SettingsConfig(
+        capture_path=item.get("capture_path", None) or None,
+        blocking_threshold=float(item.get("blocking_threshold", None) or 0),
+        journal_max_age=float(item.get("journal_max_age", 900)),
+    )
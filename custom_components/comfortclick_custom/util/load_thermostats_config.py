@@ -1,15 +1,18 @@
 """Utility helper to read thermostats yaml config file."""
 
 import logging
+from collections.abc import Mapping
 
 from ..entities.ac.room_thermostat import RoomThermostatConfig
-from .read_yaml import read_yaml
+from .read_yaml import config_items, read_yaml
 
 _LOGGER = logging.getLogger(__name__)
 
 
-async def load_thermostats_config() -> list[RoomThermostatConfig]:
-    """Read thermostats config file."""
+async def load_thermostats_config(
+    discovered: Mapping[str, list[dict]] | None = None,
+) -> list[RoomThermostatConfig]:
+    """Read thermostats config file, followed by discovered thermostats."""
     data = await read_yaml()
 
     return [
@@ -23,5 +26,5 @@ async def load_thermostats_config() -> list[RoomThermostatConfig]:
             min_temp=int(item.get("min_temp", 18)),
             max_temp=int(item.get("max_temp", 24)),
         )
-        for item in data.get("thermostats", [])
+        for item in config_items(data, "thermostats", discovered)
     ]
@@ -1,16 +1,20 @@
 """Utility helper to read utilities yaml config file."""
 
 import logging
+from collections.abc import Mapping
+from datetime import timedelta
 
 from homeassistant.components.sensor import SensorEntityDescription
 
 from ..entities.utilities.utilities_sensor import (
     ElectricitySensor,
     HeatingSensor,
+    PowerSensor,
     UtilitiesSensorConfig,
+    WaterFlowSensor,
     WaterSensor,
 )
-from .read_yaml import read_yaml
+from .read_yaml import config_items, read_yaml
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,8 +35,23 @@ def _map_type_to_description(
     raise UnknownDescriptionTypeError(utility_type)
 
 
-async def load_utilities_config() -> list[UtilitiesSensorConfig]:
-    """Read utilities config file."""
+def _map_type_to_rate(
+    utility_type: str,
+) -> tuple[SensorEntityDescription, float]:
+    if utility_type == "water":
+        return WaterFlowSensor, 1
+    if utility_type == "electricity":
+        return PowerSensor, 1
+    if utility_type == "heating":
+        # MWh per hour to kW
+        return PowerSensor, 1000
+    raise UnknownDescriptionTypeError(utility_type)
+
+
+async def load_utilities_config(
+    discovered: Mapping[str, list[dict]] | None = None,
+) -> list[UtilitiesSensorConfig]:
+    """Read utilities config file, followed by discovered utilities."""
     data = await read_yaml()
 
     return [
@@ -40,6 +59,12 @@ async def load_utilities_config() -> list[UtilitiesSensorConfig]:
             id=item.get("id", None),
             name=item.get("name", None),
             description=_map_type_to_description(item["type"]),
+            rate_description=_map_type_to_rate(item["type"])[0],
+            rate_factor=_map_type_to_rate(item["type"])[1],
+            rate_window=timedelta(minutes=float(item.get("rate_window", 15))),
+            consumption_window=timedelta(
+                hours=float(item.get("consumption_window", 24))
+            ),
         )
-        for item in data.get("utilities", [])
+        for item in config_items(data, "utilities", discovered)
     ]
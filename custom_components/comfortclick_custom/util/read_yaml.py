@@ -1,26 +1,53 @@
 """Utility helper to read yaml files."""
 
 import logging
+from collections.abc import Mapping
 from pathlib import Path
 from typing import Any
 
 import aiofiles
+import aiofiles.os
 import yaml
 
 _LOGGER = logging.getLogger(__name__)
 
 logging.basicConfig(format="%(message)s - %(full_path)s", level=logging.INFO)
 
+# (modification time, size) of the file and what was parsed from it
+_cache: tuple[tuple[int, int], Any] | None = None
+
 
 async def read_yaml() -> Any:
-    """Read the YAML configuration file from integrations config folder."""
+    """
+    Read the YAML configuration file from integrations config folder.
+
+    The file is only parsed again when it changed, as every platform reads it.
+    """
+    global _cache  # noqa: PLW0603
     full_path = f"{Path(__file__).parent}/../../../comfortclick_custom.yaml"
+    stat = await aiofiles.os.stat(full_path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    if _cache is not None and _cache[0] == version:
+        return _cache[1]
+
     async with aiofiles.open(full_path, encoding="utf-8") as f:
         contents = await f.read()
     try:
-        return yaml.safe_load(contents)
+        data = yaml.safe_load(contents)
 
     except yaml.YAMLError:
         _LOGGER.exception(
             "Failed to load YAML configuration file", extra={full_path: full_path}
         )
+        return None
+    _cache = (version, data)
+    return data
+
+
+def config_items(
+    data: Mapping[str, Any],
+    section: str,
+    discovered: Mapping[str, list[dict]] | None = None,
+) -> list[dict]:
+    """Get the items of a config file section, followed by discovered ones."""
+    return [*(data.get(section, None) or []), *(discovered or {}).get(section, [])]
@@ -0,0 +1,36 @@
+"""Utility helper to measure how long each phase of setting up the integration takes."""
+
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StartupTimings:
+    """Collects the duration of named startup phases, which may overlap."""
+
+    def __init__(self) -> None:
+        """Start measuring from now."""
+        self._started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measure the wrapped phase."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(time.perf_counter() - started, 3)
+
+    def log(self) -> None:
+        """Log the breakdown, so time to ready can be compared across releases."""
+        _LOGGER.info(
+            msg="Finished setting up",
+            extra={
+                "phases": self.phases,
+                "total": round(time.perf_counter() - self._started, 3),
+            },
+        )
@@ -0,0 +1,136 @@
+"""Test aggregates over groups of device values."""
+
+from typing import Any
+
+import pytest
+
+from custom_components.comfortclick_custom.api import ApiInstance
+from custom_components.comfortclick_custom.entities.ac.room_thermostat import (
+    RoomThermostatConfig,
+)
+from custom_components.comfortclick_custom.entities.aggregate.aggregate_config import (
+    AggregateSensorConfig,
+)
+from custom_components.comfortclick_custom.entities.aggregate.aggregate_engine import (
+    AggregateEngine,
+    InvalidAggregateError,
+)
+from custom_components.comfortclick_custom.util.load_aggregates_config import (
+    UnknownAggregateSourceError,
+    _devices,
+)
+
+from .fake_controller import FakeController
+
+ROOMS = 3
+MISSING = "Devices\\Room 9\\Current"
+
+
+def _device(room: int, name: str) -> str:
+    return f"Devices\\Room {room}\\{name}"
+
+
+@pytest.fixture
+async def controller():
+    state = []
+    for room in range(ROOMS):
+        state.append({"DeviceName": _device(room, "Current"), "Value": 20.0 + room})
+        state.append({"DeviceName": _device(room, "Target"), "Value": 21.0})
+        state.append({"DeviceName": _device(room, "Heating"), "Value": room == 0})
+    controller = FakeController(state=state)
+    await controller.start()
+    yield controller
+    await controller.close()
+
+
+@pytest.fixture
+async def api(controller: FakeController):
+    api = ApiInstance("user", "password", controller.host)
+    await api.connect()
+    await api.initialize_state()
+    yield api
+    await api.close()
+
+
+def _config(
+    function: str, name: str = "Current", **kwargs: Any
+) -> AggregateSensorConfig:
+    return AggregateSensorConfig(
+        id=function,
+        name=function,
+        function=function,
+        devices=[_device(room, name) for room in range(ROOMS)],
+        **kwargs,
+    )
+
+
+async def test_aggregates_follow_value_changes(
+    api: ApiInstance, controller: FakeController
+):
+    configs = [
+        _config("mean"),
+        _config("min"),
+        _config("max"),
+        _config("count_above", threshold=20.5),
+        _config("sum", name="Heating"),
+        _config(
+            "deviation",
+            reference=[_device(room, "Target") for room in range(ROOMS)],
+        ),
+    ]
+    # Missing devices are left out instead of making the aggregate unknown
+    configs[0].devices.append(MISSING)
+    engine = AggregateEngine(api.snapshot, configs)
+
+    assert engine.value("mean") == 21.0
+    assert engine.value("min") == 20.0
+    assert engine.value("max") == 22.0
+    assert engine.value("count_above") == 2
+    assert engine.value("sum") == 1
+    assert engine.value("deviation") == 2.0
+
+    controller.push_update(_device(1, "Current"), 24.0)
+    controller.push_update(_device(2, "Heating"), True)  # noqa: FBT003
+    await api.poll()
+
+    assert engine.value("mean") == 22.0
+    assert engine.value("max") == 24.0
+    assert engine.value("sum") == 2
+    assert engine.value("deviation") == 5.0
+
+
+async def test_invalid_aggregates_are_rejected(api: ApiInstance):
+    with pytest.raises(InvalidAggregateError):
+        AggregateEngine(api.snapshot, [_config("median")])
+    with pytest.raises(InvalidAggregateError):
+        AggregateEngine(api.snapshot, [_config("deviation", reference=[])])
+
+
+def test_devices_are_taken_from_sections():
+    thermostats = [
+        RoomThermostatConfig(
+            name=f"Room {room}",
+            heating_id=_device(room, "Heating"),
+            fan_id="",
+            current_temperature_id=_device(room, "Current"),
+            # The last room has no setpoint, so it can't deviate from it
+            target_temperature_id=_device(room, "Target") if room < 2 else "",
+        )
+        for room in range(ROOMS)
+    ]
+    sections = {"thermostats": thermostats}
+
+    devices, reference = _devices(
+        {
+            "source": "thermostats.current_temperature_id",
+            "reference_source": "thermostats.target_temperature_id",
+        },
+        sections,
+    )
+    assert devices == [_device(0, "Current"), _device(1, "Current")]
+    assert reference == [_device(0, "Target"), _device(1, "Target")]
+
+    with pytest.raises(UnknownAggregateSourceError):
+        _devices({"source": "thermostats.door_id"}, sections)
+    with pytest.raises(UnknownAggregateSourceError):
+        _devices({"source": "rooms.heating_id"}, sections)
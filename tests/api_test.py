@@ -0,0 +1,281 @@
+"""Test communicating with the ComfortClick API."""
+
+import time
+import zlib
+from pathlib import Path
+
+import aiohttp
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.comfortclick_custom.api import (
+    SNAPSHOT_BUCKETS,
+    ApiInstance,
+    DecompressionError,
+    _create_decompressor,
+)
+from custom_components.comfortclick_custom.coordinator import ComfortClickCoordinator
+
+from .fake_controller import FakeController, make_self_signed_context
+
+WRITE_LATENCY = 0.2
+
+
+@pytest.fixture
+async def controller():
+    controller = FakeController(
+        state=[
+            {"DeviceName": f"Devices\\Room {i}\\Target", "Value": 21} for i in range(20)
+        ]
+    )
+    await controller.start()
+    yield controller
+    await controller.close()
+
+
+@pytest.fixture
+async def api(controller: FakeController):
+    api = ApiInstance("user", "password", controller.host)
+    await api.connect()
+    await api.initialize_state()
+    yield api
+    await api.close()
+
+
+async def test_poll_applies_updates(controller: FakeController, api: ApiInstance):
+    controller.push_update("Devices\\Room 3\\Target", 23)
+    await api.poll()
+    assert api.get_value("Devices\\Room 3\\Target") == 23
+    assert api.get_value("Devices\\Room 4\\Target") == 21
+
+
+async def test_snapshot_is_immutable_and_shares_unchanged_buckets(
+    controller: FakeController, api: ApiInstance
+):
+    before = api.snapshot()
+    assert api.snapshot() is before
+
+    controller.push_update("Devices\\Room 3\\Target", 23)
+    await api.poll()
+    after = api.snapshot()
+
+    assert before.get_value("Devices\\Room 3\\Target") == 21
+    assert after.get_value("Devices\\Room 3\\Target") == 23
+    assert after.version == before.version + 1
+    assert len(after) == len(controller.state)
+    shared = [
+        a is b
+        for a, b in zip(before._buckets, after._buckets, strict=True)  # noqa: SLF001
+    ]
+    assert shared.count(False) == 1
+    assert len(shared) == SNAPSHOT_BUCKETS
+
+
+async def test_set_values_batch(controller: FakeController, api: ApiInstance):
+    controller.latency = WRITE_LATENCY
+    values = [(f"Devices\\Room {i}\\Target", 18) for i in range(8)]
+
+    started = time.monotonic()
+    results = await api.set_values(values)
+    elapsed = time.monotonic() - started
+
+    assert all(result.success for result in results)
+    assert [result.device_name for result in results] == [name for name, _ in values]
+    assert len(controller.written) == len(values)
+    # Writes go out concurrently, so the batch costs about one round trip
+    assert elapsed < WRITE_LATENCY * 2
+
+
+async def test_set_values_reports_failures(
+    controller: FakeController, api: ApiInstance
+):
+    controller.status_overrides["/SetValue"] = 500
+    results = await api.set_values([("Devices\\Room 1\\Target", 18)])
+    assert not results[0].success
+    assert results[0].error is not None
+
+
+async def test_initialize_state_scoped_to_device_paths(controller: FakeController):
+    api = ApiInstance("user", "password", controller.host)
+    await api.connect()
+    await api.initialize_state(["Devices\\Room 3\\Target"])
+    await api.close()
+
+    assert api.get_value("Devices\\Room 3\\Target") == 21
+    assert not api.has_device("Devices\\Room 4\\Target")
+
+
+async def test_initialize_state_falls_back_to_whole_panel(
+    controller: FakeController,
+):
+    api = ApiInstance("user", "password", controller.host)
+    await api.connect()
+    await api.initialize_state(["Devices\\Elsewhere\\Target"])
+    await api.close()
+
+    assert controller.requests["/GetPanel"] == 2
+    assert api.has_device("Devices\\Room 4\\Target")
+
+
+async def test_catalogue_covers_the_whole_panel_when_scoped(
+    controller: FakeController,
+):
+    api = ApiInstance("user", "password", controller.host)
+    await api.connect()
+    await api.initialize_state(["Devices\\Room 3\\Target"])
+    controller.state[4]["Value"] = 25
+
+    catalogue, values = await api.load_catalogue()
+    assert await api.load_catalogue() == (catalogue, values)
+    await api.close()
+
+    assert len(catalogue) == len(controller.state)
+    assert values["Devices\\Room 4\\Target"] == 25
+    # Read once on top of the scoped load
+    assert controller.requests["/GetPanel"] == 2
+    assert not api.has_device("Devices\\Room 4\\Target")
+
+
+async def test_refresh_device_reloads_its_path(
+    controller: FakeController, api: ApiInstance
+):
+    controller.state[3]["Value"] = 25
+    controller.state[4]["Value"] = 25
+    await api.refresh_device("Devices\\Room 3\\Target")
+
+    assert api.get_value("Devices\\Room 3\\Target") == 25
+    assert api.get_value("Devices\\Room 4\\Target") == 21
+
+
+async def test_check_consistency_resyncs_drifted_devices(
+    controller: FakeController, api: ApiInstance
+):
+    # Update the controller without sending a delta, as if a poll was lost
+    controller.state[3]["Value"] = 25
+    last_updated = api.last_updated("Devices\\Room 4\\Target")
+
+    drifted = []
+    for _ in range(len(controller.state)):
+        drifted += await api.check_consistency(sample_size=5)
+
+    assert drifted == ["Devices\\Room 3\\Target"]
+    assert api.get_value("Devices\\Room 3\\Target") == 25
+    # Devices that were unchanged are confirmed by the check
+    assert api.last_updated("Devices\\Room 4\\Target") > last_updated
+
+
+async def test_check_consistency_reads_stalest_paths_first(
+    controller: FakeController, api: ApiInstance
+):
+    loaded = api.last_updated("Devices\\Room 0\\Target")
+    await api.check_consistency(sample_size=len(controller.state) - 1)
+    requests = controller.requests["/GetPanel"]
+
+    # Only the path left out of the first check is stale now
+    await api.check_consistency(sample_size=1)
+
+    assert controller.requests["/GetPanel"] == requests + 1
+    confirmed = [api.last_updated(item["DeviceName"]) for item in controller.state]
+    assert min(confirmed) > loaded
+
+
+async def test_check_consistency_keeps_values_polled_during_the_read(
+    controller: FakeController, api: ApiInstance, monkeypatch: pytest.MonkeyPatch
+):
+    stale = [dict(item) for item in controller.state]
+
+    async def get_panel_overlapping_a_poll(path: str) -> list[dict]:
+        controller.push_update("Devices\\Room 3\\Target", 23)
+        await api.poll()
+        return [item for item in stale if item["DeviceName"].startswith(f"{path}\\")]
+
+    monkeypatch.setattr(api, "_get_panel", get_panel_overlapping_a_poll)
+    drifted = await api.check_consistency(sample_size=len(controller.state))
+
+    assert drifted == []
+    assert api.get_value("Devices\\Room 3\\Target") == 23
+
+
+async def test_check_consistency_forgets_devices_gone_from_the_panel(
+    controller: FakeController, api: ApiInstance
+):
+    controller.state = [
+        item
+        for item in controller.state
+        if item["DeviceName"] != "Devices\\Room 5\\Target"
+    ]
+
+    await api.check_consistency(sample_size=len(controller.state) + 1)
+
+    assert api.last_updated("Devices\\Room 5\\Target") is None
+    assert "Devices\\Room 5" not in api._stalest_paths(100)  # noqa: SLF001
+
+
+async def test_compressed_panel_is_accounted(controller: FakeController):
+    controller.compress = True
+    api = ApiInstance("user", "password", controller.host)
+    await api.connect()
+    await api.initialize_state()
+    await api.close()
+
+    stats = api.payload_stats["GetPanel"]
+    assert api.get_value("Devices\\Room 3\\Target") == 21
+    assert stats.uncompressed_bytes == controller.bytes_sent["/GetPanel"]
+    assert stats.compressed_bytes < stats.uncompressed_bytes
+
+
+@pytest.mark.parametrize(
+    ("encoding", "wbits"),
+    [("gzip", zlib.MAX_WBITS | 16), ("deflate", zlib.MAX_WBITS), ("deflate", -15)],
+)
+def test_decompresses_in_chunks(encoding: str, wbits: int):
+    body = b'{"ThemeObject": {}}' * 100
+    compressor = zlib.compressobj(wbits=wbits)
+    compressed = compressor.compress(body) + compressor.flush()
+    decompressor = _create_decompressor(encoding)
+
+    chunks = [decompressor.decompress(compressed[i : i + 7]) for i in range(0, 70, 7)]
+    chunks.append(decompressor.decompress(compressed[70:]))
+
+    assert b"".join(chunks) + decompressor.flush() == body
+
+
+async def test_corrupt_compressed_body_fails_the_poll(
+    tmp_path: Path, controller: FakeController, api: ApiInstance
+):
+    hass = HomeAssistant(str(tmp_path))
+    coordinator = ComfortClickCoordinator(hass, api=api)
+    controller.corrupt_encoding = "gzip"
+
+    with pytest.raises(DecompressionError):
+        await api.poll()
+    await coordinator.async_refresh()
+
+    assert not coordinator.last_update_success
+    await hass.async_stop(force=True)
+
+
+async def test_pinned_certificate(tmp_path: Path):
+    context, fingerprint = make_self_signed_context(tmp_path)
+    controller = FakeController(state=[], ssl_context=context)
+    await controller.start()
+
+    pinned = ApiInstance(
+        "user", "password", controller.host, certificate_fingerprint=fingerprint
+    )
+    assert await pinned.connect()
+    await pinned.close()
+
+    wrong = ApiInstance(
+        "user", "password", controller.host, certificate_fingerprint="00" * 32
+    )
+    with pytest.raises(aiohttp.ServerFingerprintMismatch):
+        await wrong.connect()
+    await wrong.close()
+
+    verified = ApiInstance("user", "password", controller.host, verify_ssl=True)
+    with pytest.raises(aiohttp.ClientConnectorCertificateError):
+        await verified.connect()
+    await verified.close()
+
+    await controller.close()
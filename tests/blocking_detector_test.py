@@ -0,0 +1,101 @@
+"""Test detecting callbacks that block the event loop."""
+
+import logging
+import time
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.comfortclick_custom.api import ApiInstance
+from custom_components.comfortclick_custom.blocking_detector import BlockingDetector
+from custom_components.comfortclick_custom.coordinator import ComfortClickCoordinator
+
+THRESHOLD = 0.02
+
+
+@pytest.fixture
+def detector():
+    detector = BlockingDetector(THRESHOLD)
+    yield detector
+    detector.stop()
+
+
+def _block_the_loop(factor: float = 5) -> None:
+    time.sleep(THRESHOLD * factor)
+
+
+def test_logs_slow_sections_with_their_stack(
+    detector: BlockingDetector, caplog: pytest.LogCaptureFixture
+):
+    with caplog.at_level(logging.WARNING):
+        with detector.measure("fast"):
+            pass
+        with detector.measure("slow"):
+            _block_the_loop()
+
+    assert len(caplog.records) == 1
+    record = caplog.records[0]
+    assert record.callback == "slow"
+    # Sampled while blocked, so the stack shows what it was blocked in
+    assert "_block_the_loop" in record.stack
+
+    stats = detector.stats()
+    assert set(stats) == {"slow", "fast"}
+    assert stats["slow"].calls == 1
+    assert stats["slow"].slowest >= THRESHOLD * 5
+
+
+def test_logs_an_offender_only_when_it_gets_slower(
+    detector: BlockingDetector, caplog: pytest.LogCaptureFixture
+):
+    with caplog.at_level(logging.WARNING):
+        for factor in (5, 3, 4):
+            with detector.measure("slow"):
+                _block_the_loop(factor)
+
+    assert len(caplog.records) == 1
+    assert detector.stats()["slow"].calls == 3
+
+
+class _Entity:
+    entity_id = "sensor.slow"
+
+    def __init__(self) -> None:
+        self.updates = 0
+
+    def handle_coordinator_update(self) -> None:
+        self.updates += 1
+        _block_the_loop()
+
+
+async def test_coordinator_times_each_entity(
+    tmp_path: Path, detector: BlockingDetector
+):
+    hass = HomeAssistant(str(tmp_path))
+    api = ApiInstance("user", "password", "http://localhost")
+    api.blocking_detector = detector
+    coordinator = ComfortClickCoordinator(hass, api=api)
+    entity = _Entity()
+    remove_listener = coordinator.async_add_listener(entity.handle_coordinator_update)
+
+    coordinator.async_update_listeners()
+
+    assert entity.updates == 1
+    assert detector.stats()["sensor.slow"].cpu_time >= 0
+    remove_listener()
+    await hass.async_stop(force=True)
+
+
+async def test_shutdown_stops_the_watchdog(tmp_path: Path, detector: BlockingDetector):
+    hass = HomeAssistant(str(tmp_path))
+    api = ApiInstance("user", "password", "http://localhost")
+    api.blocking_detector = detector
+    coordinator = ComfortClickCoordinator(hass, api=api)
+
+    # Also what home assistant does when setting up the entry failed
+    await coordinator.async_shutdown()
+
+    detector._watchdog.join(THRESHOLD * 5)  # noqa: SLF001
+    assert not detector._watchdog.is_alive()  # noqa: SLF001
+    await hass.async_stop(force=True)
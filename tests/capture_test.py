@@ -0,0 +1,97 @@
+"""Test recording controller traffic and replaying it."""
+
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.comfortclick_custom.api import ApiInstance
+from custom_components.comfortclick_custom.capture import (
+    CaptureWriter,
+    ReplayApiInstance,
+    read_capture,
+    replay_capture,
+)
+from custom_components.comfortclick_custom.coordinator import ComfortClickCoordinator
+
+from .fake_controller import FakeController
+
+DEVICE = "Devices\\Room 1\\Target"
+POLLS = 5
+POLL_INTERVAL = 0.05
+
+
+async def _record(path: Path) -> None:
+    controller = FakeController(state=[{"DeviceName": DEVICE, "Value": 20}])
+    await controller.start()
+    api = ApiInstance("user", "password", controller.host)
+    api.capture = CaptureWriter(path)
+    await api.connect()
+    await api.initialize_state([DEVICE])
+    for i in range(POLLS):
+        controller.push_update(DEVICE, 21 + i)
+        await api.poll()
+        await asyncio.sleep(POLL_INTERVAL)
+    await api.close()
+    await api.capture.async_close()
+    await controller.close()
+
+
+async def test_capture_round_trip(tmp_path: Path):
+    path = tmp_path / "traffic.capture"
+    await _record(path)
+
+    records = list(read_capture(path))
+    assert [record.endpoint for record in records] == ["GetPanel"] + [
+        "GetClientData"
+    ] * POLLS
+    assert records[0].path == "Devices\\Room 1"
+
+    # A record cut short by a crash is skipped
+    with path.open("ab") as file:
+        file.write(b"\x01\x00\x00")
+    assert len(list(read_capture(path))) == len(records)
+
+
+def test_empty_capture_has_no_records(tmp_path: Path):
+    path = tmp_path / "traffic.capture"
+    path.touch()
+
+    assert list(read_capture(path)) == []
+
+
+async def test_shutdown_closes_the_capture(tmp_path: Path):
+    hass = HomeAssistant(str(tmp_path))
+    api = ApiInstance("user", "password", "http://localhost")
+    api.capture = CaptureWriter(tmp_path / "traffic.capture")
+    coordinator = ComfortClickCoordinator(hass, api=api)
+
+    # Also what home assistant does when setting up the entry failed
+    await coordinator.async_shutdown()
+
+    with pytest.raises(RuntimeError):
+        api.capture.write("GetClientData", 0, b"{}")
+    await hass.async_stop(force=True)
+
+
+async def test_replay(tmp_path: Path):
+    path = tmp_path / "traffic.capture"
+    await _record(path)
+
+    api = ReplayApiInstance(path)
+    await api.connect()
+    await api.initialize_state([DEVICE])
+    assert api.get_value(DEVICE) == 20
+
+    started = time.monotonic()
+    assert await replay_capture(api, speed=None) == POLLS
+    assert time.monotonic() - started < POLL_INTERVAL * POLLS
+    assert api.get_value(DEVICE) == 20 + POLLS
+
+    api = ReplayApiInstance(path)
+    await api.initialize_state([DEVICE])
+    started = time.monotonic()
+    await replay_capture(api, speed=1)
+    assert time.monotonic() - started >= POLL_INTERVAL * (POLLS - 1)
@@ -0,0 +1,58 @@
+"""Test searching the catalogue of panel devices."""
+
+from custom_components.comfortclick_custom.catalogue import PanelCatalogue
+
+NAMES = [
+    "Devices\\Room 1\\Target",
+    "Devices\\Room 1\\Heating",
+    "Devices\\Room 12\\Target",
+    "Devices\\Hall\\Door lock",
+]
+VALUES = {
+    "Devices\\Room 1\\Target": 21.5,
+    "Devices\\Room 1\\Heating": True,
+    "Devices\\Room 12\\Target": 19,
+    "Devices\\Hall\\Door lock": "Locked",
+}
+
+
+def _names(entries: list) -> list[str]:
+    return [entry.device_name for entry in entries]
+
+
+def test_prefix_search():
+    catalogue = PanelCatalogue(NAMES)
+    assert _names(catalogue.search("devices\\room 1", VALUES, mode="prefix")) == [
+        "Devices\\Room 12\\Target",
+        "Devices\\Room 1\\Heating",
+        "Devices\\Room 1\\Target",
+    ]
+    assert catalogue.search("Room", VALUES, mode="prefix") == []
+
+
+def test_contains_search_matches_names_and_values():
+    catalogue = PanelCatalogue(NAMES)
+    # Matches the name twice, but is only found once
+    assert _names(catalogue.search("o", VALUES, limit=2)) == [
+        "Devices\\Hall\\Door lock",
+        "Devices\\Room 12\\Target",
+    ]
+    assert _names(catalogue.search("TARGET", VALUES)) == [
+        "Devices\\Room 12\\Target",
+        "Devices\\Room 1\\Target",
+    ]
+    entries = catalogue.search("21.5", VALUES)
+    assert _names(entries) == ["Devices\\Room 1\\Target"]
+    assert entries[0].value == 21.5
+
+
+def test_search_large_panel():
+    names = [f"Devices\\Folder {i // 100}\\Device {i}" for i in range(50_000)]
+    values = dict.fromkeys(names, 0)
+    catalogue = PanelCatalogue(names)
+
+    entries = catalogue.search("device 4999", values)
+    prefix_entries = catalogue.search("devices\\folder 499\\", values, mode="prefix")
+
+    assert len(entries) == 11
+    assert len(prefix_entries) == 100
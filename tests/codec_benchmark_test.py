@@ -0,0 +1,106 @@
+"""Benchmark decoding recorded controller responses with each json codec."""
+
+import logging
+import os
+import random
+import time
+from pathlib import Path
+
+import pytest
+
+from custom_components.comfortclick_custom.api import ApiInstance
+from custom_components.comfortclick_custom.capture import CaptureWriter, read_capture
+from custom_components.comfortclick_custom.codec import (
+    ORJSON_CODEC,
+    STANDARD_CODEC,
+    JsonCodec,
+)
+
+from .fake_controller import FakeController
+
+_LOGGER = logging.getLogger(__name__)
+
+DEVICES = 10_000
+POLLS = 100
+UPDATES_PER_POLL = 500
+ROUNDS = 5
+
+
+def _device(i: int) -> str:
+    return f"Devices\\Folder {i // 50}\\Device {i}"
+
+
+async def _record(path: Path) -> None:
+    rng = random.Random(0)  # noqa: S311
+    controller = FakeController(
+        state=[{"DeviceName": _device(i), "Value": float(i)} for i in range(DEVICES)]
+    )
+    await controller.start()
+    api = ApiInstance("user", "password", controller.host)
+    api.capture = CaptureWriter(path)
+    await api.connect()
+    await api.initialize_state()
+    for _ in range(POLLS):
+        for _ in range(UPDATES_PER_POLL):
+            controller.push_update(_device(rng.randrange(DEVICES)), rng.random())
+        await api.poll()
+    await api.close()
+    await api.capture.async_close()
+    await controller.close()
+
+
+def _decode_all(codec: JsonCodec, bodies: list[bytes]) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for body in bodies:
+            codec.loads(body)
+    return (time.perf_counter() - started) / ROUNDS
+
+
+async def test_codec_benchmark(tmp_path: Path):
+    # Set to a capture recorded on a real site to benchmark its payloads instead
+    path = os.environ.get("COMFORTCLICK_CAPTURE")
+    if not path:
+        path = tmp_path / "traffic.capture"
+        await _record(path)
+    bodies = [record.body for record in read_capture(path)]
+
+    codecs = [codec for codec in (STANDARD_CODEC, ORJSON_CODEC) if codec is not None]
+    elapsed = {codec.name: _decode_all(codec, bodies) for codec in codecs}
+    _LOGGER.info(
+        "Decoding %d responses, %d bytes: %s",
+        len(bodies),
+        sum(len(body) for body in bodies),
+        ", ".join(
+            f"{name} {seconds * 1000:.1f} ms" for name, seconds in elapsed.items()
+        ),
+    )
+
+    # Timings depend on the machine, so they are reported and not compared
+    for codec in codecs:
+        assert [codec.loads(body) for body in bodies] == [
+            STANDARD_CODEC.loads(body) for body in bodies
+        ]
+
+
+@pytest.mark.parametrize(
+    "codec",
+    [STANDARD_CODEC, ORJSON_CODEC],
+    ids=lambda codec: getattr(codec, "name", ""),
+)
+async def test_api_works_with_codec(codec: JsonCodec | None):
+    if codec is None:
+        pytest.skip("orjson is not installed")
+    controller = FakeController(state=[{"DeviceName": _device(1), "Value": 20.5}])
+    await controller.start()
+    api = ApiInstance("user", "password", controller.host)
+    api.codec = codec
+
+    await api.connect()
+    await api.initialize_state()
+    await api.set_value(_device(1), "Õhk")
+
+    assert api.get_value(_device(1)) == 20.5
+    assert controller.written[-1]["value"] == "Õhk"
+    await api.close()
+    await controller.close()
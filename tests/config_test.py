@@ -11,6 +11,9 @@ from custom_components.comfortclick_custom.entities.ac.room_thermostat import (
 from custom_components.comfortclick_custom.entities.locks.building_lock import (
     BuildingLockConfig,
 )
+from custom_components.comfortclick_custom.util.load_derived_config import (
+    load_derived_config,
+)
 from custom_components.comfortclick_custom.util.load_fans_config import load_fans_config
 from custom_components.comfortclick_custom.util.load_lock_config import load_lock_config
 from custom_components.comfortclick_custom.util.load_thermostats_config import (
@@ -81,3 +84,12 @@ async def test_thermostats_config_loader():
     assert configs[1].max_temp == 24
     assert configs[2].name == "Bathroom AC"
     assert configs[2].max_temp == 28
+
+
+@pytest.mark.asyncio
+async def test_derived_config_loader():
+    configs = await load_derived_config()
+    assert configs[0].id == "electricity_total"
+    assert configs[0].expression == "day + night"
+    assert set(configs[0].inputs) == {"day", "night"}
+    assert configs[0].unit_of_measurement == "kWh"
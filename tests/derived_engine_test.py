@@ -0,0 +1,167 @@
+"""Test incremental evaluation of derived sensors."""
+
+import pytest
+
+from custom_components.comfortclick_custom.api import ApiInstance
+from custom_components.comfortclick_custom.entities.derived.derived_config import (
+    DerivedSensorConfig,
+)
+from custom_components.comfortclick_custom.entities.derived.derived_engine import (
+    DerivedEngine,
+    InvalidExpressionError,
+)
+
+from .fake_controller import FakeController
+
+DAY = "Devices\\Meter\\Day"
+NIGHT = "Devices\\Meter\\Night"
+TARGET = "Devices\\Room\\Target"
+
+
+@pytest.fixture
+async def controller():
+    controller = FakeController(
+        state=[
+            {"DeviceName": DAY, "Value": 10},
+            {"DeviceName": NIGHT, "Value": 5},
+            {"DeviceName": TARGET, "Value": 21},
+        ]
+    )
+    await controller.start()
+    yield controller
+    await controller.close()
+
+
+@pytest.fixture
+async def api(controller: FakeController):
+    api = ApiInstance("user", "password", controller.host)
+    await api.connect()
+    await api.initialize_state()
+    yield api
+    await api.close()
+
+
+CONFIGS = [
+    DerivedSensorConfig(
+        id="total",
+        name="Total",
+        expression="day + night",
+        inputs={"day": DAY, "night": NIGHT},
+    ),
+    DerivedSensorConfig(
+        id="total_mwh",
+        name="Total MWh",
+        expression="round(total / 1000, 3)",
+        inputs={"total": "total"},
+    ),
+    DerivedSensorConfig(
+        id="heating_target",
+        name="Heating target",
+        expression="target if target > 20 else 20",
+        inputs={"target": TARGET},
+    ),
+]
+
+
+async def test_values_follow_inputs(controller: FakeController, api: ApiInstance):
+    engine = DerivedEngine(api.snapshot, CONFIGS)
+    assert engine.value("total") == 15
+    assert engine.value("total_mwh") == 0.015
+    assert engine.value("heating_target") == 21
+
+    controller.push_update(NIGHT, 995)
+    await api.poll()
+    assert engine.value("total") == 1005
+    assert engine.value("total_mwh") == 1.005
+
+
+async def test_inputs_are_read_from_the_published_snapshot(
+    controller: FakeController, api: ApiInstance, caplog: pytest.LogCaptureFixture
+):
+    published = api.snapshot()
+    config = DerivedSensorConfig(
+        id="missing",
+        name="Missing",
+        expression="day + gone",
+        inputs={"day": DAY, "gone": "Devices\\Meter\\Gone"},
+    )
+    engine = DerivedEngine(lambda: published, [*CONFIGS, config])
+    assert engine.value("total") == 15
+
+    controller.push_update(DAY, 100)
+    controller.push_update(NIGHT, 200)
+    await api.poll()
+    # Changes are only seen together, once they are published
+    assert engine.value("total") == 15
+    published = api.snapshot()
+    assert engine.value("total") == 300
+
+    # A missing input makes the sensor unknown without dumping the state
+    assert engine.value("missing") is None
+    assert "Failed to find internal state value" not in caplog.text
+
+
+async def test_only_changed_sensors_are_evaluated(
+    controller: FakeController, api: ApiInstance, monkeypatch: pytest.MonkeyPatch
+):
+    engine = DerivedEngine(api.snapshot, CONFIGS)
+    engine.value("total")
+
+    evaluated = []
+    original = engine._evaluate  # noqa: SLF001
+    monkeypatch.setattr(
+        engine,
+        "_evaluate",
+        lambda sensor_id: evaluated.append(sensor_id) or original(sensor_id),
+    )
+    controller.push_update(TARGET, 19)
+    await api.poll()
+
+    assert engine.value("heating_target") == 20
+    assert engine.value("total") == 15
+    assert evaluated == ["heating_target"]
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "__import__('os')",
+        "day.real",
+        "[day]",
+        "unknown + 1",
+        "max(day, key=abs)",
+        "9 ** 9 ** 9",
+        "day ** day",
+        "day ** True",
+        "day << 10 ** 10",
+        "day ^ 1",
+        "'a' * 10 ** 10",
+        "(9 ** 9) ** 9 ** 9",
+        "(day * 9) ** 9",
+    ],
+)
+async def test_unsafe_expressions_are_rejected(api: ApiInstance, expression: str):
+    config = DerivedSensorConfig(
+        id="bad", name="Bad", expression=expression, inputs={"day": DAY}
+    )
+    with pytest.raises(InvalidExpressionError):
+        DerivedEngine(api.snapshot, [config])
+
+
+async def test_small_constant_powers_are_allowed(api: ApiInstance):
+    config = DerivedSensorConfig(
+        id="square",
+        name="Square",
+        expression="day ** 2 + day ** -1",
+        inputs={"day": DAY},
+    )
+    assert DerivedEngine(api.snapshot, [config]).value("square") == 100.1
+
+
+async def test_cycles_are_rejected(api: ApiInstance):
+    configs = [
+        DerivedSensorConfig(id="a", name="A", expression="b", inputs={"b": "b"}),
+        DerivedSensorConfig(id="b", name="B", expression="a", inputs={"a": "a"}),
+    ]
+    with pytest.raises(InvalidExpressionError):
+        DerivedEngine(api.snapshot, configs)
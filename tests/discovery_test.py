@@ -0,0 +1,110 @@
+"""Test generating entity configuration from panel devices."""
+
+import threading
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.comfortclick_custom import discovery
+from custom_components.comfortclick_custom.discovery import (
+    DiscoveryCache,
+    discover,
+    discovered_device_ids,
+)
+
+PANEL = {
+    "Devices\\Bedroom\\Heating": False,
+    "Devices\\Bedroom\\Room temperature": 21.3,
+    "Devices\\Bedroom\\Target temperature": 21.0,
+    "Devices\\Bedroom\\Fan speed": 5,
+    "Devices\\Bedroom\\Fan lock": True,
+    "Devices\\Kitchen\\Heating": True,
+    "Devices\\Kitchen\\Room temperature": 22.1,
+    "Devices\\Hall\\Main door": True,
+    "Devices\\Meters\\KRT 27 KÜLM 18388255": 120.5,
+    "Devices\\Meters\\KRT 27 KÜTE 67277630": 3.2,
+    "Devices\\Meters\\Label": "Meters",
+}
+
+
+def test_discover_classifies_devices():
+    discovered = discover(PANEL)
+
+    assert discovered["thermostats"] == [
+        {
+            "name": "Bedroom",
+            "heating_id": "Devices\\Bedroom\\Heating",
+            "fan_id": "Devices\\Bedroom\\Fan speed",
+            "current_temperature_id": "Devices\\Bedroom\\Room temperature",
+            "target_temperature_id": "Devices\\Bedroom\\Target temperature",
+        }
+    ]
+    assert [fan["lock_id"] for fan in discovered["fans"]] == [
+        "Devices\\Bedroom\\Fan lock"
+    ]
+    assert discovered["locks"] == [
+        {"door_name": "Main door", "door_id": "Devices\\Hall\\Main door"}
+    ]
+    # Heating meter is told apart from heating flags by its value
+    assert [(item["name"], item["type"]) for item in discovered["utilities"]] == [
+        ("KRT 27 KÜLM 18388255", "water"),
+        ("KRT 27 KÜTE 67277630", "heating"),
+    ]
+
+
+def test_discover_skips_excluded_devices_and_uses_patterns():
+    discovered = discover(
+        PANEL,
+        patterns={"door": "portal"},
+        exclude=["Devices\\Bedroom\\Heating"],
+    )
+    assert discovered["thermostats"] == []
+    assert discovered["locks"] == []
+    assert "Devices\\Meters\\KRT 27 KÜTE 67277630" in discovered_device_ids(discovered)
+
+
+async def test_cache_reused_until_panel_changes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    hass = HomeAssistant(str(tmp_path))
+    cache = DiscoveryCache(hass, "entry")
+    assert await cache.async_load() is None
+    discovered = await cache.async_discover(PANEL, {}, exclude=[])
+
+    reloaded = DiscoveryCache(hass, "entry")
+    assert await reloaded.async_load() == discovered
+    # A changed value does not change what is discovered
+    unchanged = {**PANEL, "Devices\\Bedroom\\Room temperature": 19.0}
+    with monkeypatch.context() as patch:
+        patch.setattr(discovery, "discover", None)
+        assert await reloaded.async_discover(unchanged, {}, exclude=[]) == discovered
+
+    changed = {**PANEL, "Devices\\Kitchen\\Target temperature": 22.0}
+    rediscovered = await reloaded.async_discover(changed, {}, exclude=[])
+    assert [item["name"] for item in rediscovered["thermostats"]] == [
+        "Bedroom",
+        "Kitchen",
+    ]
+    await hass.async_stop(force=True)
+
+
+async def test_discovery_runs_outside_the_event_loop(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    hass = HomeAssistant(str(tmp_path))
+    threads = []
+
+    def recording_discover(*args: object) -> discovery.DiscoveredConfig:
+        threads.append(threading.current_thread())
+        return discover(*args)
+
+    monkeypatch.setattr(discovery, "discover", recording_discover)
+    discovered = await DiscoveryCache(hass, "entry").async_discover(
+        PANEL, {}, exclude=[]
+    )
+
+    assert discovered == discover(PANEL)
+    assert threads
+    assert threading.main_thread() not in threads
+    await hass.async_stop(force=True)
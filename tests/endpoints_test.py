@@ -0,0 +1,111 @@
+"""Test spreading requests over several addresses of the same controller."""
+
+import asyncio
+from pathlib import Path
+
+import aiohttp
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.comfortclick_custom.api import ApiInstance
+from custom_components.comfortclick_custom.coordinator import ComfortClickCoordinator
+
+from .fake_controller import FakeController
+
+DEVICE = "Devices\\Room 1\\Target"
+SLOW_LATENCY = 0.05
+# Long enough that a probe waiting for it would time the poll out
+HANGING_LATENCY = 60
+
+
+@pytest.fixture
+async def hass(tmp_path: Path):
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
+
+
+@pytest.fixture
+async def controllers():
+    # Both addresses lead to the same controller state
+    state = [{"DeviceName": DEVICE, "Value": 21}]
+    primary = FakeController(state=state, latency=SLOW_LATENCY)
+    secondary = FakeController(state=state)
+    await primary.start()
+    await secondary.start()
+    yield primary, secondary
+    await primary.close()
+    await secondary.close()
+
+
+async def test_requests_move_to_faster_endpoint(
+    controllers: tuple[FakeController, FakeController],
+):
+    primary, secondary = controllers
+    api = ApiInstance(
+        "user", "password", primary.host, secondary_hosts=[secondary.host]
+    )
+    await api.connect()
+    await api.initialize_state([DEVICE])
+    assert api.host == primary.host
+
+    await api.probe_endpoints()
+    secondary.push_update(DEVICE, 22)
+    await api.poll()
+
+    assert api.host == secondary.host
+    assert secondary.requests["/GetClientData"] == 1
+    assert api.get_value(DEVICE) == 22
+    await api.close()
+
+
+async def test_fails_over_without_reloading_panel(
+    controllers: tuple[FakeController, FakeController],
+):
+    primary, secondary = controllers
+    primary.latency = 0
+    api = ApiInstance(
+        "user", "password", primary.host, secondary_hosts=[secondary.host]
+    )
+    await api.connect()
+    await api.initialize_state([DEVICE])
+
+    await primary.close()
+    with pytest.raises(aiohttp.ClientConnectionError):
+        await api.poll()
+    secondary.push_update(DEVICE, 23)
+    await api.poll()
+
+    assert api.host == secondary.host
+    assert api.get_value(DEVICE) == 23
+    assert secondary.requests["/GetPanel"] == 0
+    assert secondary.requests["/Login"] == 0
+    await api.close()
+
+
+async def test_hanging_probe_does_not_stall_polling(
+    hass: HomeAssistant, controllers: tuple[FakeController, FakeController]
+):
+    primary, secondary = controllers
+    primary.latency = 0
+    secondary.latency = HANGING_LATENCY
+    api = ApiInstance(
+        "user", "password", primary.host, secondary_hosts=[secondary.host]
+    )
+    coordinator = ComfortClickCoordinator(hass, api=api, device_names={DEVICE})
+    await coordinator._async_setup()  # noqa: SLF001
+    # Due for a probe at the first poll
+    coordinator._last_endpoint_probe = 0  # noqa: SLF001
+
+    primary.push_update(DEVICE, 22)
+    async with asyncio.timeout(5):
+        await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.data.get_value(DEVICE) == 22
+    probe = coordinator._probe_task  # noqa: SLF001
+    assert probe is not None
+
+    await coordinator.async_shutdown()
+    await asyncio.wait([probe], timeout=1)
+    assert probe.cancelled()
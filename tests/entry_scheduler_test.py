@@ -0,0 +1,138 @@
+"""Test staggering startup and polling of several config entries."""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.comfortclick_custom import coordinator as coordinator_module
+from custom_components.comfortclick_custom import entry_scheduler
+from custom_components.comfortclick_custom.api import ApiInstance
+from custom_components.comfortclick_custom.coordinator import ComfortClickCoordinator
+
+from .fake_controller import FakeController
+
+_LOGGER = logging.getLogger(__name__)
+
+ENTRIES = 6
+LATENCY = 0.05
+
+
+@pytest.fixture
+async def controller():
+    # A single controller stands in for every site, so it sees all their requests
+    controller = FakeController(
+        state=[
+            {"DeviceName": f"Devices\\Room {i}\\Target", "Value": i} for i in range(50)
+        ],
+        latency=LATENCY,
+    )
+    await controller.start()
+    yield controller
+    await controller.close()
+
+
+async def _start_entries(hass: HomeAssistant, controller: FakeController) -> list:
+    coordinators = [
+        ComfortClickCoordinator(
+            hass, api=ApiInstance("user", "password", controller.host)
+        )
+        for _ in range(ENTRIES)
+    ]
+    await asyncio.gather(
+        *(coordinator._async_setup() for coordinator in coordinators)  # noqa: SLF001
+    )
+    for coordinator in coordinators:
+        await coordinator.api.close()
+    return coordinators
+
+
+async def test_initial_loads_are_capped(
+    tmp_path: Path, controller: FakeController, monkeypatch: pytest.MonkeyPatch
+):
+    # Without a cap every entry logs in and loads its panel at once
+    monkeypatch.setattr(entry_scheduler, "MAX_CONCURRENT_INITIAL_LOADS", ENTRIES)
+    hass = HomeAssistant(str(tmp_path / "before"))
+    await _start_entries(hass, controller)
+    await hass.async_stop(force=True)
+    peak_before = controller.peak_in_flight
+    monkeypatch.undo()
+
+    controller.peak_in_flight = 0
+    hass = HomeAssistant(str(tmp_path / "after"))
+    await _start_entries(hass, controller)
+    scheduler = entry_scheduler.async_get_scheduler(hass)
+    await hass.async_stop(force=True)
+    peak_after = controller.peak_in_flight
+
+    _LOGGER.info(
+        "Peak concurrent requests during startup: %d before, %d after",
+        peak_before,
+        peak_after,
+    )
+    assert peak_before == ENTRIES
+    assert peak_after <= entry_scheduler.MAX_CONCURRENT_INITIAL_LOADS
+    assert (
+        scheduler.peak_concurrent_loads == entry_scheduler.MAX_CONCURRENT_INITIAL_LOADS
+    )
+
+
+async def test_polls_are_spread_over_the_interval(
+    tmp_path: Path, controller: FakeController, monkeypatch: pytest.MonkeyPatch
+):
+    hass = HomeAssistant(str(tmp_path))
+    shifts = {}
+
+    def call_later(_hass: HomeAssistant, delay: float, action: Callable) -> Callable:
+        shifts[action.__self__] = delay
+        return lambda: None
+
+    monkeypatch.setattr(coordinator_module, "async_call_later", call_later)
+    coordinators = await _start_entries(hass, controller)
+    assert [c.phase for c in coordinators] == [(i + 0.5) / ENTRIES for i in range(6)]
+
+    for coordinator in coordinators:
+        coordinator.update_interval = timedelta(seconds=60)
+        await coordinator.async_refresh()
+    now = hass.loop.time()
+
+    # Each entry polls again at its own offset into the interval, moving later polls
+    offsets = [(now + shifts[coordinator]) % 60 for coordinator in coordinators]
+    assert offsets == pytest.approx([5, 15, 25, 35, 45, 55], abs=0.5)
+
+    await coordinators[0].async_shutdown()
+    offsets = [(now + shifts[coordinator]) % 60 for coordinator in coordinators[1:]]
+    assert offsets == pytest.approx([6, 18, 30, 42, 54], abs=0.5)
+    for coordinator in coordinators[1:]:
+        await coordinator.async_shutdown()
+    await hass.async_stop(force=True)
+
+
+async def test_polls_are_spread_within_a_second(
+    tmp_path: Path, controller: FakeController
+):
+    hass = HomeAssistant(str(tmp_path))
+    coordinators = await _start_entries(hass, controller)
+    updated = {}
+
+    for coordinator in coordinators:
+        coordinator.update_interval = timedelta(seconds=1)
+
+        def listener(coordinator: ComfortClickCoordinator = coordinator) -> None:
+            updated[coordinator] = hass.loop.time()
+
+        coordinator.async_add_listener(listener)
+        await coordinator.async_refresh()
+    # Every entry has moved its polls to its phase and polled there since
+    await asyncio.sleep(2)
+
+    # Entities are updated once the poll request returns
+    offsets = [(updated[coordinator] - LATENCY) % 1 for coordinator in coordinators]
+    assert offsets == pytest.approx([c.phase for c in coordinators], abs=0.03)
+    for coordinator in coordinators:
+        await coordinator.async_shutdown()
+    await hass.async_stop(force=True)
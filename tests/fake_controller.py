@@ -0,0 +1,218 @@
+"""In-process fake ComfortClick controller with fault injection used by the tests."""
+
+import asyncio
+import datetime
+import hashlib
+import ipaddress
+import json
+import random
+import ssl
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+TOKEN = "fake-token"  # noqa: S105
+
+
+@dataclass
+class Faults:
+    """Faults the controller injects into its responses."""
+
+    # Returns the seconds each request is delayed by
+    latency: Callable[[random.Random], float] | None = None
+    # Share of requests to the paths answered with a server error
+    error_rate: float = 0
+    # Token stops being accepted after this many requests since login
+    token_expires_after: int | None = None
+    # Share of responses to the paths whose body is cut in half
+    truncate_rate: float = 0
+    # Share of requests to the paths whose connection is closed without a response
+    reset_rate: float = 0
+    paths: tuple[str, ...] = ("/GetClientData", "/GetPanel", "/SetValue")
+    seed: int = 0
+    rng: random.Random = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.rng = random.Random(self.seed)  # noqa: S311
+
+    def roll(self, request: web.Request, rate: float) -> bool:
+        return request.path in self.paths and self.rng.random() < rate
+
+
+class FakeController:
+    """Serves the subset of the ComfortClick API that the integration uses."""
+
+    def __init__(
+        self,
+        state: list[dict[str, Any]],
+        latency: float = 0,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        self.state = state
+        # Device name -> items with that name, so updates don't scan the state
+        self._items: dict[str, list[dict[str, Any]]] = {}
+        for item in state:
+            self._items.setdefault(item["DeviceName"], []).append(item)
+        self.ssl_context = ssl_context
+        self.latency = latency
+        self.requests = Counter()
+        self.bytes_sent = Counter()
+        self.pending_updates: list[dict[str, Any]] = []
+        self.written: list[dict[str, Any]] = []
+        self.status_overrides: dict[str, int] = {}
+        self.compress = False
+        # Content encoding GetClientData claims for a body that is not encoded
+        self.corrupt_encoding: str | None = None
+        self.faults = Faults()
+        self.requests_since_login = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.router.add_post("/Login", self._login)
+        self.app.router.add_post("/GetPanel", self._get_panel)
+        self.app.router.add_post("/GetClientData", self._get_client_data)
+        self.app.router.add_post("/SetValue", self._set_value)
+        self.app.router.add_get("/Logout", self._logout)
+        self.server = TestServer(self.app)
+
+    @property
+    def host(self) -> str:
+        return str(self.server.make_url("")).rstrip("/")
+
+    async def start(self) -> None:
+        await self.server.start_server(ssl=self.ssl_context)
+
+    async def close(self) -> None:
+        await self.server.close()
+
+    def push_update(self, device_name: str, value: Any) -> None:
+        for item in self._items.get(device_name, []):
+            item["Value"] = value
+        self.pending_updates.append(
+            {"DeviceName": device_name, "PropertyName": "Value", "Value": value}
+        )
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Any) -> web.Response:
+        self.requests[request.path] += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.faults.latency:
+                await asyncio.sleep(self.faults.latency(self.faults.rng))
+            if request.path in self.status_overrides:
+                return web.Response(status=self.status_overrides[request.path])
+            if request.path != "/Login" and not self._is_authorized(request):
+                return web.Response(status=401, text="Unauthorized")
+            if self.faults.roll(request, self.faults.reset_rate):
+                self._lose_pending_updates(request)
+                request.transport.close()
+                return web.Response(status=500)
+            if self.faults.roll(request, self.faults.error_rate):
+                self._lose_pending_updates(request)
+                return web.Response(status=500, text="Internal Server Error")
+            response = await handler(request)
+            if self.faults.roll(request, self.faults.truncate_rate):
+                response.body = response.body[: len(response.body) // 2]
+            return response
+        finally:
+            self.in_flight -= 1
+
+    def _is_authorized(self, request: web.Request) -> bool:
+        self.requests_since_login += 1
+        expires_after = self.faults.token_expires_after
+        if expires_after is not None and self.requests_since_login > expires_after:
+            return False
+        return request.cookies.get("Token") == TOKEN
+
+    def _lose_pending_updates(self, request: web.Request) -> None:
+        """Drop updates as if they were sent in a response that never arrived."""
+        if request.path == "/GetClientData":
+            self.pending_updates.clear()
+
+    async def _login(self, _request: web.Request) -> web.Response:
+        self.requests_since_login = 0
+        response = web.json_response({"Status": "OK"})
+        response.headers["Set-Cookie"] = f"Token={TOKEN}; path=/"
+        return response
+
+    async def _get_panel(self, request: web.Request) -> web.Response:
+        path = (await request.json()).get("Path", "")
+        items = [
+            item
+            for item in self.state
+            if not path or item["DeviceName"].startswith(f"{path}\\")
+        ]
+        body = json.dumps({"ThemeObject": {"ValueUpdates": items}})
+        self.bytes_sent[request.path] += len(body)
+        response = web.Response(text=body, content_type="application/json")
+        if self.compress:
+            response.enable_compression()
+        return response
+
+    async def _get_client_data(self, _request: web.Request) -> web.Response:
+        updates, self.pending_updates = self.pending_updates, []
+        if self.corrupt_encoding:
+            return web.Response(
+                body=b"not compressed at all",
+                headers={"Content-Encoding": self.corrupt_encoding},
+            )
+        return web.json_response({"PropertyUpdates": updates})
+
+    async def _set_value(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        self.written.append(payload)
+        return web.json_response({"Status": "OK"})
+
+    async def _logout(self, _request: web.Request) -> web.Response:
+        return web.json_response({"Status": "OK"})
+
+
+def make_self_signed_context(directory: Path) -> tuple[ssl.SSLContext, str]:
+    """Create a server TLS context with a self-signed certificate like controllers."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "ComfortClick")])
+    now = datetime.datetime.now(datetime.UTC)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName(
+                [x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]
+            ),
+            critical=False,
+        )
+        .sign(key, hashes.SHA256())
+    )
+    cert_file = directory / "controller.pem"
+    key_file = directory / "controller.key"
+    cert_file.write_bytes(certificate.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_file, key_file)
+    der = certificate.public_bytes(serialization.Encoding.DER)
+    return context, hashlib.sha256(der).hexdigest()
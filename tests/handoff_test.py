@@ -0,0 +1,100 @@
+"""Test reusing the config flow login and panel when the entry is set up."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from custom_components.comfortclick_custom import handoff
+from custom_components.comfortclick_custom.config_flow import ConfigFlow, validate_input
+from custom_components.comfortclick_custom.coordinator import ComfortClickCoordinator
+from custom_components.comfortclick_custom.handoff import (
+    async_hand_off,
+    async_take_over,
+)
+
+from .fake_controller import FakeController
+
+DEVICE = "Devices\\Room 1\\Target"
+
+
+@pytest.fixture
+async def controller():
+    controller = FakeController(
+        state=[
+            {"DeviceName": DEVICE, "Value": 21},
+            {"DeviceName": "Devices\\Room 2\\Target", "Value": 20},
+        ]
+    )
+    await controller.start()
+    yield controller
+    await controller.close()
+
+
+@pytest.fixture
+async def hass(tmp_path: Path):
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
+
+
+def _data(controller: FakeController) -> dict:
+    return {
+        CONF_HOST: controller.host,
+        CONF_USERNAME: "user",
+        CONF_PASSWORD: "password",
+    }
+
+
+async def test_setup_reuses_config_flow_login_and_panel(
+    hass: HomeAssistant, controller: FakeController
+):
+    data = _data(controller)
+    info = await validate_input(hass, data)
+    assert info["devices"] == 2
+
+    async_hand_off(hass, data, info["api"])
+    api = async_take_over(hass, dict(data))
+    assert api is info["api"]
+    assert async_take_over(hass, data) is None
+
+    coordinator = ComfortClickCoordinator(hass, api=api, device_names={DEVICE})
+    await coordinator._async_setup()  # noqa: SLF001
+
+    assert controller.requests["/Login"] == 1
+    assert controller.requests["/GetPanel"] == 1
+    assert "login" not in coordinator.startup_timings.phases
+    await api.close()
+
+
+async def test_config_flow_shows_the_devices_found(
+    hass: HomeAssistant, controller: FakeController
+):
+    flow = ConfigFlow()
+    flow.hass = hass
+    flow.context = {"source": "user"}
+
+    result = await flow.async_step_user(_data(controller))
+
+    assert result["type"] == "create_entry"
+    assert result["description_placeholders"] == {"devices": "2"}
+    await async_take_over(hass, _data(controller)).close()
+
+
+async def test_unused_connection_logs_out(
+    hass: HomeAssistant,
+    controller: FakeController,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(handoff, "HANDOFF_TIMEOUT", 0)
+    data = _data(controller)
+    info = await validate_input(hass, data)
+
+    async_hand_off(hass, data, info["api"])
+    await asyncio.sleep(0.1)
+    await hass.async_block_till_done()
+
+    assert controller.requests["/Logout"] == 1
+    assert async_take_over(hass, data) is None
@@ -0,0 +1,127 @@
+"""Test journaling writes while the controller is unreachable."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.comfortclick_custom.api import (
+    JOURNAL_REPLAY_RATE,
+    ApiInstance,
+    HttpStatusNotOkError,
+)
+from custom_components.comfortclick_custom.journal import WriteJournal
+
+from .fake_controller import FakeController
+
+TARGET = "Devices\\Room 1\\Target"
+MODE = "Devices\\Vent\\Home mode"
+
+
+@pytest.fixture
+async def hass(tmp_path: Path):
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
+
+
+@pytest.fixture
+async def controller():
+    controller = FakeController(
+        state=[
+            {"DeviceName": TARGET, "Value": 21},
+            {"DeviceName": MODE, "Value": False},
+        ]
+    )
+    await controller.start()
+    yield controller
+    await controller.close()
+
+
+@pytest.fixture
+async def api(hass: HomeAssistant, controller: FakeController):
+    api = ApiInstance("user", "password", controller.host)
+    api.journal = WriteJournal(hass, "entry", max_age=900)
+    await api.connect()
+    yield api
+    await api.close()
+
+
+async def test_writes_are_journaled_and_replayed_after_restart(
+    hass: HomeAssistant, controller: FakeController, api: ApiInstance
+):
+    controller.status_overrides["/SetValue"] = 503
+    await api.set_value(TARGET, 22)
+    await api.set_value(MODE, value=True)
+    await api.set_value(TARGET, 23)
+    assert len(api.journal) == 2
+
+    # Journal is read back from storage after a restart
+    api.journal = WriteJournal(hass, "entry", max_age=900)
+    await api.journal.async_load()
+
+    del controller.status_overrides["/SetValue"]
+    assert await api.replay_journal() == 2
+    # Coalesced per device and sent in the order of the latest writes
+    assert [(item["objectName"], item["value"]) for item in controller.written] == [
+        (MODE, True),
+        (TARGET, 23),
+    ]
+    assert not api.journal
+
+
+async def test_rejected_writes_are_not_journaled(
+    controller: FakeController, api: ApiInstance
+):
+    controller.status_overrides["/SetValue"] = 400
+    with pytest.raises(HttpStatusNotOkError):
+        await api.set_value(TARGET, 22)
+    assert not api.journal
+
+
+async def test_batch_reports_queued_writes(
+    controller: FakeController, api: ApiInstance
+):
+    controller.status_overrides["/SetValue"] = 503
+    results = await api.set_values([(TARGET, 22)])
+    assert results[0].success
+    assert results[0].queued
+
+
+async def test_newer_write_and_expiry_drop_journaled_writes(
+    controller: FakeController, api: ApiInstance
+):
+    controller.status_overrides["/SetValue"] = 503
+    await api.set_value(TARGET, 22)
+    await api.set_value(MODE, value=True)
+
+    del controller.status_overrides["/SetValue"]
+    await api.set_value(TARGET, 24)
+    assert [write.device_name for write in api.journal.pending()] == [MODE]
+
+    api.journal.max_age = 0
+    assert await api.replay_journal() == 0
+    assert [item["value"] for item in controller.written] == [24]
+
+
+async def test_write_during_replay_supersedes_journaled_write(
+    controller: FakeController, api: ApiInstance
+):
+    controller.status_overrides["/SetValue"] = 503
+    await api.set_value(MODE, value=True)
+    await api.set_value(TARGET, 22)
+    del controller.status_overrides["/SetValue"]
+
+    replay = asyncio.create_task(api.replay_journal())
+    # Written while the replay waits to send the next journaled value
+    await asyncio.sleep(1 / JOURNAL_REPLAY_RATE / 2)
+    assert len(controller.written) == 1
+    await api.set_value(TARGET, 25)
+
+    assert await replay == 1
+    assert [(item["objectName"], item["value"]) for item in controller.written] == [
+        (MODE, True),
+        (TARGET, 25),
+    ]
+    assert not api.journal
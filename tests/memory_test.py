@@ -0,0 +1,180 @@
+"""Test memory used by panels, polls and entities at realistic scale."""
+
+import gc
+import logging
+import os
+import random
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_platform import EntityPlatform
+
+from custom_components.comfortclick_custom.api import ApiInstance
+from custom_components.comfortclick_custom.const import DOMAIN
+from custom_components.comfortclick_custom.coordinator import ComfortClickCoordinator
+from custom_components.comfortclick_custom.entities.utilities.utilities_sensor import (
+    ElectricitySensor,
+    PowerSensor,
+    UtilitiesSensor,
+    UtilitiesSensorConfig,
+)
+
+from .fake_controller import FakeController
+
+_LOGGER = logging.getLogger(__name__)
+
+DEVICES_PER_FOLDER = 50
+UPDATES_PER_POLL = 20
+# Bytes per device, measured with some headroom. Raise only for a known reason.
+STATE_BUDGET = 600
+LOAD_PEAK_BUDGET = 700
+ENTITY_BUDGET = 7500
+# Growth between two equal poll windows that is taken as a leak
+LEAK_TOLERANCE = 64 * 1024
+# Home assistant resizes the attribute dicts of entities as their states are
+# written, which moves memory around without leaking, so leaks are looked for in
+# memory the integration allocated itself
+INTEGRATION_FILES = "*/custom_components/comfortclick_custom/*"
+
+
+def _device(i: int) -> str:
+    return f"Devices\\Folder {i // DEVICES_PER_FOLDER}\\Device {i}"
+
+
+def _traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def _traced_by_integration() -> int:
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(inclusive=True, filename_pattern=INTEGRATION_FILES)]
+    )
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+
+@pytest.fixture
+def tracing():
+    tracemalloc.start()
+    yield
+    tracemalloc.stop()
+
+
+async def _poll(
+    coordinator: ComfortClickCoordinator,
+    controller: FakeController,
+    rng: random.Random,
+    polls: int,
+    devices: int,
+) -> None:
+    for _ in range(polls):
+        for _ in range(UPDATES_PER_POLL):
+            controller.push_update(_device(rng.randrange(devices)), rng.random())
+        await coordinator.async_refresh()
+
+
+@pytest.mark.usefixtures("tracing")
+@pytest.mark.parametrize(
+    ("devices", "polls"),
+    [
+        (1_000, 2_000),
+        # Takes several minutes, so it only runs when asked for
+        pytest.param(
+            50_000,
+            2_000,
+            marks=pytest.mark.skipif(
+                not os.environ.get("COMFORTCLICK_SLOW_TESTS"),
+                reason="set COMFORTCLICK_SLOW_TESTS to measure the largest panels",
+            ),
+        ),
+    ],
+)
+async def test_memory_footprint(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture, devices: int, polls: int
+):
+    # Captured log records of every poll would look like a leak
+    caplog.set_level(logging.WARNING)
+    caplog.set_level(logging.INFO, logger=__name__)
+    controller = FakeController(
+        state=[{"DeviceName": _device(i), "Value": float(i)} for i in range(devices)]
+    )
+    await controller.start()
+    hass = HomeAssistant(str(tmp_path))
+    await er.async_load(hass)
+    platform = EntityPlatform(
+        hass=hass,
+        logger=_LOGGER,
+        domain="sensor",
+        platform_name=DOMAIN,
+        platform=None,
+        scan_interval=timedelta(seconds=30),
+        entity_namespace=None,
+    )
+    api = ApiInstance("user", "password", controller.host)
+    await api.connect()
+
+    base = _traced()
+    tracemalloc.reset_peak()
+    await api.initialize_state()
+    api.snapshot()
+    load_peak = tracemalloc.get_traced_memory()[1] - base
+    state = _traced() - base
+
+    coordinator = ComfortClickCoordinator(hass, api=api)
+    coordinator.async_set_updated_data(api.snapshot())
+    before_entities = _traced()
+    entities = [
+        UtilitiesSensor(
+            coordinator,
+            UtilitiesSensorConfig(
+                id=_device(i),
+                name=f"Device {i}",
+                description=ElectricitySensor,
+                rate_description=PowerSensor,
+                rate_factor=1,
+                rate_window=timedelta(minutes=15),
+                consumption_window=timedelta(hours=24),
+            ),
+        )
+        for i in range(devices)
+    ]
+    # Counts the states and registry entries home assistant keeps for them too
+    await platform.async_add_entities(entities)
+    entity_bytes = _traced() - before_entities
+
+    # Every device gets a value of its own once, which is growth but not a leak
+    rng = random.Random(0)  # noqa: S311
+    for i in range(devices):
+        controller.push_update(_device(i), rng.random())
+    await coordinator.async_refresh()
+    await _poll(coordinator, controller, rng, polls // 2, devices)
+    warmed_up, integration_warmed_up = _traced(), _traced_by_integration()
+    await _poll(coordinator, controller, rng, polls // 2, devices)
+    growth = _traced() - warmed_up
+    integration_growth = _traced_by_integration() - integration_warmed_up
+
+    _LOGGER.info(
+        "%d devices: state %d B/device, load peak %d B/device, "
+        "entities %d B/entity, growth over %d polls %d B, %d B by the integration",
+        devices,
+        state // devices,
+        load_peak // devices,
+        entity_bytes // len(entities),
+        polls // 2,
+        growth,
+        integration_growth,
+    )
+    await platform.async_reset()
+    await coordinator.async_shutdown()
+    await controller.close()
+    await hass.async_stop(force=True)
+
+    assert state <= STATE_BUDGET * devices
+    assert load_peak <= LOAD_PEAK_BUDGET * devices
+    assert entity_bytes <= ENTITY_BUDGET * devices
+    assert integration_growth <= LEAK_TOLERANCE, "Memory grows with every poll"
@@ -0,0 +1,81 @@
+"""Test the utility meter reading history."""
+
+import logging
+
+import pytest
+
+from custom_components.comfortclick_custom.api import ApiInstance
+from custom_components.comfortclick_custom.entities.utilities.meter_history import (
+    MeterHistory,
+    MeterHistoryRecorder,
+)
+
+from .fake_controller import FakeController
+
+METER = "Devices\\Meters\\Electricity"
+
+
+def test_rate_and_consumption():
+    history = MeterHistory(capacity=16)
+    assert history.increase(now=0, window=60) is None
+
+    # 1 unit per minute
+    for minute in range(10):
+        history.append(minute * 60, 100 + minute)
+
+    assert history.increase(now=540, window=300) == (5, 300)
+    assert history.rate(now=540, window=300) == pytest.approx(60)
+    # Window reaching past the oldest reading is measured from the oldest reading
+    assert history.increase(now=540, window=3600) == (9, 540)
+
+
+def test_memory_is_constant():
+    history = MeterHistory(capacity=64)
+    allocated = history.nbytes
+
+    for second in range(10_000):
+        history.append(second, second * 2)
+
+    assert len(history) == 64
+    assert history.nbytes == allocated
+    assert history.increase(now=9_999, window=10) == (20, 10)
+
+
+def test_meter_updating_every_second_covers_the_window():
+    history = MeterHistory(capacity=64, window=3600)
+
+    for second in range(600):
+        history.append(second, second)
+    # The history only reaches back to the first reading yet
+    assert history.increase(now=599, window=3600) == (599, 599)
+
+    for second in range(600, 7200):
+        history.append(second, second)
+
+    assert len(history) == 64
+    increase, covered = history.increase(now=7199, window=3600)
+    assert covered == 3600
+    # The baseline is the first reading of the bucket the window starts in
+    assert 3600 <= increase < 3600 + 3600 / 63
+    assert history.rate(now=7199, window=900) == pytest.approx(3600, rel=0.1)
+
+
+async def test_missing_meter_is_tracked_without_warnings(
+    caplog: pytest.LogCaptureFixture,
+):
+    controller = FakeController(state=[{"DeviceName": METER, "Value": 100}])
+    await controller.start()
+    api = ApiInstance("user", "password", controller.host)
+    await api.connect()
+    await api.initialize_state([METER])
+    recorder = MeterHistoryRecorder(api, [METER, "Devices\\Meters\\Missing"])
+
+    controller.push_update(METER, 101)
+    await api.poll()
+    recorder.stop()
+    await api.close()
+    await controller.close()
+
+    assert len(recorder.history(METER)) == 2
+    assert len(recorder.history("Devices\\Meters\\Missing")) == 0
+    assert not [r for r in caplog.records if r.levelno >= logging.WARNING]
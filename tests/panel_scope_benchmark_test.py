@@ -0,0 +1,55 @@
+"""Benchmark loading only configured panel paths against loading the whole panel."""
+
+import logging
+import time
+
+from custom_components.comfortclick_custom.api import ApiInstance
+
+from .fake_controller import FakeController
+
+_LOGGER = logging.getLogger(__name__)
+
+PANEL_FOLDERS = 200
+DEVICES_PER_FOLDER = 50
+CONFIGURED_FOLDERS = 10
+
+
+async def _load(controller: FakeController, device_names: list[str] | None) -> float:
+    api = ApiInstance("user", "password", controller.host)
+    await api.connect()
+    started = time.perf_counter()
+    await api.initialize_state(device_names)
+    elapsed = time.perf_counter() - started
+    await api.close()
+    return elapsed
+
+
+async def test_scoped_panel_load_benchmark():
+    controller = FakeController(
+        state=[
+            {"DeviceName": f"Devices\\Folder {folder}\\Device {i}", "Value": i}
+            for folder in range(PANEL_FOLDERS)
+            for i in range(DEVICES_PER_FOLDER)
+        ]
+    )
+    await controller.start()
+
+    full_time = await _load(controller, None)
+    full_bytes = controller.bytes_sent["/GetPanel"]
+    controller.bytes_sent.clear()
+
+    configured = [
+        f"Devices\\Folder {folder}\\Device 0" for folder in range(CONFIGURED_FOLDERS)
+    ]
+    scoped_time = await _load(controller, configured)
+    scoped_bytes = controller.bytes_sent["/GetPanel"]
+    await controller.close()
+
+    _LOGGER.info(
+        "Full panel: %d bytes in %.1f ms, scoped: %d bytes in %.1f ms",
+        full_bytes,
+        full_time * 1000,
+        scoped_bytes,
+        scoped_time * 1000,
+    )
+    assert scoped_bytes * PANEL_FOLDERS / CONFIGURED_FOLDERS <= full_bytes * 1.05
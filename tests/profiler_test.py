@@ -0,0 +1,43 @@
+"""Test profiling coordinator ticks."""
+
+import asyncio
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.comfortclick_custom.api import ApiInstance
+from custom_components.comfortclick_custom.coordinator import ComfortClickCoordinator
+
+from .fake_controller import FakeController
+
+DEVICE = "Devices\\Room 1\\Target"
+TICKS = 3
+
+
+async def test_profiles_the_next_ticks(tmp_path: Path):
+    controller = FakeController(state=[{"DeviceName": DEVICE, "Value": 20}])
+    await controller.start()
+    hass = HomeAssistant(str(tmp_path))
+    api = ApiInstance("user", "password", controller.host)
+    await api.connect()
+    await api.initialize_state([DEVICE])
+    coordinator = ComfortClickCoordinator(hass, api=api, device_names=[DEVICE])
+
+    profile = asyncio.create_task(coordinator.async_profile(TICKS))
+    await asyncio.sleep(0)
+    assert coordinator.is_profiling
+    for _ in range(TICKS + 1):
+        await coordinator.async_refresh()
+    profiler = await profile
+
+    assert not coordinator.is_profiling
+    assert profiler.profiled_ticks == TICKS
+    profile_path, summary_path = profiler.write(tmp_path)
+    assert profile_path.stat().st_size > 0
+    summary = summary_path.read_text()
+    assert summary.startswith(f"Profiled {TICKS} of {TICKS} ticks")
+    assert "(poll)" in summary
+
+    await api.close()
+    await hass.async_stop(force=True)
+    await controller.close()
@@ -0,0 +1,146 @@
+"""Test sharing the polled state with other local consumers."""
+
+import json
+from pathlib import Path
+
+import aiohttp
+import pytest
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.core import HomeAssistant
+
+from custom_components.comfortclick_custom.api import ApiInstance, StateSnapshot
+from custom_components.comfortclick_custom.config_flow import OptionsFlow
+from custom_components.comfortclick_custom.const import (
+    CONF_PROXY_HOST,
+    CONF_PROXY_PORT,
+    CONF_PROXY_TOKEN,
+    DOMAIN,
+)
+from custom_components.comfortclick_custom.coordinator import ComfortClickCoordinator
+from custom_components.comfortclick_custom.proxy import (
+    ProxyTokenRequiredError,
+    StateProxy,
+)
+
+from .fake_controller import FakeController
+
+CONSUMERS = 3
+TOKEN = "secret"  # noqa: S105
+
+
+def test_changes_since_an_earlier_snapshot():
+    snapshot = StateSnapshot.from_values({f"Devices\\{i}": i for i in range(100)})
+    evolved = snapshot.evolve({"Devices\\1": 1, "Devices\\2": -2, "Devices\\new": 0})
+
+    assert evolved.changes_since(snapshot) == {"Devices\\2": -2, "Devices\\new": 0}
+    assert evolved.changes_since(evolved) == {}
+
+
+@pytest.fixture
+async def controller():
+    controller = FakeController(
+        state=[
+            {"DeviceName": f"Devices\\Room {room}\\Target", "Value": room}
+            for room in range(10)
+        ]
+    )
+    await controller.start()
+    yield controller
+    await controller.close()
+
+
+async def _read_event(response: aiohttp.ClientResponse) -> tuple[str, dict]:
+    lines = []
+    while (line := (await response.content.readline()).decode().strip()) or not lines:
+        lines.append(line)
+    fields = dict(line.split(": ", 1) for line in lines)
+    return fields["event"], json.loads(fields["data"])
+
+
+async def test_consumers_share_a_single_poll(
+    tmp_path: Path, controller: FakeController
+):
+    hass = HomeAssistant(str(tmp_path))
+    api = ApiInstance("user", "password", controller.host)
+    coordinator = ComfortClickCoordinator(hass, api=api)
+    await coordinator._async_setup()  # noqa: SLF001
+    await coordinator.async_refresh()
+    proxy = StateProxy(coordinator, "127.0.0.1", 0, TOKEN)
+    await proxy.async_start()
+    url = f"http://127.0.0.1:{proxy.bound_port}"
+    headers = {"Authorization": f"Bearer {TOKEN}"}
+
+    async with aiohttp.ClientSession(headers=headers) as session:
+        streams = [await session.get(f"{url}/state") for _ in range(CONSUMERS)]
+        for stream in streams:
+            event, data = await _read_event(stream)
+            assert event == "snapshot"
+            assert len(data["values"]) == 10
+        polls = controller.requests["/GetClientData"]
+
+        controller.push_update("Devices\\Room 1\\Target", 21)
+        await coordinator.async_refresh()
+
+        # Every consumer gets the change from the one poll of the controller
+        assert controller.requests["/GetClientData"] == polls + 1
+        for stream in streams:
+            event, data = await _read_event(stream)
+            assert event == "delta"
+            assert data["values"] == {"Devices\\Room 1\\Target": 21}
+
+        response = await session.post(
+            f"{url}/values",
+            json={"values": [{"device_name": "Devices\\Room 2\\Target", "value": 5}]},
+        )
+        assert (await response.json())["results"][0]["success"]
+        assert controller.written[-1]["value"] == 5
+
+        response = await session.post(f"{url}/values", json={"values": "nonsense"})
+        assert response.status == 400
+
+    async with aiohttp.ClientSession() as session:
+        response = await session.get(f"{url}/snapshot")
+        assert response.status == 401
+
+    for stream in streams:
+        stream.close()
+    await proxy.async_stop()
+    assert proxy.bound_port is None
+    await coordinator.async_shutdown()
+    await api.close()
+    await hass.async_stop(force=True)
+
+
+async def test_other_hosts_are_only_served_with_a_token(tmp_path: Path):
+    hass = HomeAssistant(str(tmp_path))
+    coordinator = ComfortClickCoordinator(
+        hass, api=ApiInstance("user", "password", "http://localhost")
+    )
+
+    with pytest.raises(ProxyTokenRequiredError):
+        await StateProxy(coordinator, "0.0.0.0", 0).async_start()  # noqa: S104
+    proxy = StateProxy(coordinator, "::1", 0)
+    await proxy.async_start()
+    await proxy.async_stop()
+
+    flow = OptionsFlow(
+        ConfigEntry(
+            data={},
+            discovery_keys={},
+            domain=DOMAIN,
+            minor_version=1,
+            options={},
+            source="user",
+            title="Controller",
+            unique_id=None,
+            version=1,
+        )
+    )
+    flow.hass = hass
+    options = {CONF_SCAN_INTERVAL: 1, CONF_PROXY_PORT: 8765}
+    result = await flow.async_step_init({**options, CONF_PROXY_HOST: "0.0.0.0"})  # noqa: S104
+    assert result["errors"] == {CONF_PROXY_TOKEN: "token_required"}
+    result = await flow.async_step_init({**options, CONF_PROXY_HOST: "127.0.0.1"})
+    assert result["type"] == "create_entry"
+    await hass.async_stop(force=True)
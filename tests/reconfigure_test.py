@@ -0,0 +1,138 @@
+"""Test applying configuration changes without reloading the entry."""
+
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import partial
+from pathlib import Path
+
+import pytest
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_platform import EntityPlatform
+
+from custom_components.comfortclick_custom.api import ApiInstance
+from custom_components.comfortclick_custom.const import DOMAIN
+from custom_components.comfortclick_custom.coordinator import ComfortClickCoordinator
+from custom_components.comfortclick_custom.reconfigure import (
+    EntityGroup,
+    PlatformEntities,
+)
+
+from .fake_controller import FakeController
+
+
+@dataclass
+class _Config:
+    id: str
+    name: str
+
+
+class _Sensor(SensorEntity):
+    def __init__(self, config: _Config) -> None:
+        self._attr_unique_id = config.id
+        self._attr_name = config.name
+
+
+@dataclass
+class _Configs:
+    sensors: list[_Config]
+
+
+@pytest.fixture
+async def hass(tmp_path: Path):
+    hass = HomeAssistant(str(tmp_path))
+    await er.async_load(hass)
+    yield hass
+    await hass.async_stop(force=True)
+
+
+async def test_only_changed_definitions_are_replaced(hass: HomeAssistant):
+    platform = EntityPlatform(
+        hass=hass,
+        logger=None,
+        domain="sensor",
+        platform_name=DOMAIN,
+        platform=None,
+        scan_interval=timedelta(seconds=30),
+        entity_namespace=None,
+    )
+    stopped = []
+
+    def sensor(config: _Config) -> EntityGroup:
+        return EntityGroup([_Sensor(config)], [partial(stopped.append, config.id)])
+
+    def factories(configs: _Configs) -> dict:
+        return {repr(config): partial(sensor, config) for config in configs.sensors}
+
+    entities = PlatformEntities(
+        hass,
+        lambda added: hass.async_create_task(platform.async_add_entities(added)),
+        factories,
+    )
+    kept, renamed, gone = (
+        _Config("kept", "Kept"),
+        _Config("renamed", "Before"),
+        _Config("gone", "Gone"),
+    )
+    result = await entities.async_update(_Configs([kept, renamed, gone]))
+    await hass.async_block_till_done()
+    assert (result.added, result.removed) == (3, 0)
+    kept_entity = entities.groups[repr(kept)].entities[0]
+
+    result = await entities.async_update(
+        _Configs([kept, _Config("renamed", "After"), _Config("new", "New")])
+    )
+    await hass.async_block_till_done()
+
+    assert (result.added, result.removed) == (2, 2)
+    assert sorted(stopped) == ["gone", "renamed"]
+    # The unchanged entity kept running as the same object
+    assert entities.groups[repr(kept)].entities[0] is kept_entity
+    # The replaced entity kept its entity id
+    assert hass.states.get("sensor.before").name == "After"
+    assert hass.states.get("sensor.gone") is None
+    registry = er.async_get(hass)
+    # A changed entity keeps its registry entry, a removed one loses it
+    assert registry.async_get_entity_id("sensor", DOMAIN, "renamed") is not None
+    assert registry.async_get_entity_id("sensor", DOMAIN, "gone") is None
+    assert len(entities) == 3
+
+    entities.unload()
+    assert sorted(stopped) == ["gone", "kept", "new", "renamed", "renamed"]
+
+
+async def test_new_devices_are_loaded_into_the_running_session(
+    hass: HomeAssistant,
+):
+    controller = FakeController(
+        state=[
+            {"DeviceName": f"Devices\\Room {room}\\Target", "Value": room}
+            for room in range(3)
+        ]
+    )
+    await controller.start()
+    api = ApiInstance("user", "password", controller.host)
+    coordinator = ComfortClickCoordinator(
+        hass, api=api, device_names={"Devices\\Room 0\\Target"}
+    )
+    await coordinator._async_setup()  # noqa: SLF001
+    await coordinator.async_refresh()
+    assert not api.has_device("Devices\\Room 1\\Target")
+
+    await coordinator.async_extend_scope(
+        {"Devices\\Room 0\\Target", "Devices\\Room 1\\Target"}
+    )
+    # Only the new path is loaded, without logging in again
+    assert controller.requests["/Login"] == 1
+    assert controller.requests["/GetPanel"] == 2
+    assert coordinator.data["Devices\\Room 1\\Target"] == 1
+    # Devices already loaded are not loaded again
+    assert not await api.load_devices(["Devices\\Room 1\\Target"])
+
+    coordinator.set_update_interval(timedelta(seconds=5))
+    assert coordinator.update_interval == timedelta(seconds=5)
+
+    await coordinator.async_shutdown()
+    await api.close()
+    await controller.close()
@@ -0,0 +1,152 @@
+"""Test recovery of the API and coordinator from controller faults."""
+
+import random
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.comfortclick_custom.api import ApiInstance
+from custom_components.comfortclick_custom.coordinator import ComfortClickCoordinator
+
+from .fake_controller import FakeController, Faults
+
+FOLDERS = 4
+DEVICES_PER_FOLDER = 5
+FAULT_TICKS = 40
+# Poll, poll retried after login, login and a resync of every folder
+MAX_REQUESTS_PER_TICK = 3 + FOLDERS
+
+
+@pytest.fixture
+async def hass(tmp_path: Path):
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
+
+
+@pytest.fixture
+async def controller():
+    controller = FakeController(
+        state=[
+            {"DeviceName": f"Devices\\Folder {folder}\\Device {i}", "Value": 0}
+            for folder in range(FOLDERS)
+            for i in range(DEVICES_PER_FOLDER)
+        ]
+    )
+    await controller.start()
+    yield controller
+    await controller.close()
+
+
+async def _start(
+    hass: HomeAssistant, controller: FakeController, request_timeout: float
+) -> ComfortClickCoordinator:
+    api = ApiInstance("user", "password", controller.host)
+    api.request_timeout = request_timeout
+    device_names = [item["DeviceName"] for item in controller.state]
+    coordinator = ComfortClickCoordinator(hass, api=api, device_names=device_names)
+    await api.connect()
+    await api.initialize_state(device_names)
+    return coordinator
+
+
+async def _tick(
+    coordinator: ComfortClickCoordinator, controller: FakeController, rng: random.Random
+) -> None:
+    item = rng.choice(controller.state)
+    controller.push_update(item["DeviceName"], rng.randint(0, 100))
+    await coordinator.async_refresh()
+
+
+def _is_consistent(api: ApiInstance, controller: FakeController) -> bool:
+    return all(
+        api.get_value(item["DeviceName"]) == item["Value"] for item in controller.state
+    )
+
+
+@pytest.mark.parametrize(
+    ("faults", "request_timeout"),
+    [
+        (Faults(latency=lambda rng: rng.uniform(0, 0.02)), 10),
+        (Faults(latency=lambda _: 0.1, paths=("/GetClientData",)), 0.05),
+        (Faults(error_rate=0.3), 10),
+        (Faults(token_expires_after=7), 10),
+        (Faults(truncate_rate=0.3), 10),
+        (Faults(reset_rate=0.3), 10),
+    ],
+    ids=["latency", "timeouts", "errors", "token_expiry", "truncated", "resets"],
+)
+async def test_recovers_from_faults(
+    hass: HomeAssistant,
+    controller: FakeController,
+    faults: Faults,
+    request_timeout: float,
+):
+    coordinator = await _start(hass, controller, request_timeout)
+    rng = random.Random(1)  # noqa: S311
+    controller.requests.clear()
+
+    controller.faults = faults
+    for _ in range(FAULT_TICKS):
+        await _tick(coordinator, controller, rng)
+    requests = sum(controller.requests.values())
+
+    controller.faults = Faults()
+    await _tick(coordinator, controller, rng)
+
+    # Recovers within a single tick once the controller behaves again
+    assert coordinator.last_update_success
+    assert _is_consistent(coordinator.api, controller)
+    # Faults never cause more than a bounded amount of extra requests
+    assert requests <= FAULT_TICKS * MAX_REQUESTS_PER_TICK
+    if faults.token_expires_after:
+        # Logs in again only once the token actually expired
+        logins = controller.requests["/Login"]
+        assert (logins - 1) * faults.token_expires_after < requests
+    await coordinator.api.close()
+
+
+async def test_expired_token_logs_in_once_for_concurrent_writes(
+    hass: HomeAssistant, controller: FakeController
+):
+    coordinator = await _start(hass, controller, request_timeout=10)
+    # Token expires right away, but lasts for all writes after logging in again
+    controller.faults = Faults(token_expires_after=len(controller.state))
+    controller.requests_since_login = len(controller.state)
+
+    results = await coordinator.api.set_values(
+        [(item["DeviceName"], 1) for item in controller.state]
+    )
+
+    assert all(result.success for result in results)
+    assert controller.requests["/Login"] == 2
+    await coordinator.api.close()
+
+
+async def test_failed_writes_are_not_retried(
+    hass: HomeAssistant, controller: FakeController
+):
+    coordinator = await _start(hass, controller, request_timeout=10)
+    controller.faults = Faults(error_rate=1, paths=("/SetValue",))
+
+    results = await coordinator.api.set_values(
+        [(item["DeviceName"], 1) for item in controller.state]
+    )
+
+    assert not any(result.success for result in results)
+    assert controller.requests["/SetValue"] == len(controller.state)
+    await coordinator.api.close()
+
+
+async def test_shutdown_closes_the_session(
+    hass: HomeAssistant, controller: FakeController
+):
+    coordinator = await _start(hass, controller, request_timeout=5)
+    session = coordinator.api._session  # noqa: SLF001
+    assert session is not None
+
+    # Also what home assistant does when the first refresh fails
+    await coordinator.async_shutdown()
+
+    assert session.closed
@@ -0,0 +1,115 @@
+"""Test writing scheduled values at the boundaries of their time slots."""
+
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.comfortclick_custom.api import ApiInstance
+from custom_components.comfortclick_custom.entities.vent.vent_config import VentConfig
+from custom_components.comfortclick_custom.schedule import (
+    ScheduledTransition,
+    ScheduleEngine,
+)
+from custom_components.comfortclick_custom.util.load_schedules_config import (
+    InvalidScheduleError,
+    _device_and_value,
+    _weekdays,
+)
+
+from .fake_controller import FakeController
+
+BEDROOM = "Devices\\Bedroom\\Target"
+KITCHEN = "Devices\\Kitchen\\Target"
+HOME_MODE = "Devices\\Vent\\Home"
+
+
+@pytest.fixture
+async def controller():
+    controller = FakeController(
+        state=[
+            {"DeviceName": BEDROOM, "Value": 19.0},
+            {"DeviceName": KITCHEN, "Value": 21.0},
+            {"DeviceName": HOME_MODE, "Value": False},
+        ]
+    )
+    await controller.start()
+    yield controller
+    await controller.close()
+
+
+@pytest.fixture
+async def api(controller: FakeController):
+    api = ApiInstance("user", "password", controller.host)
+    await api.connect()
+    await api.initialize_state()
+    yield api
+    await api.close()
+
+
+@pytest.fixture
+async def hass(tmp_path: Path):
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
+
+
+def test_next_occurrence_respects_weekdays():
+    weekdays = ScheduledTransition(BEDROOM, 21.0, time(7), _weekdays(["mon", "fri"]))
+    # 2024-01-01 was a Monday
+    monday = datetime(2024, 1, 1, 6, 30, tzinfo=dt_util.UTC)
+
+    assert weekdays.next_after(monday) == monday.replace(hour=7, minute=0)
+    assert weekdays.next_after(monday.replace(hour=7)) == datetime(
+        2024, 1, 5, 7, tzinfo=dt_util.UTC
+    )
+    friday_evening = datetime(2024, 1, 5, 22, tzinfo=dt_util.UTC)
+    assert weekdays.next_after(friday_evening) == datetime(
+        2024, 1, 8, 7, tzinfo=dt_util.UTC
+    )
+
+
+async def test_due_transitions_are_written_in_one_batch(
+    hass: HomeAssistant, api: ApiInstance, controller: FakeController
+):
+    at = (dt_util.now() + timedelta(minutes=5)).time()
+    later = (dt_util.now() + timedelta(minutes=10)).time()
+    transitions = [
+        ScheduledTransition(BEDROOM, 20.0, at),
+        ScheduledTransition(BEDROOM, 22.0, later),
+        # Already has the value, so it is not written
+        ScheduledTransition(KITCHEN, 21.0, at),
+        ScheduledTransition(HOME_MODE, value=True, at=at),
+    ]
+    engine = ScheduleEngine(hass, api, transitions)
+    boundary = engine.next_boundary
+
+    results = await engine.async_run_due(boundary)
+
+    assert {result.device_name for result in results} == {BEDROOM, HOME_MODE}
+    assert all(result.success for result in results)
+    assert len(controller.written) == 2
+    assert engine.next_boundary > boundary
+
+    # A timer firing late writes only the latest value of each device
+    late = ScheduleEngine(hass, api, transitions)
+    results = await late.async_run_due(boundary + timedelta(minutes=10))
+    assert {result.device_name: result.value for result in results} == {
+        BEDROOM: 22.0,
+        HOME_MODE: True,
+    }
+
+
+def test_schedules_resolve_thermostats_and_vent_modes():
+    vent = VentConfig("", "Vent\\Away", "Vent\\Home", "Vent\\Guest", "", "", "")
+
+    assert _device_and_value({"vent": True}, "Home", [], vent) == ("Vent\\Home", True)
+    assert _device_and_value({"device": BEDROOM}, 20, [], vent) == (BEDROOM, 20)
+    with pytest.raises(InvalidScheduleError):
+        _device_and_value({"vent": True}, "Party", [], vent)
+    with pytest.raises(InvalidScheduleError):
+        _device_and_value({"thermostat": "Attic"}, 20, [], vent)
+    with pytest.raises(InvalidScheduleError):
+        _weekdays(["someday"])
@@ -0,0 +1,79 @@
+"""Test setting up only what is configured and measuring how long it takes."""
+
+import logging
+
+import pytest
+from homeassistant.const import Platform
+
+from custom_components.comfortclick_custom.entities.vent.vent_config import VentConfig
+from custom_components.comfortclick_custom.util import add_entities
+from custom_components.comfortclick_custom.util.add_entities import (
+    async_add_entities_in_chunks,
+)
+from custom_components.comfortclick_custom.util.load_entity_configs import (
+    EntityConfigs,
+    load_entity_configs,
+)
+from custom_components.comfortclick_custom.util.startup_timings import StartupTimings
+
+
+def _empty_configs() -> EntityConfigs:
+    return EntityConfigs(
+        thermostats=[],
+        fans=[],
+        locks=[],
+        utilities=[],
+        vent=VentConfig("", "", "", "", "", "", ""),
+        derived=[],
+        aggregates=[],
+        schedules=[],
+    )
+
+
+async def test_config_file_platforms_and_device_ids():
+    configs = await load_entity_configs()
+
+    assert set(configs.platforms()) == {
+        Platform.CLIMATE,
+        Platform.LOCK,
+        Platform.FAN,
+        Platform.SENSOR,
+    }
+    # The example config file leaves the vent unconfigured
+    assert not configs.has_vent
+    assert "" not in configs.device_ids()
+    assert {config.id for config in configs.utilities} <= configs.device_ids()
+
+
+def test_platforms_without_entities_are_skipped():
+    configs = _empty_configs()
+    assert configs.platforms() == []
+    assert configs.device_ids() == set()
+
+    configs.vent.away_mode = "Vent\\Away"
+    assert configs.platforms() == [Platform.SENSOR, Platform.SELECT]
+    assert configs.device_ids() == {"Vent\\Away"}
+
+
+async def test_entities_are_added_in_chunks(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(add_entities, "ENTITY_CHUNK_SIZE", 3)
+    chunks = []
+
+    await async_add_entities_in_chunks(chunks.append, list(range(7)))
+
+    assert chunks == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_timings_are_logged_per_phase(caplog: pytest.LogCaptureFixture):
+    timings = StartupTimings()
+    with timings.phase("login"):
+        pass
+    with pytest.raises(RuntimeError), timings.phase("panel load"):
+        raise RuntimeError
+
+    with caplog.at_level(logging.INFO):
+        timings.log()
+
+    record = caplog.records[-1]
+    assert set(record.phases) == {"login", "panel load"}
+    assert record.total >= sum(record.phases.values())